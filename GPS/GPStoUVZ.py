@@ -1,97 +1,307 @@
+"""
+Author: @AlexdeKlerk, @edwinrainville
+
+A collection of functions to read in data from the GPS files and save it as python variables
+to be used in calculations for wave properties. The whole file is read in at once and the
+GPGGA and GPVTG sentences are matched, checksummed, and converted to arrays in bulk; pynmea2
+is only used as a fallback for lines that do not match the expected sentence layout.
+
+Contents:
+    - checksum_ok(bodies, checksums)
+    - to_float(col)
+    - dm_to_sd(deg, minutes, hemisphere, negative)
+    - convert_GPGGA(cols)
+    - convert_GPVTG(cols)
+    - fallback_GPGGA(line)
+    - fallback_GPVTG(line)
+    - parse_sentences(lines, regex, convert, fallback)
+    - velocity(track, speed)
+    - GPStoUVZ(gpsfile) [main]
+
+Log:
+    - Jul 2022, @jacobrdavis: added timestamp parsing; wrapped outputs in GPS dictionary
+    - Oct 2026: replaced per-line pynmea2 parsing with a vectorized NMEA parser
+    - Oct 2026: time is a datetime64[ns] array rather than an array of datetime objects
+    - Oct 2026: lines which cannot be parsed keep their place (badValue) so GPGGA and GPVTG stay paired
+"""
+#--Import Statements
+import re
+import numpy as np
+import pynmea2
+from datetime import datetime
+from logging import getLogger
+
+#--Constants
+badValue = 999
+
+# Complete GPGGA and GPVTG sentences. The first group is the sentence body (between '$'
+# and '*') used to compute the checksum; the last group is the transmitted checksum.
+# GPGGA groups: body, hh, mm, ss, .ss, lat deg, lat min, N/S, lon deg, lon min, E/W, fix quality, altitude, checksum
+_GPGGA = re.compile(rb'^\$(GPGGA,(\d\d)(\d\d)(\d\d)(\.\d*)?,(\d*?)(\d\d\.\d+)?,([NS]?),(\d*?)(\d\d\.\d+)?,([EW]?),'
+                    rb'(\d*),[^,*\n]*,[^,*\n]*,(-?\d*\.?\d*),[^*\n]*)\*([0-9A-Fa-f]{2})[ \t]*$', re.M)
+# GPVTG groups: body, true track, speed over ground (km/h), checksum
+_GPVTG = re.compile(rb'^\$(GPVTG,(\d*\.?\d*),[^,*\n]*,[^,*\n]*,[^,*\n]*,[^,*\n]*,[^,*\n]*,(\d*\.?\d*),[^*\n]*)'
+                    rb'\*([0-9A-Fa-f]{2})[ \t]*$', re.M)
+
+#--helper functions:
+def checksum_ok(bodies, checksums):
+    """
+    Helper function to validate NMEA checksums (XOR of all bytes between '$' and '*') for
+    many sentences at once
+
+    Input:
+        - bodies, list of sentence bodies (as bytes)
+        - checksums, list of transmitted two-character hex checksums (as bytes)
+
+    Output:
+        - ok, boolean array; True where the computed and transmitted checksums agree
+    """
+    if len(bodies) == 0:
+        return np.zeros(0, dtype=bool)
+    # XOR-reduce the concatenated bodies over each sentence
+    lengths = np.fromiter(map(len, bodies), dtype=np.intp, count=len(bodies))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    computed = np.bitwise_xor.reduceat(np.frombuffer(b''.join(bodies), dtype=np.uint8), starts)
+    # convert the transmitted hex characters to integers
+    hexChars = np.frombuffer(b''.join(checksums).upper(), dtype=np.uint8).reshape(-1, 2).astype(int)
+    nibbles = np.where(hexChars >= ord('A'), hexChars - ord('A') + 10, hexChars - ord('0'))
+    transmitted = 16*nibbles[:, 0] + nibbles[:, 1]
+    ok = computed == transmitted
+    return ok
+
+
+def to_float(col):
+    """
+    Helper function to convert a sequence of ASCII numbers to floats; empty fields become NaN
+
+    Input:
+        - col, sequence of numbers as bytes
+
+    Output:
+        - x, float array
+    """
+    col = np.asarray(col, dtype=bytes)
+    if col.size == 0:
+        return np.zeros(0)
+    x = np.where(col == b'', b'nan', col).astype(float)
+    return x
+
+
+def dm_to_sd(deg, minutes, hemisphere, negative):
+    """
+    Helper function to convert NMEA degrees and decimal minutes to signed decimal degrees
+    (same convention as pynmea2: zero if the hemisphere is not reported)
+
+    Input:
+        - deg, array of whole degrees (as bytes)
+        - minutes, array of decimal minutes (as bytes)
+        - hemisphere, array of hemisphere characters (as bytes)
+        - negative, hemisphere character which corresponds to negative values (b'S' or b'W')
+
+    Output:
+        - sd, array of signed decimal degrees
+    """
+    sd = np.nan_to_num(to_float(deg)) + to_float(minutes) / 60
+    hemisphere = np.asarray(hemisphere, dtype=bytes)
+    sd = np.where(hemisphere == negative, -sd, np.where(hemisphere == b'', 0., sd))
+    return sd
+
+
+def convert_GPGGA(cols):
+    """
+    Helper function to convert matched GPGGA fields to values
+
+    Input:
+        - cols, tuple of matched GPGGA groups (see _GPGGA)
+
+    Output:
+        - values, (5, n) array of fix quality, altitude, latitude, longitude, and time of day [us]
+    """
+    seconds = to_float(cols[1])*3600 + to_float(cols[2])*60 + to_float(cols[3])
+    microseconds = np.trunc(np.nan_to_num(to_float(cols[4]))*10**6) # same truncation as pynmea2
+    values = np.vstack((np.nan_to_num(to_float(cols[11])),          # fix quality (empty = no fix)
+                        to_float(cols[12]),                          # altitude
+                        dm_to_sd(cols[5], cols[6], cols[7], b'S'),   # latitude
+                        dm_to_sd(cols[8], cols[9], cols[10], b'W'),  # longitude
+                        seconds*10**6 + microseconds))               # time of day [us]
+    return values
+
+
+def convert_GPVTG(cols):
+    """
+    Helper function to convert matched GPVTG fields to values
+
+    Input:
+        - cols, tuple of matched GPVTG groups (see _GPVTG)
+
+    Output:
+        - values, (2, n) array of true track [deg] and speed over ground [km/h]
+    """
+    values = np.vstack((to_float(cols[1]), to_float(cols[2])))
+    return values
+
+
+def fallback_GPGGA(line):
+    """
+    Helper function to parse a single GPGGA line with pynmea2 (fallback for malformed lines)
+
+    Input:
+        - line, GPGGA line (as bytes)
+
+    Output:
+        - fix quality, altitude, latitude, longitude, and time of day [us]
+    """
+    gpgga = pynmea2.parse(line.decode('ascii', errors='replace'), check=True)
+    ts = gpgga.timestamp
+    timeOfDay = ((ts.hour*60 + ts.minute)*60 + ts.second)*10**6 + ts.microsecond
+    altitude = np.nan if gpgga.altitude is None else gpgga.altitude
+    return (gpgga.gps_qual or 0), altitude, gpgga.latitude, gpgga.longitude, timeOfDay
+
+
+def fallback_GPVTG(line):
+    """
+    Helper function to parse a single GPVTG line with pynmea2 (fallback for malformed lines)
+
+    Input:
+        - line, GPVTG line (as bytes)
+
+    Output:
+        - true track [deg] and speed over ground [km/h]
+    """
+    gpvtg = pynmea2.parse(line.decode('ascii', errors='replace'), check=True)
+    return gpvtg.true_track, gpvtg.spd_over_grnd_kmph
+
+
+def parse_sentences(lines, regex, convert, fallback):
+    """
+    Helper function to parse a list of NMEA lines of a single sentence type in bulk. All lines 
+    are matched and checksummed at once; lines which do not match the sentence pattern or fail 
+    the checksum are passed to a pynmea2-based fallback. Lines which the fallback cannot parse
+    either are kept as NaN, so that each line keeps its place and GPGGA and GPVTG sentences
+    stay paired.
+
+    Input:
+        - lines, list of lines (as bytes) containing the sentence
+        - regex, compiled sentence pattern; group 1 is the body and the last group is the checksum
+        - convert, function converting the tuple of matched groups to a (nvars, n) array 
+        - fallback, function parsing a single line into a tuple of nvars values
+
+    Output:
+        - values, (nvars, nlines) array of parsed values, in file order (NaN where a line could
+          not be parsed)
+        - nFallback, number of lines passed to the fallback parser
+        - nFailed, number of lines which could not be parsed
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+
+    # match all lines with a single call if they are well-formed, otherwise one at a time
+    fields = regex.findall(b'\n'.join(lines))
+    if len(fields) == len(lines):
+        matchedIdx = np.arange(len(lines))
+    else:
+        matches = [regex.match(line) for line in lines]
+        matchedIdx = np.flatnonzero([match is not None for match in matches])
+        fields = [matches[i].groups(b'') for i in matchedIdx]
+
+    # convert the matched, checksummed fields
+    cols = tuple(zip(*fields)) if fields else ((),)*regex.groups
+    ok = checksum_ok(cols[0], cols[-1])
+    converted = convert(cols)
+    values = np.full((converted.shape[0], len(lines)), np.nan)
+    values[:, matchedIdx[ok]] = converted[:, ok]
+    valid = np.zeros(len(lines), dtype=bool)
+    valid[matchedIdx[ok]] = True
+
+    # fall back to pynmea2 for the remaining lines
+    invalidIdx = np.flatnonzero(~valid)
+    for i in invalidIdx:
+        try:
+            values[:, i] = fallback(lines[i])
+            valid[i] = True
+        except Exception as e:
+            logger.info(f'unable to parse line {lines[i]}: {e}')
+
+    return values, len(invalidIdx), len(lines) - np.sum(valid)
+
+
+def velocity(track, speed):
+    """
+    Helper function to compute velocity from true track and speed over ground; badValue where a
+    GPVTG line could not be parsed (despiked later, like the elevation without a fix)
+
+    Input:
+        - track, true track [deg]
+        - speed, speed over ground [km/h]
+
+    Output:
+        - u, v, east and north velocity [m/s]
+    """
+    bad = np.isnan(track) | np.isnan(speed)
+    u = np.where(bad, badValue, 0.2777 * speed * np.sin(np.deg2rad(track))) #units are m/s
+    v = np.where(bad, badValue, 0.2777 * speed * np.cos(np.deg2rad(track))) #units are m/s
+    return u, v
+
+
 def GPStoUVZ(gpsfile):
     '''
     Author: @AlexdeKlerk, @edwinrainville
-    
+
     This function reads in data from the GPS files and saves it as python variables to be used in calculations 
     for wave properties. 
 
     Log:
         - Jul 2022, @jacobrdavis: added timestamp parsing; wrapped outputs in GPS dictionary
     '''
-    # Import Statements
-    import numpy as np
-    import pynmea2
-    from datetime import datetime, timedelta
-    from logging import getLogger
-
     # Set up module level logger
     logger = getLogger('microSWIFT.'+__name__) 
     logger.info('---------------GPStoUVZ.py------------------')
 
-    # Define empty lists of variables to append
-    u = []
-    v = []
-    z = []
-    lat = []
-    lon = []
-    time = []
-    ipos=0
-    ivel=0
     GPS = {'u':None,'v':None,'z':None,'lat':None,'lon':None,'time':None}
-    
-    # Define Constants 
-    badValue=999
-    
+
     # current year, month, date for timestamp creation; can also be obtained from utcnow()
     ymd = gpsfile[-23:-14]
     # ymd = datetime.utcnow().strftime("%Y-%m-%d")
+    day = np.datetime64(datetime.strptime(ymd, '%d%b%Y'), 'ns')
+
+    # read the entire file at once and sort the lines by sentence type
+    with open(gpsfile, 'rb') as file:
+        lines = file.read().splitlines()
+    ggaLines = [line for line in lines if b'GPGGA' in line]
+    vtgLines = [line for line in lines if b'GPVTG' in line and b'GPGGA' not in line]
+
+    gga, nFallback, nFailed = parse_sentences(ggaLines, _GPGGA, convert_GPGGA, fallback_GPGGA)
+    logger.info(f'GPGGA: {nFallback} line(s) parsed with fallback, {nFailed} line(s) not parsed (badValue)')
+    vtg, nFallback, nFailed = parse_sentences(vtgLines, _GPVTG, convert_GPVTG, fallback_GPVTG)
+    logger.info(f'GPVTG: {nFallback} line(s) parsed with fallback, {nFailed} line(s) not parsed (badValue)')
+    ipos = gga.shape[1]
+    ivel = vtg.shape[1]
 
+    #check to see if we have lost GPS fix (or the line could not be parsed); a badValue will remain at these indices and no time is recorded
+    qual, altitude, latitude, longitude, timeOfDay = gga
+    fix = qual >= 1
+    z   = np.where(fix, altitude, badValue)
+    lat = np.where(fix, latitude, badValue)
+    lon = np.where(fix, longitude, badValue)
+    # construct a datetime64 from the year, month, date, and timestamp
+    time = day + timeOfDay[fix].astype('timedelta64[us]')
+
+    # velocity from speed over ground and true track
+    u, v = velocity(*vtg)
 
-    with open(gpsfile, 'r') as file:
-    
-        for line in file:
-            if "GPGGA" in line:
-                gpgga = pynmea2.parse(line,check=True)   #grab gpgga sentence and parse
-                #check to see if we have lost GPS fix, and if so, continue to loop start. a badValue will remain at this index
-                if gpgga.gps_qual < 1:
-                    z.append(badValue)
-                    lat.append(badValue)
-                    lon.append(badValue)
-                    ipos+=1
-                    continue
-                z.append(gpgga.altitude)
-                lat.append(gpgga.latitude)
-                lon.append(gpgga.longitude)
-                # construct a datetime from the year, month, date, and timestamp
-                dt = f'{ymd} {gpgga.timestamp}'  #.rstrip('0')
-                if '.' not in dt: # if the datetime does not contain a float, append a trailing zero
-                    dt += '.0'
-                time.append(datetime.strptime(dt,'%d%b%Y %H:%M:%S.%f'))
-                ipos+=1
-            elif "GPVTG" in line:
-                gpvtg = pynmea2.parse(line,check=True)   #grab gpvtg sentence
-                u.append( 0.2777 * gpvtg.spd_over_grnd_kmph*np.sin(np.deg2rad(gpvtg.true_track)))#units are m/s
-                v.append( 0.2777 * gpvtg.spd_over_grnd_kmph*np.cos(np.deg2rad(gpvtg.true_track))) #units are m/s
-                ivel+=1
-            else: #if not GPGGA or GPVTG, continue to start of loop
-                continue
-           
     if ivel < ipos: # if an extra GPGGA line exists, remove the last entry
-        del z[-(ipos-ivel)]
-        del lat[-(ipos-ivel)]
-        del lon[-(ipos-ivel)]
-        del time[-(ipos-ivel)]
+        z    = np.delete(z, len(z)-(ipos-ivel))
+        lat  = np.delete(lat, len(lat)-(ipos-ivel))
+        lon  = np.delete(lon, len(lon)-(ipos-ivel))
+        time = np.delete(time, len(time)-(ipos-ivel))
         logger.info(f'{ipos-ivel} GPGGA line(s) removed at end')
 
     logger.info('GPS file read')
 
-    # TODO: bug here, fix!
-    # sortInd    = np.asarray(time).argsort()
-    # timeSorted = np.asarray(time)[sortInd]
-    # uSorted    = np.asarray(u)[sortInd].transpose()
-    # vSorted    = np.asarray(v)[sortInd].transpose()
-    # zSorted    = np.asarray(z)[sortInd].transpose()
-    # latSorted  = np.asarray(lat)[sortInd].transpose()
-    # lonSorted  = np.asarray(lon)[sortInd].transpose()
-
-    
-
     # assign outputs to GPS dict
     GPS.update({'u':u,'v':v,'z':z,'lat':lat,'lon':lon,'time':time})
-    # GPS.update({'u':uSorted,'v':vSorted,'z':zSorted,'lat':latSorted,'lon':lonSorted,'time':timeSorted})
 
     logger.info('GPGGA lines: {}'.format(len(lat)))
     logger.info('GPVTG lines: {}'.format(len(u)))
     logger.info('------------------------------------------')
 
-    return GPS #u,v,z,lat,lon, time
\ No newline at end of file
+    return GPS #u,v,z,lat,lon, time
@@ -5,6 +5,9 @@ Authors: @EJRainville, @AlexdeKlerk, @VivianaCastillo
 Description: This function initializes and records GPS data from the onboard GPS sensor. Within the main microSWIFT.py script this is 
 run as an asynchronous task at the same time as the recordIMU function. 
 
+Log:
+    - Oct 2026: output opened through open_out() so the recorder can run in its own process
+
 '''
 
 # Package imports
@@ -52,7 +55,26 @@ GPIO.setup(gpsGPIO,GPIO.OUT)
 GPIO.output(gpsGPIO,GPIO.HIGH) #set GPS enable pin high to turn on and start acquiring signal
 
 
-def recordGPS(end_time):
+def open_GPS_file(filename):
+    """
+    Helper function to open a GPS burst file for writing NMEA sentences
+    """
+    return open(filename, 'w', newline='\n')
+
+
+def recordGPS(end_time, open_out=open_GPS_file):
+    """
+    Initialize the GPS and record a burst until end_time (minutes past the hour)
+
+    Input:
+        - end_time, burst end time
+        - open_out, function opening the output for NMEA sentences, open_out(filename); by default a
+          GPS text file (see utils/acquisition.py for recording into a shared-memory ring buffer)
+
+    Output:
+        - GPSdataFilename, name of the GPS burst file
+        - gps_initialized, True if the GPS initialized
+    """
     # GPS has not been initialized yet
     gps_initialized = False
 
@@ -157,7 +179,7 @@ def recordGPS(end_time):
         logger.info('starting GPS burst')
         try:
             ser.flushInput()
-            with open(GPSdataFilename, 'w',newline='\n') as gps_out:
+            with open_out(GPSdataFilename) as gps_out:
                 logger.info('open file for writing: %s' %GPSdataFilename)
                 ipos=0
                 ivel=0
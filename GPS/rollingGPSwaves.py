@@ -0,0 +1,264 @@
+"""
+Author: @jacobrdavis
+
+Rolling GPS-only wave estimates during the burst. NMEA sentences are fed to a GPSwavesEstimator
+as they are recorded: the output file of recordGPS (thread mode) or the GPS sink of
+utils/acquisition.py (process mode) is wrapped so that every line written to the burst file is
+also buffered, parsed in small batches with the bulk parser of GPStoUVZ, converted to u, v, and
+z, and added to the estimator. Every rolling_windows completed 256 s windows a provisional
+estimate is written to a status file, so that a burst which is interrupted (power loss, watchdog
+restart) still leaves a usable product on disk, and the final estimate is available as soon as
+recording ends, without reading the burst file back.
+
+The status file is a small JSON file, replaced atomically (written to a temporary file, synced,
+and renamed over the previous one), so a restart never finds it half-written. Its 'state' is
+'provisional' during the burst, 'final' once the burst has ended, and 'queued' once a
+provisional estimate left by an interrupted burst has been added to the telemetry queue.
+
+Contents:
+    - write_status(statusFilename, status)
+    - read_status(statusFilename)
+    - RollingFile(file, rolling)
+    - RollingSink(filename, rolling)
+    - RollingGPSwaves(fs, statusFilename, rollingWindows, parseLines) [main]
+
+Log:
+    - Oct 2026: created rollingGPSwaves.py
+    - Oct 2026: velocity (badValue for unparsed GPVTG lines) from GPStoUVZ.velocity
+    - Oct 2026: read_status returns the spectral values as arrays (createTX scales them)
+"""
+#--Import Statements
+import os, json
+import numpy as np
+from datetime import datetime
+from logging import getLogger
+from GPS.GPStoUVZ import _GPGGA, _GPVTG, parse_sentences, convert_GPGGA, convert_GPVTG, fallback_GPGGA, fallback_GPVTG, velocity, badValue
+from waves.GPSwaves import GPSwavesEstimator
+from utils.acquisition import GPSFileSink
+
+#--Constants
+waveNames = ['Hs', 'Tp', 'Dp', 'E', 'f', 'a1', 'b1', 'a2', 'b2', 'check']
+spectralNames = waveNames[3:]
+
+#--helper functions:
+def write_status(statusFilename, status):
+    """
+    Helper function to replace the status file atomically
+
+    Input:
+        - statusFilename, path of the status file
+        - status, dictionary of JSON-serializable values or NumPy arrays
+    """
+    tmpFilename = statusFilename + '.tmp'
+    with open(tmpFilename, 'w') as file:
+        json.dump(status, file, default=lambda value: np.asarray(value).tolist())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmpFilename, statusFilename)
+
+
+def read_status(statusFilename):
+    """
+    Helper function to read the status file
+
+    Input:
+        - statusFilename, path of the status file
+
+    Output:
+        - status, dictionary (see RollingGPSwaves.status) with the spectral values as NumPy
+          arrays, as createTX expects, or None if there is no readable status
+    """
+    try:
+        with open(statusFilename) as file:
+            status = json.load(file)
+    except (OSError, ValueError):
+        return None
+    for name in spectralNames:
+        if name in status:
+            status[name] = np.asarray(status[name], dtype=float)
+    return status
+
+
+class RollingFile:
+    """
+    GPS burst file returned by RollingGPSwaves.open_file; each line written by recordGPS goes to
+    the file and to the rolling estimate
+    """
+    def __init__(self, file, rolling):
+        self._file = file
+        self.rolling = rolling
+
+    def write(self, line):
+        self._file.write(line)
+        self.rolling.feed([line])
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RollingSink(GPSFileSink):
+    """
+    GPSFileSink returned by RollingGPSwaves.open_sink; drained GPS_DTYPE records go to the file
+    and to the rolling estimate
+    """
+    def __init__(self, filename, rolling):
+        super().__init__(filename)
+        self.rolling = rolling
+
+    def write_records(self, records):
+        super().write_records(records)
+        self.rolling.feed(records['line'])
+
+
+class RollingGPSwaves:
+    """
+    Incremental GPSwaves fed with NMEA sentences as they are recorded, with provisional estimates
+    written to a status file:
+
+        rolling = RollingGPSwaves(fs, statusFilename)
+        recordGPS(end_time, open_out=rolling.open_file)     # thread mode, or
+        producers['GPS'] = (recordGPS, GPS_DTYPE, capacity, rolling.open_sink)   # process mode
+        Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = rolling.finalize()
+
+    Input:
+        - fs, GPS sampling frequency [Hz]
+        - statusFilename, path of the status file; None to keep the estimates in memory only
+        - rollingWindows, a provisional estimate is written every rollingWindows completed
+          windows (0 for none)
+        - parseLines, number of lines buffered between parses
+    """
+    def __init__(self, fs, statusFilename=None, rollingWindows=1, parseLines=64):
+        self.fs = fs
+        self.statusFilename = statusFilename
+        self.rollingWindows = rollingWindows
+        self.parseLines = parseLines
+        self.estimator = GPSwavesEstimator(fs)
+        self.filename = ''
+        self.provisional = 0 # number of provisional estimates written
+
+        self._lines = []
+        self._z = np.zeros(0)      # elevations waiting for a velocity
+        self._uv = np.zeros((2, 0)) # velocities waiting for an elevation
+        self._sums = np.zeros(3)   # sums of u, v, and z (with a fix), for the means
+        self._counts = np.zeros(3, dtype=int)
+        self._last = (badValue, badValue) # last reported position
+        self._nextProvisional = rollingWindows
+
+    def open_file(self, filename):
+        """
+        open_out() for recordGPS in thread mode (see GPS/recordGPS.py)
+        """
+        self.filename = filename
+        return RollingFile(open(filename, 'w', newline='\n'), self)
+
+    def open_sink(self, filename):
+        """
+        GPS sink for acquire() in process mode (see utils/acquisition.py)
+        """
+        self.filename = filename
+        return RollingSink(filename, self)
+
+    def feed(self, lines):
+        """
+        Add NMEA lines (str or bytes); they are parsed once parseLines lines have been buffered
+        """
+        self._lines.extend(line.encode() if isinstance(line, str) else bytes(line) for line in lines)
+        if len(self._lines) >= self.parseLines:
+            self._parse()
+
+    def _parse(self):
+        """
+        Parse the buffered lines and add the matched GPGGA/GPVTG pairs to the estimator
+        """
+        lines = b''.join(self._lines).splitlines()
+        self._lines = []
+        ggaLines = [line for line in lines if b'GPGGA' in line]
+        vtgLines = [line for line in lines if b'GPVTG' in line and b'GPGGA' not in line]
+        gga = parse_sentences(ggaLines, _GPGGA, convert_GPGGA, fallback_GPGGA)[0]
+        vtg = parse_sentences(vtgLines, _GPVTG, convert_GPVTG, fallback_GPVTG)[0]
+
+        # as in GPStoUVZ: badValue elevation without a fix, velocity from speed over ground and track
+        # (badValue for lines which could not be parsed)
+        qual, altitude, latitude, longitude, _ = gga
+        fix = qual >= 1
+        self._z = np.concatenate((self._z, np.where(fix, altitude, badValue)))
+        self._uv = np.hstack((self._uv, velocity(*vtg)))
+        if fix.any():
+            self._last = (latitude[fix][-1], longitude[fix][-1])
+
+        # GPGGA and GPVTG sentences are paired in order
+        n = min(len(self._z), self._uv.shape[1])
+        if n == 0:
+            return
+        (u, v), z = self._uv[:, :n], self._z[:n]
+        self._uv, self._z = self._uv[:, n:], self._z[n:]
+        self._sums += [np.sum(u[u != badValue]), np.sum(v[v != badValue]), np.sum(z[z != badValue])]
+        self._counts += [np.sum(u != badValue), np.sum(v != badValue), np.sum(z != badValue)]
+        self.estimator.update(u, v, z)
+
+        if self.rollingWindows and self.estimator.windows >= self._nextProvisional:
+            self._nextProvisional = self.estimator.windows + self.rollingWindows
+            self.write('provisional')
+
+    def status(self, state, estimate):
+        """
+        Status file contents for an estimate
+
+        Input:
+            - state, 'provisional' or 'final'
+            - estimate, Hs, Tp, Dp, E, f, a1, b1, a2, b2, check
+
+        Output:
+            - status, dictionary of the estimate, the mean velocities and elevation, the last
+              position, and the burst progress
+        """
+        means = np.where(self._counts > 0, self._sums / np.maximum(self._counts, 1), badValue)
+        status = {'state': state,
+                  'time': datetime.utcnow().isoformat(),
+                  'filename': self.filename,
+                  'fs': self.fs,
+                  'num_points': int(self.estimator.welch.num_points),
+                  'windows': int(self.estimator.windows),
+                  'u_mean': float(means[0]), 'v_mean': float(means[1]), 'z_mean': float(means[2]),
+                  'last_lat': float(self._last[0]), 'last_lon': float(self._last[1])}
+        for name, value in zip(waveNames, estimate):
+            status[name] = np.asarray(value, dtype=float).tolist()
+        return status
+
+    def write(self, state):
+        """
+        Compute the estimate from the samples so far and write it to the status file
+
+        Output:
+            - estimate, Hs, Tp, Dp, E, f, a1, b1, a2, b2, check
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        estimate = self.estimator.finalize()
+        if state == 'provisional':
+            self.provisional += 1
+        logger.info(f'{state} GPSwaves estimate after {self.estimator.windows} windows: Hs={estimate[0]:.3f}, Tp={estimate[1]:.3f}, Dp={estimate[2]:.2f}')
+        if self.statusFilename:
+            try:
+                write_status(self.statusFilename, self.status(state, estimate))
+            except Exception as e:
+                logger.info(f'unable to write status file {self.statusFilename}: {e}')
+        return estimate
+
+    def finalize(self):
+        """
+        Parse the remaining lines and write the final estimate to the status file
+
+        Output:
+            - Hs, Tp, Dp, E, f, a1, b1, a2, b2, check (see GPSwaves)
+        """
+        self._parse()
+        return self.write('final')
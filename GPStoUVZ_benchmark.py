@@ -0,0 +1,93 @@
+## GPStoUVZ.py Benchmark Script
+"""
+Compares the vectorized GPStoUVZ parser against the previous per-line pynmea2 implementation,
+checking that both return the same GPS dictionary and reporting the run time of each. The
+previous implementation is read from git, at the commit before the vectorized parser was added
+(or at the revision given with --ref).
+
+Bursts are the GPS files in ./waves/testdata/ (or given as arguments). Without files, synthetic
+bursts of GPGGA/GPVTG sentences (testApps/rollingGPSwaves_test.py) are written at 4 Hz, with
+the fix lost for the first second, and at 25 Hz.
+
+Newer pynmea2 versions return timezone-aware timestamps, which the previous implementation
+cannot parse; its source is loaded with the timestamp made naive (see compatibility below).
+
+Usage (from the repository root):
+    python3 GPStoUVZ_benchmark.py [--ref REVISION] [GPS files...]
+"""
+import os, sys, glob, types, subprocess
+from timeit import default_timer as timer
+import numpy as np
+from GPS.GPStoUVZ import GPStoUVZ
+from testApps.rollingGPSwaves_test import sentences, dataDir as syntheticDir
+
+dataDir = './waves/testdata/'
+duration = 1920 # [s]
+nRepeats = 3
+compatibility = [("f'{ymd} {gpgga.timestamp}'", "f'{ymd} {gpgga.timestamp.replace(tzinfo=None)}'")] # newer pynmea2 timestamps are tz-aware
+
+def reference_revision():
+    """ parent of the commit which added parse_sentences to GPS/GPStoUVZ.py (HEAD if not committed yet) """
+    added = subprocess.run(['git', 'log', '-S', 'def parse_sentences', '--format=%H', '--', 'GPS/GPStoUVZ.py'],
+                           capture_output=True, text=True).stdout.split()
+    return added[-1] + '~1' if added else 'HEAD'
+
+def load_reference(revision, path, name):
+    """ load function name from path at a git revision """
+    source = subprocess.run(['git', 'show', f'{revision}:{path}'], capture_output=True, text=True, check=True).stdout
+    for old, new in compatibility:
+        source = source.replace(old, new)
+    module = types.ModuleType(name)
+    exec(compile(source, f'{revision}:{path}', 'exec'), module.__dict__)
+    return getattr(module, name)
+
+def synthetic_files():
+    """ synthetic GPS burst files named as recordGPS names them """
+    files = []
+    for fs, lostFix in [(4, True), (25, False)]:
+        gpsfile = os.path.join(syntheticDir, f'microSWIFT{fs:03d}_GPS_12Jul2021_210000UTC.dat')
+        with open(gpsfile, 'w') as file:
+            file.writelines(sentences(fs, duration, lostFix))
+        files.append(gpsfile)
+    return files
+
+def best_time(fun, gpsfile):
+    times = []
+    for _ in range(nRepeats):
+        start = timer()
+        GPS = fun(gpsfile)
+        times.append(timer() - start)
+    return GPS, min(times)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    revision = reference_revision()
+    if '--ref' in args:
+        revision = args.pop(args.index('--ref') + 1)
+        args.remove('--ref')
+    GPStoUVZ_legacy = load_reference(revision, 'GPS/GPStoUVZ.py', 'GPStoUVZ')
+    print(f'reference: GPS/GPStoUVZ.py at {revision}')
+
+    files = args or sorted(glob.glob(dataDir + '*_GPS_*.dat'))
+    if not files:
+        print(f'No GPS files found in {dataDir}; using synthetic bursts')
+        files = synthetic_files()
+
+    for gpsfile in files:
+        GPS_legacy, t_legacy = best_time(GPStoUVZ_legacy, gpsfile)
+        GPS, t_new = best_time(GPStoUVZ, gpsfile)
+
+        # compare outputs key by key
+        same = True
+        for key in GPS_legacy.keys():
+            if key == 'time':
+                match = np.array_equal(GPS[key], np.array(GPS_legacy[key], dtype='datetime64[ns]'))
+            else:
+                match = np.allclose(GPS[key], GPS_legacy[key], rtol=0, atol=1e-9, equal_nan=True)
+            if not match:
+                print(f'    {key} does not match')
+                same = False
+
+        print(f'{gpsfile}')
+        print(f'    samples: {len(GPS["u"])}; outputs match: {same}')
+        print(f'    legacy: {t_legacy:.3f} s; vectorized: {t_new:.3f} s; speed-up: {t_legacy/t_new:.1f}x')
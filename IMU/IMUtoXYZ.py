@@ -7,7 +7,9 @@ the output as python variables to be used in calculations for wave properties.
 Contents:
     - sec(n_secs)
     - datetimearray2relativetime(datetimeArr)
-    - RCfilter(b, fc, fs)
+    - RCrecurrence_blocked(b, alpha)
+    - RCrecurrence(b, alpha)
+    - RCfilter(b, fc, fs, zeroPhase=False)
     - add_ms_to_IMUtime(timestampSorted)
     - IMUtoXYZ(imufile,fs) [main]
 
@@ -15,6 +17,14 @@ Log:
     - Jun 2022, J.Davis: created IMUtoXYZ.py
     - Aug 2022, J.Davis: created integrateIMU.py and moved demean(), cumtrapz(), and integrate_acc() there
     - Aug 2022, J.Davis: created transformIMU.py and moved ekfCorrection() there
+    - Oct 2026: read binary IMU burst files (binaryIMU.py) in addition to the legacy .dat format
+    - Oct 2026: use the sub-second binary timestamps directly; add_ms_to_IMUtime() only for .dat files
+    - Oct 2026: vectorized RCfilter() (scipy lfilter, or a blocked NumPy recurrence) on stacked arrays
+    - Oct 2026: integrate all three axes at once with integrate_acc_batch()
+    - Oct 2026: datetime64[ns] time arrays instead of arrays of datetime objects; vectorized
+      add_ms_to_IMUtime() and datetimearray2relativetime()
+    - Oct 2026: interpolate acc, mag, and gyo onto the master clock together with resample()
+    - Oct 2026: dtype option; float32 processing after interpolation (precision mode)
 
 TODO:
     - remove reassignment of the same variable?
@@ -23,7 +33,13 @@ TODO:
 import numpy as np
 from logging import getLogger
 from datetime import datetime, timedelta
-from IMU.integrateIMU import integrate_acc
+from IMU.integrateIMU import integrate_acc_batch
+from IMU.binaryIMU import is_binary_IMU, read_binary_IMU
+from utils.resample import resample
+try:
+    from scipy.signal import lfilter
+except ImportError: # scipy is optional; RCrecurrence_blocked() is used instead
+    lfilter = None
 # from IMU.transformIMU import ekfCorrection
 # from scipy import integrate
 
@@ -47,33 +63,95 @@ def datetimearray2relativetime(datetimeArr):
     Helper function to convert datetime array to relative time in seconds
 
     Input:
-        - datetimeArr, input array of datetimes
+        - datetimeArr, input array of datetimes (datetime64, or datetime objects)
 
     Output:
         - relTime, time array (in seconds) relative to the first time in datetimeArr
     """
-    t0 = datetimeArr[0]
-    relTime = [timestep.total_seconds() for timestep in (datetimeArr-t0)]
+    datetimeArr = np.asarray(datetimeArr, dtype='datetime64[ns]')
+    relTime = (datetimeArr - datetimeArr[0]) / np.timedelta64(1, 's')
     return relTime
 
 
-def RCfilter(b, fc, fs):
+def RCrecurrence_blocked(b, alpha):
+    """
+    Helper function to evaluate the RC high-pass recurrence
+
+        a[0] = b[0];  a[n] = alpha * a[n-1] + alpha * ( b[n] - b[n-1] )
+
+    along the last axis of b with NumPy only. Within blocks of B samples the recurrence has the
+    closed form a[n0+j] = alpha^j * ( a[n0] + sum_{i<=j} alpha^(1-i) * (b[n0+i] - b[n0+i-1]) ),
+    a cumulative sum; B is chosen so alpha^(-B) stays below 1e3 to preserve precision, and only
+    the block boundaries are carried in a Python loop (about N/B iterations).
+
+    Input:
+        - b, array of values to be filtered (filtered along the last axis)
+        - alpha, filter coefficient, RC / (RC + 1/fs)
+
+    Output:
+        - a, array of filtered input values (float32 for float32 input, else float64)
+    """
+    b = np.asarray(b)
+    dtype = np.float32 if b.dtype == np.float32 else np.float64
+    b = b.astype(np.float64, copy=False) # blocks are scaled by up to 1e3; evaluate in double precision
+    a = np.empty_like(b)
+    n = b.shape[-1]
+    if n == 0:
+        return a.astype(dtype)
+    B = max(1, min(n, int(np.log(1e3) / -np.log(alpha))))
+    powers = alpha ** np.arange(1, B+1) # alpha^j, j = 1..B
+    d = np.diff(b, axis=-1) * alpha
+    a[..., 0] = b[..., 0]
+    for start in range(1, n, B):
+        m = min(B, n - start)
+        a[..., start:start+m] = powers[:m] * (a[..., start-1:start] + np.cumsum(d[..., start-1:start-1+m] / powers[:m], axis=-1))
+    return a.astype(dtype, copy=False)
+
+
+def RCrecurrence(b, alpha):
+    """
+    Helper function to evaluate the RC high-pass recurrence (see RCrecurrence_blocked) along the
+    last axis of b, as the IIR filter [alpha, -alpha] / [1, -alpha] with scipy.signal.lfilter if
+    available, and with RCrecurrence_blocked otherwise
+
+    Input:
+        - b, array of values to be filtered (filtered along the last axis)
+        - alpha, filter coefficient, RC / (RC + 1/fs)
+
+    Output:
+        - a, array of filtered input values (float32 for float32 input, else float64)
+    """
+    b = np.asarray(b)
+    if b.dtype != np.float32:
+        b = b.astype(np.float64, copy=False)
+    if lfilter is None or b.shape[-1] == 0:
+        return RCrecurrence_blocked(b, alpha)
+    coefficients = np.array([alpha, -alpha, 1., -alpha], dtype=b.dtype) # in the precision of b
+    zi = (1 - coefficients[0]) * b[..., :1] # initial state such that a[0] = b[0]
+    a, _ = lfilter(coefficients[:2], coefficients[2:], b, axis=-1, zi=zi)
+    return a
+
+
+def RCfilter(b, fc, fs, zeroPhase=False):
     """
     Helper function to perform RC filtering
 
     Input:
-        - b, array of values to be filtered
+        - b, array of values to be filtered; a stacked array, e.g. (3, N), is filtered along
+          its last axis in one call
         - fc, cutoff frequency, fc = 1/(2πRC)
         - fs, sampling frequency 
+        - zeroPhase, if True filter forward and then backward (zero phase, squared magnitude
+          response); each pass starts from the first value it is given, as the forward filter
 
     Output:
         - a, array of filtered input values
     """
     RC = (2*np.pi*fc)**(-1)
     alpha = RC / (RC + 1./fs)
-    a = b.copy()
-    for ui in np.arange(1,len(b)): # speed this up
-        a[ui] = alpha * a[ui-1] + alpha * ( b[ui] - b[ui-1] )
+    a = RCrecurrence(b, alpha)
+    if zeroPhase:
+        a = RCrecurrence(a[..., ::-1], alpha)[..., ::-1]
     return a
 
 
@@ -86,37 +164,45 @@ def add_ms_to_IMUtime(timestampSorted):
     either the start of end of the second.
 
     Input:
-        - timestampSorted, sorted array of rounded IMU timestamps (as datetimes)
+        - timestampSorted, sorted datetime64 array of rounded IMU timestamps
 
     Output:
-        - timestampSorted_ms, sorted datetime array with added milliseconds
+        - timestampSorted_ms, sorted datetime64[ns] array with added milliseconds
     """
-    timestampSorted_ms = timestampSorted.copy() 
-    i = 1
-    for n in np.arange(1, len(timestampSorted)):
-        if timestampSorted[n] == timestampSorted[n-1] and n != len(timestampSorted)-1: 
-            i += 1 # count number of occurences in second
-        else:
-            if n == len(timestampSorted)-1: # if in last second, manually increment i & n
-                i += 1; n += 1
-            dt0 = sec(float(i)**(-1)) # interpret current timestep size based on number of samples reported in this second  #
-            secSteps = np.arange(0,i)*dt0 # create array of time increments from zero
-            timestampSorted_ms[n-i:n] = timestampSorted[n-i:n] + secSteps
-            i = 1 # restart i at one so that it can start again on the next second 
-    return timestampSorted_ms
+    timestampSorted = np.asarray(timestampSorted, dtype='datetime64[ns]')
+    n = len(timestampSorted)
+    if n < 2:
+        return timestampSorted.copy()
+
+    # label runs of equal timestamps (one per clock second); as in the original per-sample
+    # loop, a last sample in a second of its own is counted with the second before it
+    newSecond = np.concatenate(([True], timestampSorted[1:] != timestampSorted[:-1]))
+    newSecond[-1] = False
+    runStart = np.flatnonzero(newSecond)
+    run = np.cumsum(newSecond) - 1
+    runLength = np.diff(np.append(runStart, n))
+
+    # interpret the timestep in each second from its number of samples (to the microsecond,
+    # as timedelta) and add whole steps from zero
+    dt0 = np.round(10**6 / runLength).astype('int64') * 1000 # [ns]
+    secSteps = (np.arange(n) - runStart[run]) * dt0[run]
+    return timestampSorted + secSteps.astype('timedelta64[ns]')
     
 
-def IMUtoXYZ(imufile,fs):
+def IMUtoXYZ(imufile,fs,dtype='float64'):
     """ 
     Main function to collate IMU and GPS records. The IMU fields are cropped to lie within the available 
     GPS record and then the GPS is interpolated up to the IMU rate using the IMU as the master time.
     
     Inputs:
-        - imufile, path to file containing IMU data
+        - imufile, path to file containing IMU data (binary or legacy comma-delimited)
         - fs, sampling frequency
+        - dtype, processing precision after interpolation onto the master clock, 'float64' or
+          'float32' (times are kept in float64)
         
     Outputs:
-        - IMU, dictionary containing acc ['ai'], vel ['vi'], pos ['pi'], and time ['time'] as entries
+        - IMU, dictionary containing acc ['ai'], vel ['vi'], pos ['pi'], and time ['time'] as entries;
+          time is a datetime64[ns] array
     
     Example:
         IMU = IMUtoXYZ(imufile,fs)
@@ -136,19 +222,26 @@ def IMUtoXYZ(imufile,fs):
     
     #--open imu file and read in acceleration, magnetometer, and gyroscope data
     logger.info('Reading and sorting IMU')
-    with open(imufile, 'r') as file: #encoding="utf8", errors='ignore'
-        for line in file:
-            currentLine = line.strip('\n').rstrip('\x00').split(',')
-            if currentLine[0] is not '':
-                timestamp.append(datetime.strptime(currentLine[0],'%Y-%m-%d %H:%M:%S'))
-                acc.append(list(map(float,currentLine[1:4])))  # acc = [ax,ay,az]
-                mag.append(list(map(float,currentLine[4:7])))  # mag = [mx,my,mz]
-                gyo.append(list(map(float,currentLine[7:10]))) # gyo = [gx,gy,gz]
-          
+    binaryFile = is_binary_IMU(imufile)
+    if binaryFile: # binary burst file; timestamps are epoch seconds at full resolution
+        _, epoch, acc, mag, gyo = read_binary_IMU(imufile)
+        seconds = np.floor(epoch) # split so that no precision is lost in scaling to nanoseconds
+        timestamp = (seconds.astype('int64')*10**9 + np.round((epoch - seconds)*10**9).astype('int64')).astype('datetime64[ns]')
+    else: # legacy comma-delimited file; timestamps are rounded to the second
+        with open(imufile, 'r') as file: #encoding="utf8", errors='ignore'
+            for line in file:
+                currentLine = line.strip('\n').rstrip('\x00').split(',')
+                if currentLine[0] != '':
+                    timestamp.append(currentLine[0]) # '%Y-%m-%d %H:%M:%S', converted below
+                    acc.append(list(map(float,currentLine[1:4])))  # acc = [ax,ay,az]
+                    mag.append(list(map(float,currentLine[4:7])))  # mag = [mx,my,mz]
+                    gyo.append(list(map(float,currentLine[7:10]))) # gyo = [gx,gy,gz]
+        timestamp = np.array(timestamp, dtype='datetime64[ns]')
+    logger.info(f'IMU samples read: {len(timestamp)}')
 
     #--sorting:
-    sortInd = np.asarray(timestamp).argsort()
-    timestampSorted = np.asarray(timestamp)[sortInd]
+    sortInd = timestamp.argsort(kind='stable') # keep the recorded order within each second
+    timestampSorted = timestamp[sortInd]
     accSorted = np.asarray(acc)[sortInd,:].transpose()
     magSorted = np.asarray(mag)[sortInd,:].transpose()
     gyoSorted = np.asarray(gyo)[sortInd,:].transpose()
@@ -200,30 +293,31 @@ def IMUtoXYZ(imufile,fs):
     print(f'Coordinate position {upIdx} assigned as up')
     logger.info(f'Coordinate position {upIdx} assigned as up')
 
-    # create a master time array based on the specified sampling frequency and the start and end times.
-    dt = sec(fs**(-1))
-    t0 = timestampSorted[0]
-    tf = timestampSorted[-1]
-    masterTime = np.arange(t0,tf,dt).astype(datetime)
+    # create a master time array based on the specified sampling frequency and the start and end times,
+    # and convert both time arrays to a relative number of total seconds
+    if binaryFile: # epoch timestamps with sub-second resolution; no reconstruction is needed
+        imuTimeSec    = datetimearray2relativetime(timestampSorted)
+        masterTimeSec = np.arange(0, imuTimeSec[-1], fs**(-1))
+        masterTime    = timestampSorted[0] + np.round(masterTimeSec*10**9).astype('timedelta64[ns]')
+    else:
+        dt = np.timedelta64(sec(fs**(-1))) # rounded to the microsecond
+        t0 = timestampSorted[0]
+        tf = timestampSorted[-1]
+        masterTime = np.arange(t0,tf,dt)
 
-    # add milliseconds to each second of the rounded IMU timestamps:
-    timestampSorted_ms = add_ms_to_IMUtime(timestampSorted)
+        # add milliseconds to each second of the rounded IMU timestamps:
+        timestampSorted_ms = add_ms_to_IMUtime(timestampSorted)
+
+        masterTimeSec = datetimearray2relativetime(masterTime)
+        imuTimeSec    = datetimearray2relativetime(timestampSorted_ms)
 
     #--Interpolate IMU onto master clock
     logger.info('Interpolating IMU onto master clock')
-    # convert datetime ranges to a relative number of total seconds
-    masterTimeSec = datetimearray2relativetime(masterTime)
-    imuTimeSec    = datetimearray2relativetime(timestampSorted_ms)
-
-    #interpolate
-    accInterp = [np.interp(masterTimeSec,imuTimeSec,a) for a in accSorted]
-    magInterp = [np.interp(masterTimeSec,imuTimeSec,m) for m in magSorted]
-    gyoInterp = [np.interp(masterTimeSec,imuTimeSec,g) for g in gyoSorted]
-
-    #cnt number of NaNs TODO: handle nans; log?
-    np.isnan(accInterp).sum()
-    np.isnan(magInterp).sum()
-    np.isnan(gyoInterp).sum()
+    #interpolate all nine channels with one index/weight table
+    accInterp, magInterp, gyoInterp = resample(np.concatenate([accSorted, magSorted, gyoSorted]).astype(dtype), imuTimeSec, masterTimeSec).reshape(3, 3, -1)
+
+    #cnt number of NaNs TODO: handle nans
+    logger.info(f'NaNs after interpolation (acc, mag, gyo): {np.isnan(accInterp).sum()}, {np.isnan(magInterp).sum()}, {np.isnan(gyoInterp).sum()}')
     
     #-- reference frame transformation #TODO: reference frame transformation 
     # ax_earth, ay_earth, az_earth = ekfCorrection(*accInterp,*gyoInterp,*magInterp)
@@ -234,13 +328,13 @@ def IMUtoXYZ(imufile,fs):
     logger.info('Integrating IMU')
     fc = 0.04
     filt = lambda *b : RCfilter(*b,fc,fs)
-    # X,Y,Z=[integrate_acc(a,masterTimeSec,filt) for a in accEarth][:] # X = [ax,ay,az], Y = ... 
-    X,Y,Z=[integrate_acc(a,masterTimeSec,filt) for a in accInterp][:] # X = [ax,ay,az], Y = ... 
+    # XYZ = integrate_acc_batch(accEarth,masterTimeSec,filt)
+    XYZ = integrate_acc_batch(accInterp,masterTimeSec,filt) # XYZ = [[ax,ay,az],[vx,vy,vz],[px,py,pz]]
     
     # assign outputs to IMU dict
-    IMU['ax'],IMU['vx'],IMU['px'] = X # IMU.update({'ax': X[0], 'ay': Y[0], 'az': Z[0]})
-    IMU['ay'],IMU['vy'],IMU['py'] = Y
-    IMU['az'],IMU['vz'],IMU['pz'] = Z
+    IMU['ax'],IMU['ay'],IMU['az'] = XYZ[0]
+    IMU['vx'],IMU['vy'],IMU['vz'] = XYZ[1]
+    IMU['px'],IMU['py'],IMU['pz'] = XYZ[2]
     IMU['time'] = masterTime
     
     logger.info('--------------------------------------------')
@@ -69,14 +69,21 @@ _GYRO_REGISTER_OUT_Y_MSB  = const(0x03)
 _GYRO_REGISTER_OUT_Y_LSB  = const(0x04)
 _GYRO_REGISTER_OUT_Z_MSB  = const(0x05)
 _GYRO_REGISTER_OUT_Z_LSB  = const(0x06)
+_GYRO_REGISTER_F_STATUS   = const(0x08)
+_GYRO_REGISTER_F_SETUP    = const(0x09)  # 00000000   r/w
 _GYRO_REGISTER_WHO_AM_I   = const(0x0C)   # 11010111   r
 _GYRO_REGISTER_CTRL_REG0  = const(0x0D)  # 00000000   r/w
 _GYRO_REGISTER_CTRL_REG1  = const(0x13)  # 00000000   r/w
 _GYRO_REGISTER_CTRL_REG2  = const(0x14)  # 00000000   r/w
+_GYRO_REGISTER_CTRL_REG3  = const(0x15)  # 00000000   r/w
 _GYRO_SENSITIVITY_250DPS  = 0.0078125    # Table 35 of datasheet
 _GYRO_SENSITIVITY_500DPS  = 0.015625     # ..
 _GYRO_SENSITIVITY_1000DPS = 0.03125     # ..
 _GYRO_SENSITIVITY_2000DPS = 0.0625      # ..
+_GYRO_FIFO_SIZE           = 32
+# CTRL_REG1 data rate bits (Hz: dr bits), Table 45 of datasheet
+_GYRO_DATA_RATES          = {800: 0x00, 400: 0x04, 200: 0x08, 100: 0x0C,
+                             50: 0x10, 25: 0x14, 12.5: 0x18}
 
 # User facing constants/module globals:
 GYRO_RANGE_250DPS   = 250
@@ -139,32 +146,76 @@ class FXAS21002C:
             self._BUFFER[1] = val & 0xFF
             i2c.write(self._BUFFER, end=2)
 
+    def read_all(self):
+        """Read the raw gyroscope readings in a single I2C transaction and
+        decode them with one unpack.  Returns a 3-tuple of X, Y, Z axis
+        16-bit signed values.
+        """
+        with self._device as i2c:
+            self._BUFFER[0] = _GYRO_REGISTER_OUT_X_MSB
+            i2c.write_then_readinto(self._BUFFER, self._BUFFER,
+                                    out_end=1, in_end=6)
+        return struct.unpack_from('>3h', self._BUFFER)
+
     def read_raw(self):
         """Read the raw gyroscope readings.  Returns a 3-tuple of X, Y, Z axis
         16-bit signed values.  If you want the gyroscope values in friendly
         units consider using the gyroscope property!
         """
-        # Read gyro data from the sensor.
-        with self._device as i2c:
-            self._BUFFER[0] = _GYRO_REGISTER_OUT_X_MSB
-            i2c.write_then_readinto(self._BUFFER, self._BUFFER,
-                                    out_end=1)
-        # Parse out the gyroscope data as 16-bit signed data.
-        raw_x = struct.unpack_from('>h', self._BUFFER[0:2])[0]
-        raw_y = struct.unpack_from('>h', self._BUFFER[2:4])[0]
-        raw_z = struct.unpack_from('>h', self._BUFFER[4:6])[0]
-        return (raw_x, raw_y, raw_z)
+        return self.read_all()
+
+    def enable_fifo(self, watermark=16, data_rate=25):
+        """Enable the FIFO in circular mode so the gyroscope is sampled by the
+        hardware at data_rate (Hz) and buffered on chip (up to 32 samples)
+        until drained with read_fifo().
+        """
+        assert 0 < watermark <= _GYRO_FIFO_SIZE
+        assert data_rate in _GYRO_DATA_RATES
+        # Ready mode (standby is avoided, see __init__) to change the FIFO setup
+        self._write_u8(_GYRO_REGISTER_CTRL_REG1, _GYRO_DATA_RATES[data_rate] | 0x01)
+        # Circular buffer mode with watermark
+        self._write_u8(_GYRO_REGISTER_F_SETUP, 0x40 | watermark)
+        # WRAPTOONE: burst reads roll over from OUT_Z_LSB to OUT_X_MSB
+        self._write_u8(_GYRO_REGISTER_CTRL_REG3, 0x08)
+        # Active
+        self._write_u8(_GYRO_REGISTER_CTRL_REG1, _GYRO_DATA_RATES[data_rate] | 0x02)
+        self._fifo_buffer = bytearray(6 * _GYRO_FIFO_SIZE)
+        time.sleep(0.1) # 60 ms + 1/ODR
+
+    def disable_fifo(self):
+        """Disable the FIFO and restore the microSWIFT polling settings."""
+        self._write_u8(_GYRO_REGISTER_CTRL_REG1, ctrl_reg1 & 0xFC | 0x01)
+        self._write_u8(_GYRO_REGISTER_F_SETUP, 0x00)
+        self._write_u8(_GYRO_REGISTER_CTRL_REG3, 0x00)
+        self._write_u8(_GYRO_REGISTER_CTRL_REG1, ctrl_reg1)
+
+    def read_fifo(self):
+        """Drain the FIFO in a single burst read.  Returns a 2-tuple:
+
+        - list of X, Y, Z axis 16-bit signed raw value 3-tuples, oldest first
+        - True if the FIFO overflowed (samples were lost) since the last read
+        """
+        # F_STATUS: f_ovf (bit 7), f_wmkf (bit 6), and f_cnt (bits 5:0)
+        status = self._read_u8(_GYRO_REGISTER_F_STATUS)
+        count = status & 0x3F
+        gyro_raw = []
+        if count:
+            with self._device as i2c:
+                self._fifo_buffer[0] = _GYRO_REGISTER_OUT_X_MSB
+                i2c.write_then_readinto(self._fifo_buffer, self._fifo_buffer,
+                                        out_end=1, in_end=6 * count)
+            raw = struct.unpack_from('>%dh' % (3 * count), self._fifo_buffer)
+            gyro_raw = [raw[i:i + 3] for i in range(0, 3 * count, 3)]
+        return gyro_raw, bool(status & 0x80)
 
     # pylint is confused and incorrectly marking this function as bad return
     # types.  Perhaps it doesn't understand map returns an iterable value.
     # Disable the warning.
     @property
-    def gyroscope(self):
-        """Read the gyroscope value and return its X, Y, Z axis values as a
-        3-tuple in degrees/second.
+    def gyro_scale(self):
+        """Factor to convert raw gyroscope counts to degrees/second at the
+        current range.
         """
-        raw = self.read_raw()
-        # Compensate values depending on the resolution
         factor = 0
         if self._gyro_range == GYRO_RANGE_250DPS:
             factor = _GYRO_SENSITIVITY_250DPS
@@ -174,4 +225,14 @@ class FXAS21002C:
             factor = _GYRO_SENSITIVITY_1000DPS
         elif self._gyro_range == GYRO_RANGE_2000DPS:
             factor = _GYRO_SENSITIVITY_2000DPS
+        return factor
+
+    @property
+    def gyroscope(self):
+        """Read the gyroscope value and return its X, Y, Z axis values as a
+        3-tuple in degrees/second.
+        """
+        raw = self.read_raw()
+        # Compensate values depending on the resolution
+        factor = self.gyro_scale
         return [x * factor for x in raw]
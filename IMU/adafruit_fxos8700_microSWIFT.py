@@ -67,6 +67,7 @@ _FXOS8700_REGISTER_OUT_Y_MSB    = const(0x03)
 _FXOS8700_REGISTER_OUT_Y_LSB    = const(0x04)
 _FXOS8700_REGISTER_OUT_Z_MSB    = const(0x05)
 _FXOS8700_REGISTER_OUT_Z_LSB    = const(0x06)
+_FXOS8700_REGISTER_F_SETUP      = const(0x09)   # 00000000   r/w
 _FXOS8700_REGISTER_WHO_AM_I     = const(0x0D)   # 11000111   r
 _FXOS8700_REGISTER_XYZ_DATA_CFG = const(0x0E)
 _FXOS8700_REGISTER_CTRL_REG1    = const(0x2A)   # 00000000   r/w
@@ -89,6 +90,9 @@ _ACCEL_MG_LSB_4G                = 0.000488
 _ACCEL_MG_LSB_8G                = 0.000976
 _MAG_UT_LSB                     = 0.1
 _SENSORS_GRAVITY_STANDARD       = 9.80665
+_FIFO_SIZE                      = 32
+# CTRL_REG1 data rate bits in hybrid mode (Hz: dr bits)
+_HYBRID_DATA_RATES              = {400: 0x00, 200: 0x08, 100: 0x10, 50: 0x18, 25: 0x20, 6.25: 0x28}
 # pylint: enable=bad-whitespace
 
 # User-facing constants/module-level globals:
@@ -157,6 +161,26 @@ class FXOS8700:
             self._BUFFER[1] = val & 0xFF
             i2c.write(self._BUFFER, end=2)
 
+    def read_all(self):
+        """Read the raw accelerometer and magnetometer readings in a single I2C
+        transaction.  With hybrid auto-increment enabled (MCTRL_REG2, set in
+        __init__) a 12-byte burst read from OUT_X_MSB continues from OUT_Z_LSB
+        into MOUT_X_MSB, so the whole block is decoded with one unpack.
+        Returns a 2-tuple of 3-tuples:
+
+        - Accelerometer X, Y, Z axis 14-bit signed raw values
+        - Magnetometer X, Y, Z axis 16-bit signed raw values
+        """
+        with self._device as i2c:
+            self._BUFFER[0] = _FXOS8700_REGISTER_OUT_X_MSB
+            i2c.write_then_readinto(self._BUFFER, self._BUFFER,
+                                    out_end=1, in_end=12)
+        raw = struct.unpack_from('>6h', self._BUFFER)
+        # Accelerometer data is 14-bit left aligned 2's compliment, so an
+        # arithmetic shift of the signed 16-bit value gives the signed value.
+        return ((raw[0] >> 2, raw[1] >> 2, raw[2] >> 2),
+                (raw[3], raw[4], raw[5]))
+
     def read_raw_accel_mag(self):
         """Read the raw accelerometer and magnetometer readings.  Returns a
         2-tuple of 3-tuples:
@@ -167,38 +191,67 @@ class FXOS8700:
         If you want the acceleration or magnetometer values in friendly units
         consider using the accelerometer and magnetometer properties!
         """
-        # Read accelerometer data from sensor.
-        with self._device as i2c:
-            self._BUFFER[0] = _FXOS8700_REGISTER_OUT_X_MSB
-            i2c.write_then_readinto(self._BUFFER, self._BUFFER,
-                                    out_end=1, in_end=6)
-        accel_raw_x = struct.unpack_from('>H', self._BUFFER[0:2])[0]
-        accel_raw_y = struct.unpack_from('>H', self._BUFFER[2:4])[0]
-        accel_raw_z = struct.unpack_from('>H', self._BUFFER[4:6])[0]
-        # Convert accelerometer data to signed 14-bit value from 16-bit
-        # left aligned 2's compliment value.
-        accel_raw_x = _twos_comp(accel_raw_x >> 2, 14)
-        accel_raw_y = _twos_comp(accel_raw_y >> 2, 14)
-        accel_raw_z = _twos_comp(accel_raw_z >> 2, 14)
-        # Read magnetometer data from sensor.  No need to convert as this is
-        # 16-bit signed data so struct parsing can handle it directly.
+        return self.read_all()
+
+    def enable_fifo(self, watermark=16, data_rate=25):
+        """Enable the accelerometer FIFO in circular mode so the sensor is
+        sampled by the hardware at data_rate (Hz, hybrid mode output data rate)
+        and buffered on chip (up to 32 samples) until drained with read_fifo().
+        The magnetometer is not buffered by the FIFO.
+        """
+        assert 0 < watermark <= _FIFO_SIZE
+        assert data_rate in _HYBRID_DATA_RATES
+        # Standby is required to change the FIFO setup and data rate
+        self._write_u8(_FXOS8700_REGISTER_CTRL_REG1, 0)
+        # Circular buffer mode with watermark
+        self._write_u8(_FXOS8700_REGISTER_F_SETUP, 0x40 | watermark)
+        # FIFO burst reads roll over from OUT_Z_LSB to OUT_X_MSB, so the hybrid
+        # auto-increment into the magnetometer registers is switched off
+        self._write_u8(_FXOS8700_REGISTER_MCTRL_REG2, 0x00)
+        # Active, Normal Mode, Low Noise, data_rate in Hybrid Mode
+        self._write_u8(_FXOS8700_REGISTER_CTRL_REG1,
+                       _HYBRID_DATA_RATES[data_rate] | 0x05)
+        self._fifo_buffer = bytearray(6 * _FIFO_SIZE)
+
+    def disable_fifo(self):
+        """Disable the FIFO and restore the microSWIFT polling settings."""
+        self._write_u8(_FXOS8700_REGISTER_CTRL_REG1, 0)
+        self._write_u8(_FXOS8700_REGISTER_F_SETUP, 0x00)
+        self._write_u8(_FXOS8700_REGISTER_MCTRL_REG2, 0x20)
+        self._write_u8(_FXOS8700_REGISTER_CTRL_REG1, 0x25)
+
+    def read_fifo(self):
+        """Drain the accelerometer FIFO in a single burst read and read the
+        latest magnetometer values.  Returns a 3-tuple:
+
+        - list of accelerometer X, Y, Z 14-bit signed raw value 3-tuples,
+          oldest first
+        - Magnetometer X, Y, Z axis 16-bit signed raw values
+        - True if the FIFO overflowed (samples were lost) since the last read
+        """
+        # With the FIFO enabled the status register reports the FIFO status:
+        # f_ovf (bit 7), f_wmrk_flag (bit 6), and f_cnt (bits 5:0)
+        status = self._read_u8(_FXOS8700_REGISTER_STATUS)
+        count = status & 0x3F
+        accel_raw = []
+        if count:
+            with self._device as i2c:
+                self._fifo_buffer[0] = _FXOS8700_REGISTER_OUT_X_MSB
+                i2c.write_then_readinto(self._fifo_buffer, self._fifo_buffer,
+                                        out_end=1, in_end=6 * count)
+            raw = struct.unpack_from('>%dh' % (3 * count), self._fifo_buffer)
+            accel_raw = [(raw[i] >> 2, raw[i + 1] >> 2, raw[i + 2] >> 2)
+                         for i in range(0, 3 * count, 3)]
         with self._device as i2c:
             self._BUFFER[0] = _FXOS8700_REGISTER_MOUT_X_MSB
             i2c.write_then_readinto(self._BUFFER, self._BUFFER,
                                     out_end=1, in_end=6)
-        mag_raw_x = struct.unpack_from('>h', self._BUFFER[0:2])[0]
-        mag_raw_y = struct.unpack_from('>h', self._BUFFER[2:4])[0]
-        mag_raw_z = struct.unpack_from('>h', self._BUFFER[4:6])[0]
-        return ((accel_raw_x, accel_raw_y, accel_raw_z),
-                (mag_raw_x, mag_raw_y, mag_raw_z))
+        mag_raw = struct.unpack_from('>3h', self._BUFFER)
+        return accel_raw, mag_raw, bool(status & 0x80)
 
     @property
-    def accelerometer(self):
-        """Read the acceleration from the accelerometer and return its X, Y, Z axis values as a
-           3-tuple in m/s^2.
-        """
-        accel_raw, _ = self.read_raw_accel_mag()
-        # Convert accel values to m/s^2
+    def accel_scale(self):
+        """Factor to convert raw accelerometer counts to m/s^2 at the current range."""
         factor = 0
         if self._accel_range == ACCEL_RANGE_2G:
             factor = _ACCEL_MG_LSB_2G
@@ -206,7 +259,22 @@ class FXOS8700:
             factor = _ACCEL_MG_LSB_4G
         elif self._accel_range == ACCEL_RANGE_8G:
             factor = _ACCEL_MG_LSB_8G
-        return [x * factor * _SENSORS_GRAVITY_STANDARD for x in accel_raw]
+        return factor * _SENSORS_GRAVITY_STANDARD
+
+    @property
+    def mag_scale(self):
+        """Factor to convert raw magnetometer counts to uTeslas."""
+        return _MAG_UT_LSB
+
+    @property
+    def accelerometer(self):
+        """Read the acceleration from the accelerometer and return its X, Y, Z axis values as a
+           3-tuple in m/s^2.
+        """
+        accel_raw, _ = self.read_raw_accel_mag()
+        # Convert accel values to m/s^2
+        factor = self.accel_scale
+        return [x * factor for x in accel_raw]
 
     @property
     def magnetometer(self):
@@ -0,0 +1,164 @@
+"""
+A collection of functions to write and read binary IMU burst files, and to convert between
+the binary format and the legacy comma-delimited (.dat) format.
+
+Each binary file starts with a fixed-size header which holds the sensor ranges and the factors
+used to scale the raw counts to physical units, followed by fixed-width records of an epoch
+timestamp (float64, seconds) and the raw accelerometer, magnetometer, and gyroscope counts
+(int16). All values are little-endian.
+
+    header: magic (6s), version (B), accel range [g] (B), gyro range [dps] (H), reserved (H),
+            accel scale [m/s^2/count] (d), mag scale [uT/count] (d), gyro scale [dps/count] (d)
+    record: time (d), ax, ay, az, mx, my, mz, gx, gy, gz (9h)
+
+Contents:
+    - BinaryIMUWriter(filename, accel_range, gyro_range, accel_scale, mag_scale, gyro_scale)
+    - is_binary_IMU(imufile)
+    - read_binary_IMU(imufile, raw=False)
+    - dat_to_bin(datfile, binfile, accel_range, gyro_range, accel_scale, mag_scale, gyro_scale)
+    - bin_to_dat(binfile, datfile)
+"""
+#--Import Statements
+import os
+import struct
+import numpy as np
+from datetime import datetime, timezone
+
+#--Constants
+IMU_MAGIC   = b'mSWIMU'
+IMU_VERSION = 1
+IMU_HEADER  = struct.Struct('<6sBBHHddd')
+IMU_RECORD  = struct.Struct('<d9h')
+IMU_DTYPE   = np.dtype([('time', '<f8'), ('acc', '<i2', (3,)), ('mag', '<i2', (3,)), ('gyo', '<i2', (3,))])
+
+#--helper functions:
+class BinaryIMUWriter:
+    """
+    Buffered writer for binary IMU burst files. Use as a context manager:
+
+        with BinaryIMUWriter(filename, 2, 500, accel_scale, mag_scale, gyro_scale) as imu_out:
+            imu_out.write(timestamp, accel_raw, mag_raw, gyro_raw)
+
+    Arrays of IMU_DTYPE records (e.g. from a SharedRingBuffer) are written with write_records().
+    """
+    def __init__(self, filename, accel_range, gyro_range, accel_scale, mag_scale, gyro_scale, buffering=8192):
+        self.filename = filename
+        self.samples = 0
+        self._file = open(filename, 'wb', buffering=buffering)
+        self._file.write(IMU_HEADER.pack(IMU_MAGIC, IMU_VERSION, accel_range, gyro_range, 0,
+                                         accel_scale, mag_scale, gyro_scale))
+
+    def write(self, timestamp, accel_raw, mag_raw, gyro_raw):
+        """
+        Write a single sample: epoch timestamp [s] and 3-tuples of raw accel, mag, and gyro counts
+        """
+        self._file.write(IMU_RECORD.pack(timestamp, *accel_raw, *mag_raw, *gyro_raw))
+        self.samples += 1
+
+    def write_records(self, records):
+        """
+        Write an array of IMU_DTYPE records at once
+        """
+        self._file.write(np.ascontiguousarray(records, dtype=IMU_DTYPE).tobytes())
+        self.samples += len(records)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_binary_IMU(imufile):
+    """
+    Helper function to check whether an IMU file is in the binary format
+
+    Input:
+        - imufile, path to IMU file
+
+    Output:
+        - True if the file starts with the binary IMU header
+    """
+    with open(imufile, 'rb') as file:
+        return file.read(len(IMU_MAGIC)) == IMU_MAGIC
+
+
+def read_binary_IMU(imufile, raw=False):
+    """
+    Read a binary IMU file in a single call
+
+    Input:
+        - imufile, path to binary IMU file
+        - raw, if True return the raw int16 counts instead of scaled values
+
+    Output:
+        - header, dictionary of header fields
+        - time, epoch timestamps [s]
+        - acc, (N, 3) acceleration [m/s^2]
+        - mag, (N, 3) magnetic field [uT]
+        - gyo, (N, 3) angular rate [dps]
+    """
+    with open(imufile, 'rb') as file:
+        magic, version, accel_range, gyro_range, _, accel_scale, mag_scale, gyro_scale = IMU_HEADER.unpack(file.read(IMU_HEADER.size))
+    if magic != IMU_MAGIC:
+        raise ValueError(f'{imufile} is not a binary IMU file')
+    header = {'version':version, 'accel_range':accel_range, 'gyro_range':gyro_range,
+              'accel_scale':accel_scale, 'mag_scale':mag_scale, 'gyro_scale':gyro_scale}
+
+    # read whole records only (the last record may be incomplete if recording was interrupted)
+    count = (os.path.getsize(imufile) - IMU_HEADER.size) // IMU_DTYPE.itemsize
+    records = np.fromfile(imufile, dtype=IMU_DTYPE, count=count, offset=IMU_HEADER.size)
+    if raw:
+        return header, records['time'], records['acc'], records['mag'], records['gyo']
+    acc = records['acc'] * accel_scale
+    mag = records['mag'] * mag_scale
+    gyo = records['gyo'] * gyro_scale
+    return header, records['time'], acc, mag, gyo
+
+
+def dat_to_bin(datfile, binfile, accel_range, gyro_range, accel_scale, mag_scale, gyro_scale):
+    """
+    Convert a legacy comma-delimited IMU file ('%Y-%m-%d %H:%M:%S', ax, ay, az, mx, my, mz, gx, gy, gz)
+    to the binary format, quantizing the values back to raw counts with the given scale factors
+
+    Input:
+        - datfile, path to legacy IMU file
+        - binfile, path to binary IMU file to create
+        - accel_range, gyro_range, accel_scale, mag_scale, gyro_scale, sensor settings for the header
+
+    Output:
+        - samples, number of samples converted
+    """
+    with open(datfile, 'r') as file, BinaryIMUWriter(binfile, accel_range, gyro_range, accel_scale, mag_scale, gyro_scale) as imu_out:
+        for line in file:
+            currentLine = line.strip('\n').rstrip('\x00').split(',')
+            if currentLine[0] == '':
+                continue
+            timestamp = datetime.strptime(currentLine[0],'%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+            values = np.asarray(currentLine[1:10], dtype=float)
+            counts = np.round(values / np.repeat([accel_scale, mag_scale, gyro_scale], 3)).astype(int)
+            imu_out.write(timestamp, counts[0:3], counts[3:6], counts[6:9])
+    return imu_out.samples
+
+
+def bin_to_dat(binfile, datfile):
+    """
+    Convert a binary IMU file to the legacy comma-delimited format (timestamps are rounded down
+    to whole seconds, as written by the legacy recorder)
+
+    Input:
+        - binfile, path to binary IMU file
+        - datfile, path to legacy IMU file to create
+
+    Output:
+        - samples, number of samples converted
+    """
+    _, time, acc, mag, gyo = read_binary_IMU(binfile)
+    with open(datfile, 'w', newline='\n') as imu_out:
+        for t, a, m, g in zip(time, acc, mag, gyo):
+            timestamp = '{:%Y-%m-%d %H:%M:%S}'.format(datetime.utcfromtimestamp(t))
+            imu_out.write('%s,%f,%f,%f,%f,%f,%f,%f,%f,%f\n' %(timestamp,*a,*m,*g))
+    return len(time)
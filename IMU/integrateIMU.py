@@ -8,10 +8,13 @@ Contents:
     - tupleset(t, i, value)
     - cumtrapz(y, x=None, dx=1.0, axis=-1, initial=None)
     - integrate_acc(a,t,filt) [main]
+    - integrate_acc_batch(a,t,filt)
 
 Log:
     - Aug 2022, J.Davis: created integrateIMU.py
     - Aug 25, 2022, J. Davis: swapped order of demean and post-filter zeroing
+    - Oct 2026: integrate_acc_batch() for all three axes at once
+    - Oct 2026: integrate_acc_batch() keeps float32 input in single precision
 """
 import numpy as np
 from numpy import add, diff, asarray
@@ -166,4 +169,44 @@ def integrate_acc(a,t,filt):
     return ai,vi,pi
 
 
-    
\ No newline at end of file
+def integrate_acc_batch(a,t,filt):
+    """
+    Helper function to perform double integration of the acceleration values of all axes at
+    once; the same steps as integrate_acc, applied in place to a single preallocated array
+
+    Input:
+        - a, (3, N) acceleration array (or any (..., N) stack of acceleration arrays); float32
+          input is integrated in float32, anything else in float64
+        - t, time array (N,)
+        - filt, filter function which accepts a stacked array (e.g. RCfilter)
+
+    Output:
+        - XYZ, (3, 3, N) array: XYZ[0] acceleration, XYZ[1] velocity, XYZ[2] position, each
+          with the axes along the second dimension (e.g. XYZ[1, 2] is vz)
+    """
+    # determine 30 second window to zero out after filtering
+    fs = np.mean(np.diff(t))**(-1)
+    zeroPts = int(np.round(30*fs))
+
+    a = np.asarray(a)
+    dtype = np.float32 if a.dtype == np.float32 else np.float64
+    XYZ = np.empty((3,) + a.shape, dtype=dtype)
+    halfdt = (np.diff(t) / 2.0).astype(dtype) # time steps from the float64 times
+    trapezoids = np.empty(a.shape[:-1] + (a.shape[-1]-1,), dtype=dtype)
+
+    ai = XYZ[0]
+    ai[...] = a
+    ai -= np.mean(ai, axis=-1, keepdims=True)
+    ai[..., :zeroPts] = 0 # zero initial oscillations from filtering
+
+    for prev, current in [(XYZ[0], XYZ[1]), (XYZ[1], XYZ[2])]:
+        # cumulative trapezoidal integration (cumtrapz with initial=0) into the output
+        np.add(prev[..., 1:], prev[..., :-1], out=trapezoids)
+        trapezoids *= halfdt
+        current[..., 0] = 0
+        np.cumsum(trapezoids, axis=-1, out=current[..., 1:])
+        current[...] = filt(current)
+        current -= np.mean(current, axis=-1, keepdims=True)
+        current[..., :zeroPts] = 0
+
+    return XYZ
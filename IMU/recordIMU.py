@@ -3,6 +3,13 @@
 authors: @EJRainville, @AlexdeKlerk, @Viviana Castillo
 
 Description: This function initializes and records IMU data
+
+Log:
+    - Oct 2026: record raw counts to a binary burst file (see binaryIMU.py) instead of CSV text
+    - Oct 2026: timestamp samples with a monotonic clock anchored to UTC at burst start
+    - Oct 2026: replaced the fixed sleep with deadline-driven sampling at imuFreq (see sampleIMU.py)
+    - Oct 2026: optional hardware FIFO mode (fifo_watermark in Config.dat)
+    - Oct 2026: output opened through open_out() so the recorder can run in its own process
 '''
 
 #standard imports 
@@ -20,6 +27,8 @@ import RPi.GPIO as GPIO
 # IMU sensor imports
 import IMU.adafruit_fxos8700_microSWIFT
 import IMU.adafruit_fxas21002c_microSWIFT
+from IMU.binaryIMU import BinaryIMUWriter
+from IMU.sampleIMU import sample_IMU, sample_IMU_fifo
 
 # Configuration imports
 from utils.config3 import Config
@@ -44,8 +53,11 @@ bad = config.getInt('System', 'badValue')
 
 #IMU parameters
 imuFreq=config.getFloat('IMU', 'imuFreq')
-imu_samples = imuFreq*burst_seconds
+imu_samples = int(round(imuFreq*burst_seconds))
 imu_gpio=config.getInt('IMU', 'imu_gpio')
+fifo_watermark=config.getInt('IMU', 'fifo_watermark') or 0 # 0 = poll single samples
+accel_range_g = 2     # +/- 2 g
+gyro_range_dps = 500  # +/- 500 deg/s
 
 #initialize IMU GPIO pin as modem on/off control
 GPIO.setmode(GPIO.BCM)
@@ -54,7 +66,19 @@ GPIO.setup(imu_gpio,GPIO.OUT)
 GPIO.output(imu_gpio,GPIO.HIGH)
 
 
-def recordIMU(end_time):
+def recordIMU(end_time, open_out=BinaryIMUWriter):
+    """
+    Initialize the IMU and record a burst until end_time (minutes past the hour)
+
+    Input:
+        - end_time, burst end time
+        - open_out, function opening the output for samples, open_out(filename, **header); by default
+          a binary IMU file (see utils/acquisition.py for recording into a shared-memory ring buffer)
+
+    Output:
+        - IMUdataFilename, name of the IMU burst file
+        - imu_initialized, True if the IMU initialized
+    """
     # IMU is not Initialzied at first
     imu_initialized = False
 
@@ -68,8 +92,13 @@ def recordIMU(end_time):
         logger.info('power on IMU')
         GPIO.output(imu_gpio,GPIO.HIGH)
         i2c = busio.I2C(board.SCL, board.SDA)
-        fxos = IMU.adafruit_fxos8700_microSWIFT.FXOS8700(i2c, accel_range=0x00)
-        fxas = IMU.adafruit_fxas21002c_microSWIFT.FXAS21002C(i2c, gyro_range=500)
+        fxos = IMU.adafruit_fxos8700_microSWIFT.FXOS8700(i2c, accel_range=IMU.adafruit_fxos8700_microSWIFT.ACCEL_RANGE_2G)
+        fxas = IMU.adafruit_fxas21002c_microSWIFT.FXAS21002C(i2c, gyro_range=gyro_range_dps)
+        if fifo_watermark > 0:
+            # hardware-timed sampling at imuFreq, buffered in the sensor FIFOs
+            fxos.enable_fifo(fifo_watermark, imuFreq)
+            fxas.enable_fifo(fifo_watermark, imuFreq)
+            logger.info('IMU FIFO enabled with watermark {}'.format(fifo_watermark))
 
         # Sleep to start recording at same time as GPS
         sleep(5.1)
@@ -82,40 +111,26 @@ def recordIMU(end_time):
         ## --------------- Record IMU ----------------------
         #create new file for to record IMU to 
         logger.info('---------------recordIMU.py------------------')
-        IMUdataFilename = dataDir + floatID + '_IMU_'+'{:%d%b%Y_%H%M%SUTC.dat}'.format(datetime.utcnow())
+        IMUdataFilename = dataDir + floatID + '_IMU_'+'{:%d%b%Y_%H%M%SUTC.bin}'.format(datetime.utcnow())
         logger.info('file name: {}'.format(IMUdataFilename))
         logger.info('starting IMU burst at {}'.format(datetime.now()))
             
-        # Open the new IMU data file for logging
-        with open(IMUdataFilename, 'w',newline='\n') as imu_out:
+        # Open the new binary IMU data file for logging; raw counts are written through a buffered
+        # writer and scaled on read using the factors stored in the file header (see binaryIMU.py)
+        with open_out(IMUdataFilename, accel_range=accel_range_g, gyro_range=gyro_range_dps, accel_scale=fxos.accel_scale,
+                      mag_scale=fxos.mag_scale, gyro_scale=fxas.gyro_scale) as imu_out:
             logger.info('open file for writing: {}'.format(IMUdataFilename))
-            isample=0
-            while datetime.utcnow().minute + datetime.utcnow().second/60 < end_time and isample < imu_samples:
-                # Get values from IMU
-                try:
-                    accel_x, accel_y, accel_z = fxos.accelerometer
-                    mag_x, mag_y, mag_z = fxos.magnetometer
-                    gyro_x, gyro_y, gyro_z = fxas.gyroscope
-                except Exception as e:
-                    logger.info(e)
-                    logger.info('error reading IMU data')
-
-                # Get current timestamp
-                timestamp='{:%Y-%m-%d %H:%M:%S}'.format(datetime.utcnow())
-
-                # Write data and timestamp to file
-                imu_out.write('%s,%f,%f,%f,%f,%f,%f,%f,%f,%f\n' %(timestamp,accel_x,accel_y,accel_z,mag_x,mag_y,mag_z,gyro_x,gyro_y,gyro_z))
-                imu_out.flush()
-                
-                # Index up number of samples
-                isample = isample + 1
-
-                # hard coded sleep to control recording rate. NOT ideal but works for now    
-                sleep(0.065)
+            # drain the FIFOs, or sample on a fixed grid of deadlines, at imuFreq until the sample count or end time is reached
+            keep_going = lambda: datetime.utcnow().minute + datetime.utcnow().second/60 < end_time
+            if fifo_watermark > 0:
+                isample, overruns = sample_IMU_fifo(fxos, fxas, imu_out, imuFreq, fifo_watermark, imu_samples, keep_going)
+            else:
+                isample, overruns = sample_IMU(fxos, fxas, imu_out, imuFreq, imu_samples, keep_going)
             
             # End of IMU sampling
             logger.info('end burst')
             logger.info('IMU samples {}'.format(isample)) 
+            logger.info('IMU sampling overruns (FIFO overflows in FIFO mode) {}'.format(overruns))
             logger.info('IMU ending burst at: {}'.format(datetime.now()))
 
             # Turn IMU Off   
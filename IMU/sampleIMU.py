@@ -0,0 +1,157 @@
+"""
+Author: @jacobrdavis
+
+Deadline-driven IMU sampling loop. Samples are scheduled on an absolute grid of deadlines
+(next_t += 1/fs) on a monotonic clock, so the sampling rate does not drift with the I2C read
+and file write latency. Deadlines which have already passed when the loop comes round to them
+are counted as overruns; if the loop falls behind by a whole period or more, the missed
+deadlines are skipped rather than sampled back-to-back. Alternatively, with the sensor FIFOs
+enabled, the hardware samples at its output data rate and the loop only wakes up to drain the
+FIFOs every watermark samples.
+
+The loop only relies on the single-transaction read_all() of the FXOS8700 and FXAS21002C
+drivers, and the clock and sleep functions can be injected, so it can be run against simulated
+sensors (see testApps/imuSampler_test.py).
+
+Contents:
+    - sample_IMU(fxos, fxas, imu_out, fs, n_samples, keep_going, clock, sleep) [main]
+    - sample_IMU_fifo(fxos, fxas, imu_out, fs, watermark, n_samples, keep_going, clock, sleep)
+
+Log:
+    - Oct 2026: created sampleIMU.py from the recording loop in recordIMU.py
+    - Oct 2026: read each sensor with a single I2C transaction (read_all)
+    - Oct 2026: added sample_IMU_fifo() to drain the hardware FIFOs instead of polling
+"""
+#--Import Statements
+import time
+from logging import getLogger
+
+def sample_IMU(fxos, fxas, imu_out, fs, n_samples, keep_going=lambda: True, clock=time.monotonic_ns, sleep=time.sleep):
+    """
+    Sample the accelerometer/magnetometer and gyroscope at a fixed rate and write each sample
+    to imu_out with an epoch timestamp derived from the monotonic clock
+
+    Input:
+        - fxos, FXOS8700 driver (or an object providing read_all())
+        - fxas, FXAS21002C driver (or an object providing read_all())
+        - imu_out, writer providing write(timestamp, accel_raw, mag_raw, gyro_raw)
+        - fs, sampling frequency [Hz]
+        - n_samples, maximum number of samples to record
+        - keep_going, function returning False when the burst should end early
+        - clock, monotonic clock returning nanoseconds
+        - sleep, function sleeping for a number of seconds
+
+    Output:
+        - isample, number of samples recorded
+        - overruns, number of deadlines missed (including skipped deadlines)
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+
+    period = int(round(1e9/fs)) # [ns]
+    accel_raw = mag_raw = gyro_raw = (0, 0, 0)
+    isample = 0
+    overruns = 0
+
+    # anchor the monotonic clock to UTC at the start of the burst; the first deadline is one period later
+    epoch0 = time.time()
+    mono0 = clock()
+    next_t = mono0 + period
+
+    while isample < n_samples and keep_going():
+        # wait for the next deadline, or count an overrun if it has already passed
+        now = clock()
+        if now < next_t:
+            sleep((next_t - now)*1e-9)
+        else:
+            overruns += 1
+            if now - next_t >= period: # behind by a whole period or more; skip the missed deadlines
+                missed = (now - next_t)//period
+                next_t += missed*period
+                overruns += missed
+
+        # Get raw values from IMU
+        t_start = clock()
+        try:
+            accel_raw, mag_raw = fxos.read_all()
+            gyro_raw = fxas.read_all()
+        except Exception as e:
+            logger.info(e)
+            logger.info('error reading IMU data')
+        t_end = clock()
+
+        # timestamp the sample at the middle of the reads and write it to file
+        timestamp = epoch0 + ((t_start + t_end)//2 - mono0)*1e-9
+        imu_out.write(timestamp, accel_raw, mag_raw, gyro_raw)
+
+        isample += 1
+        next_t += period
+
+    return isample, overruns
+
+
+def sample_IMU_fifo(fxos, fxas, imu_out, fs, watermark, n_samples, keep_going=lambda: True, clock=time.monotonic_ns, sleep=time.sleep):
+    """
+    Record hardware-timed samples from the sensor FIFOs (see enable_fifo() in the drivers). The
+    FIFOs are drained every watermark/fs seconds; accelerometer and gyroscope samples are paired
+    in order and timestamped backwards from the drain time at the nominal rate. The magnetometer
+    is not buffered by the FXOS8700 FIFO, so the latest value is written with each sample.
+
+    Input:
+        - fxos, FXOS8700 driver with the FIFO enabled (or an object providing read_fifo())
+        - fxas, FXAS21002C driver with the FIFO enabled (or an object providing read_fifo())
+        - imu_out, writer providing write(timestamp, accel_raw, mag_raw, gyro_raw)
+        - fs, sensor output data rate [Hz]
+        - watermark, number of samples to accumulate between drains (at most 32)
+        - n_samples, maximum number of samples to record
+        - keep_going, function returning False when the burst should end early
+        - clock, monotonic clock returning nanoseconds
+        - sleep, function sleeping for a number of seconds
+
+    Output:
+        - isample, number of samples recorded
+        - overflows, number of drains at which a FIFO had overflowed (samples lost)
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+
+    period = int(round(1e9*watermark/fs)) # [ns]
+    pendingAcc = []
+    pendingGyo = []
+    isample = 0
+    overflows = 0
+
+    # anchor the monotonic clock to UTC at the start of the burst
+    epoch0 = time.time()
+    mono0 = clock()
+    next_t = mono0 + period
+
+    while isample < n_samples and keep_going():
+        now = clock()
+        if now < next_t:
+            sleep((next_t - now)*1e-9)
+        next_t += period
+
+        # drain both FIFOs
+        try:
+            accel_raw, mag_raw, accOverflow = fxos.read_fifo()
+            gyro_raw, gyoOverflow = fxas.read_fifo()
+        except Exception as e:
+            logger.info(e)
+            logger.info('error reading IMU FIFO')
+            continue
+        t_drain = clock()
+        if accOverflow or gyoOverflow:
+            overflows += 1
+        pendingAcc.extend(accel_raw)
+        pendingGyo.extend(gyro_raw)
+
+        # write the paired samples; the newest accelerometer sample was taken at about the drain time
+        n = min(len(pendingAcc), len(pendingGyo), n_samples - isample)
+        t_newest = epoch0 + (t_drain - mono0)*1e-9
+        for i in range(n):
+            timestamp = t_newest - (len(pendingAcc) - 1 - i)/fs
+            imu_out.write(timestamp, pendingAcc[i], mag_raw, pendingGyo[i])
+        del pendingAcc[:n]
+        del pendingGyo[:n]
+        isample += n
+
+    return isample, overflows
@@ -0,0 +1,237 @@
+"""
+Author: @jacobrdavis
+
+Response-driven AT command engine for the Iridium 9602/9603 modem, replacing the fixed sleeps
+and fixed-length reads in sendSBD.py. A command is written and its response is read line by
+line until a final result code (OK, ERROR, or READY for the commands which then take data)
+arrives or the command's timeout passes, so each command takes as long as the modem needs and
+no longer. Responses are parsed from their lines (e.g. '+CSQ:4', '+SBDIX: 0, 12, 0, 0, 0, 0')
+rather than from byte offsets.
+
+Unsolicited result codes (SBDRING, +CIEV:, +AREG:) can arrive at any time; they are taken out of
+the command responses, logged, and kept in ATEngine.unsolicited. The command echo (on by default)
+is dropped.
+
+The engine works on any serial.Serial compatible object (a pty stands in for the modem in
+testApps/atEngine_test.py). It sets the port's read timeout to a short poll interval.
+
+Contents:
+    - Response(result, lines)
+    - ATEngine(ser, poll) [main]
+
+Log:
+    - Oct 2026: created atEngine.py
+"""
+#--Import Statements
+import time
+import struct
+from collections import namedtuple
+from logging import getLogger
+
+#--Constants
+finalResults = (b'OK', b'ERROR')
+unsolicitedPrefixes = (b'SBDRING', b'+CIEV:', b'+AREG:')
+
+# command timeouts [s]; AT+SBDIX lasts until the Iridium session ends
+commandTimeout = 5
+signalTimeout = 20 # AT+CSQ waits for the signal strength to be measured
+writeTimeout = 10
+sessionTimeout = 90
+
+# AT+SBDWB result codes (ISU AT command reference)
+writeResults = {0: 'SBD message successfully written to the modem',
+                1: 'SBD write timeout',
+                2: 'SBD checksum does not match the checksum calculated by the modem',
+                3: 'SBD message size is not correct'}
+
+Response = namedtuple('Response', ['result', 'lines'])
+Response.__doc__ = """ response to a command: final result code ('OK', 'ERROR', 'READY', or None after a timeout) and information lines """
+
+#--helper functions:
+class ATEngine:
+    """
+    AT command engine:
+
+        at = ATEngine(ser)
+        at.command('AT&K0')                 # Response(result='OK', lines=[])
+        at.signal_quality()                 # 0-5, or -1
+        if at.write_binary(packet) == 0:
+            status = at.session()           # +SBDIX values, MO status first
+
+    Input:
+        - ser, open serial.Serial (or compatible) connected to the modem
+        - poll, read timeout of the port while waiting for a response [s]
+    """
+    def __init__(self, ser, poll=0.1):
+        self.ser = ser
+        self.ser.timeout = poll
+        self.unsolicited = []
+        self._buffer = b''
+
+    def _readline(self, deadline):
+        """
+        Helper function to read one non-empty line (without the line ending) before deadline
+        (time.monotonic), or None
+        """
+        while True:
+            ends = [i for i in (self._buffer.find(b'\r'), self._buffer.find(b'\n')) if i >= 0]
+            if ends:
+                line, self._buffer = self._buffer[:min(ends)].strip(), self._buffer[min(ends)+1:]
+                if line:
+                    return line
+                continue
+            if self._buffer.strip() == b'READY': # READY may arrive without a line ending
+                self._buffer = b''
+                return b'READY'
+            if time.monotonic() >= deadline:
+                return None
+            self._buffer += self.ser.read(max(1, self.ser.in_waiting))
+
+    def _unsolicited(self, line):
+        """
+        Helper function to keep a line if it is an unsolicited result code
+
+        Output:
+            - True if the line was unsolicited
+        """
+        if line.startswith(unsolicitedPrefixes):
+            logger = getLogger('microSWIFT.'+__name__)
+            logger.info('unsolicited = {}'.format(line.decode(errors='replace')))
+            self.unsolicited.append(line.decode(errors='replace'))
+            return True
+        return False
+
+    def drain(self):
+        """
+        Read what the modem has already sent, keeping unsolicited result codes and discarding the rest
+        """
+        self._buffer += self.ser.read(self.ser.in_waiting)
+        while True:
+            line = self._readline(0)
+            if line is None:
+                break
+            self._unsolicited(line)
+        self._buffer = b''
+
+    def response(self, timeout=commandTimeout, final=finalResults, echo=None):
+        """
+        Read the response to a command until a final result code
+
+        Input:
+            - timeout, time to wait for the final result code [s]
+            - final, result codes which end the response
+            - echo, command echo to drop
+
+        Output:
+            - Response
+        """
+        deadline = time.monotonic() + timeout
+        lines = []
+        while True:
+            line = self._readline(deadline)
+            if line is None:
+                return Response(None, lines)
+            if line == echo or self._unsolicited(line):
+                continue
+            if line in final:
+                return Response(line.decode(), lines)
+            lines.append(line.decode(errors='replace'))
+
+    def command(self, command, timeout=commandTimeout, final=finalResults):
+        """
+        Send a command and read its response
+
+        Input:
+            - command, AT command (without the carriage return)
+            - timeout, time to wait for the final result code [s]
+            - final, result codes which end the response
+
+        Output:
+            - Response
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        self.drain()
+        logger.info('command = {}'.format(command))
+        self.ser.write((command+'\r').encode())
+        response = self.response(timeout, final, echo=command.encode())
+        logger.info('response = {}'.format(' '.join(response.lines + [str(response.result)])))
+        return response
+
+    def signal_quality(self, command='AT+CSQ'):
+        """
+        Signal quality
+
+        Output:
+            - signal quality (0-5), or -1 for an error or no response
+        """
+        response = self.command(command, signalTimeout)
+        if response.result == 'OK':
+            for line in response.lines:
+                if line.startswith(('+CSQ:', '+CSQF:')):
+                    return int(line.split(':')[1])
+        return -1
+
+    def write_binary(self, msg):
+        """
+        Write a binary message to the modem's MO buffer (AT+SBDWB), followed by its checksum:
+        the least significant 2 bytes of the sum of the message, high order byte first
+
+        Output:
+            - AT+SBDWB result code (0 for success, see writeResults), or None if the modem did
+              not respond
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        response = self.command('AT+SBDWB='+str(len(msg)), commandTimeout, final=finalResults+(b'READY',))
+        if response.result != 'READY':
+            logger.info('did not receive READY message')
+            return None
+        self.ser.write(msg + struct.pack('>H', sum(msg) & 0xFFFF))
+        return self._write_result()
+
+    def write_text(self, msg):
+        """
+        Write a text message to the modem's MO buffer (AT+SBDWT)
+
+        Output:
+            - AT+SBDWT result code (0 for success), or None if the modem did not respond
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        response = self.command('AT+SBDWT', commandTimeout, final=finalResults+(b'READY',))
+        if response.result != 'READY':
+            logger.info('did not receive READY message')
+            return None
+        self.ser.write((msg+'\r').encode())
+        return self._write_result(echo=msg.encode())
+
+    def _write_result(self, echo=None):
+        """
+        Helper function to read the result code which follows the data of AT+SBDWB and AT+SBDWT
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        response = self.response(writeTimeout, echo=echo)
+        codes = [line for line in response.lines if line.isdigit()]
+        if response.result != 'OK' or not codes:
+            logger.info('Unexpected response from modem: {}'.format(response))
+            return None
+        result = int(codes[-1])
+        logger.info('response = {} ({})'.format(result, writeResults.get(result, 'unknown result code')))
+        return result
+
+    def session(self):
+        """
+        Start an extended Iridium session (AT+SBDIX), transmitting the MO buffer
+
+        Output:
+            - list of the +SBDIX values: MO status, MOMSN, MT status, MTMSN, MT length,
+              MT queued; None if the modem did not respond
+        """
+        response = self.command('AT+SBDIX', sessionTimeout)
+        for line in response.lines:
+            if line.startswith('+SBDIX:'):
+                try:
+                    return [int(value) for value in line.split(':')[1].split(',')]
+                except ValueError:
+                    break
+        logger = getLogger('microSWIFT.'+__name__)
+        logger.info('Unexpected response from modem: {}'.format(response))
+        return None
@@ -4,12 +4,19 @@ Created on May 16, 2014
 Modified 2/26/2021 for use with Python 3.7
     change 'buffer(data[0:1])' to data[0:1]
     decode payload type from bytes to str
+Modified Oct 2026: sensor blocks decoded with the payload schemas of SBD/payloadSchema.py
+    (sensor types 50, 51, and 52), which createTX also packs with
 
 @author: adioso
 '''
 
 import codecs
+import sys
 from struct import unpack_from
+try:
+    from SBD.payloadSchema import schemas
+except ImportError: # run from the SBD directory
+    from payloadSchema import schemas
 
 # Payload version
 _4_0 = '7'
@@ -78,8 +85,8 @@ def processData(p_id, data):
         (size, index) = _getInt2(data, index)
         print("Size: {}".format(size))
 
-        if sensor_type == 50:
-            index = _processMicroSWIFT(p_id, data, index, size)
+        if sensor_type in schemas:
+            index = _processMicroSWIFT(p_id, data, index, size, sensor_type)
 
         else:
             raise Exception(
@@ -87,55 +94,23 @@ def processData(p_id, data):
                     p_id, sensor_type, index))
 
 
-def _processMicroSWIFT(p_id, data, index, size):
+def _processMicroSWIFT(p_id, data, index, size, sensor_type):
     if size == 0:
         print("MicroSWIFT empty")
         return index
 
-    (hs, index) = _getFloat(data, index)
-    print("hs {}".format(hs))
-    (tp, index) = _getFloat(data, index)
-    print("tp {}".format(tp))
-    (dp, index) = _getFloat(data, index)
-    print("dp {}".format(dp))
-
-    arrays = [ 'e', 'f', 'a1', 'b1', 'a2', 'b2', 'cf']
-
-    # TODO Get the array data
-    for array in arrays:
-        # 0 - 41
-        for a_index in range(0, 42):
-            (val, index) = _getFloat(data, index)
-            print("{}{} {}".format(array, a_index, val))
-
-    (lat, index) = _getFloat(data, index)
-    print("lat {}".format(lat))
-    (lon, index) = _getFloat(data, index)
-    print("lon {}".format(lon))
-    (mean_temp, index) = _getFloat(data, index)
-    print("mean_temp {}".format(mean_temp))
-    (mean_voltage, index) = _getFloat(data, index)
-    print("mean_voltage {}".format(mean_voltage))
-    (mean_u, index) = _getFloat(data, index)
-    print("mean_u {}".format(mean_u))
-    (mean_v, index) = _getFloat(data, index)
-    print("mean_v {}".format(mean_v))
-    (mean_z, index) = _getFloat(data, index)
-    print("mean_z {}".format(mean_z))
-    (year, index) = _getInt4(data, index)
-    print("year {}".format(year))
-    (month, index) = _getInt4(data, index)
-    print("month {}".format(month))
-    (day, index) = _getInt4(data, index)
-    print("day {}".format(day))
-    (hour, index) = _getInt4(data, index)
-    print("hour {}".format(hour))
-    (min, index) = _getInt4(data, index)
-    print("min {}".format(min))
-    (sec, index) = _getInt4(data, index)
-    print("sec {}".format(sec))
-
-    return index
+    schema = schemas[sensor_type]
+    _checkSize(size, schema.size, "sensor type {}".format(sensor_type), p_id)
+
+    # the block runs from the sensor type (4 bytes before index) to the end of the payload, which
+    # started with the payload type byte
+    start = index - 4
+    end = start + size - 1
+    record = schema.decode(data[0:1] + data[start:end])
+    for name in schema.dtype.names[4:]:
+        print("{} {}".format(name, record[name]))
+
+    return end
 
 
 if __name__ == "__main__":
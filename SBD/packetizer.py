@@ -0,0 +1,126 @@
+"""
+Author: @jacobrdavis
+
+SBD packetizer. A payload too long for one mobile originated (MO) message is sent in packets,
+each no longer than the modem's MO limit (340 bytes for the 9602/9603):
+
+    <packet-type><sub-header><data>
+    packet type 0 (single packet):      0,<id>,0,<total-bytes>:<data>
+    packet type 1 (one of several):     1,<id>,0,<total-bytes>:<data>   (first packet)
+                                        1,<id>,<start-byte>:<data>       (following packets)
+
+Every packet is filled up to the MO limit, with the exact length of its sub-header, so a
+payload is sent in the fewest packets (the sub-header only grows with the start byte, so
+filling each packet in turn is optimal).
+
+A SWIFT payload is the payload type followed by one or more sensor blocks, each carrying its
+sensor type, port, and size (see SBD/microSWIFT_processor.py), so several queued payloads can
+be combined into one by concatenating their sensor blocks. pack() combines consecutive
+payloads where this takes fewer packets (i.e. fewer Iridium sessions) than sending them apart.
+
+Contents:
+    - sub_header(packet_type, id, start, total)
+    - packetize(payload, id, moLimit) [main]
+    - num_packets(size, id, moLimit)
+    - combine(payloads)
+    - pack(payloads, id, moLimit)
+
+Log:
+    - Oct 2026: created packetizer.py to replace the fixed splits of send_microSWIFT_50, 51, and 52
+"""
+#--Constants
+moLimit = 340 # longest MO message of the 9602/9603 modem [bytes]
+
+#--helper functions:
+def sub_header(packet_type, id, start, total=None):
+    """
+    Packet type and sub-header of a packet
+
+    Input:
+        - packet_type, 0 (single packet) or 1 (one of several)
+        - id, message id
+        - start, index in the payload of the first byte in the packet
+        - total, payload size (first packet only)
+
+    Output:
+        - header, ascii bytes, e.g. b'1,7,329:'
+    """
+    if total is None:
+        return f'{packet_type},{id},{start}:'.encode('ascii')
+    return f'{packet_type},{id},{start},{total}:'.encode('ascii')
+
+def packetize(payload, id, moLimit=moLimit):
+    """
+    Split a payload into the fewest packets no longer than moLimit
+
+    Input:
+        - payload, bytes
+        - id, message id
+        - moLimit, longest packet [bytes]
+
+    Output:
+        - packets, list of bytes
+    """
+    total = len(payload)
+    if total == 0:
+        raise ValueError('payload is empty')
+    header = sub_header(0, id, 0, total)
+    if len(header) + total <= moLimit:
+        return [header + payload]
+
+    packets = []
+    start = 0
+    while start < total:
+        header = sub_header(1, id, start, total if start == 0 else None)
+        end = min(start + moLimit - len(header), total)
+        if end <= start:
+            raise ValueError(f'MO limit of {moLimit} bytes leaves no room for data')
+        packets.append(header + payload[start:end])
+        start = end
+    return packets
+
+def num_packets(size, id=99, moLimit=moLimit):
+    """
+    Number of packets for a payload of a given size (by default for the longest message id)
+    """
+    return len(packetize(bytes(size), id, moLimit))
+
+def combine(payloads):
+    """
+    Combine payloads into one by concatenating their sensor blocks
+
+    Input:
+        - payloads, list of SWIFT payloads (bytes), all of the same payload type
+
+    Output:
+        - payload, bytes
+    """
+    payload_type = payloads[0][:1]
+    if any(payload[:1] != payload_type for payload in payloads):
+        raise ValueError('payloads of different payload types cannot be combined')
+    return payload_type + b''.join(payload[1:] for payload in payloads)
+
+def pack(payloads, id=99, moLimit=moLimit):
+    """
+    Group consecutive payloads which take fewer packets combined than apart
+
+    Input:
+        - payloads, list of SWIFT payloads (bytes), in sending order
+        - id, message id used to size the sub-headers (the longest by default)
+        - moLimit, longest packet [bytes]
+
+    Output:
+        - groups, list of lists of indices into payloads; each group is sent as one payload
+    """
+    groups = []
+    size = 0
+    for i, payload in enumerate(payloads):
+        if groups and payloads[groups[-1][0]][:1] == payload[:1]:
+            combined = size + len(payload) - 1
+            if num_packets(combined, id, moLimit) < num_packets(size, id, moLimit) + num_packets(len(payload), id, moLimit):
+                groups[-1].append(i)
+                size = combined
+                continue
+        groups.append([i])
+        size = len(payload)
+    return groups
@@ -0,0 +1,184 @@
+"""
+Author: @jacobrdavis
+
+Payload schema registry. Each microSWIFT sensor type (payload layout) is declared once, as a
+list of fields, and compiled to a struct.Struct, which packs a payload with one pack_into
+into a preallocated buffer (sendSBD.createTX), and to a matching NumPy dtype, which decodes
+one with np.frombuffer (sendSBD.checkTX, SBD/microSWIFT_processor.py). Encoder and decoder
+come from the same declaration; a new sensor type is one more register() call.
+
+Every layout starts with the payload type, sensor type, port, and payload size, which a
+SWIFT payload uses to delimit its sensor blocks (see SBD/packetizer.py).
+
+Contents:
+    - PayloadSchema(sensor_type, fields) [main]
+    - register(schema)
+    - schema_for(sensor_type)
+    - decode(payload_data)
+    - pack_payload(sensor_type, payload_type, port, now, Hs, ..., volt)
+    - schemas, registry of sensor types 50, 51, and 52
+
+Log:
+    - Oct 2026: created payloadSchema.py
+"""
+#--Import Statements
+import struct
+import numpy as np
+
+#--Constants
+dtypes = {'s': 'S1', 'b': 'i1', 'B': 'u1', 'h': '<i2', 'e': '<f2', 'f': '<f4', 'i': '<i4'} # struct format -> NumPy dtype
+header = [('payload_type', 's'), ('sensor_type', 'b'), ('port', 'b'), ('size', 'h')]
+schemas = {}
+
+#--helper functions:
+class PayloadSchema:
+    """
+    Layout of one sensor type:
+
+        schema = PayloadSchema(52, header + [('Hs', 'e'), ..., ('E', 'e', 42), ...])
+        payload_data = schema.pack(payload_type=b'7', port=6, Hs=Hs, ..., E=E, ...)
+        data = schema.decode(payload_data)    # NumPy record; data['Hs'], data['E'], ...
+
+    Input:
+        - sensor_type, sensor type byte of the payload
+        - fields, list of (name, struct format character) or (name, format character, count),
+          little-endian and without padding
+    """
+    def __init__(self, sensor_type, fields):
+        self.sensor_type = sensor_type
+        self.fields = [field if len(field) == 3 else field + (1,) for field in fields]
+        self.struct = struct.Struct('<' + ''.join(f'{count}{char}' if count > 1 else char for _, char, count in self.fields))
+        self.dtype = np.dtype([(name, dtypes[char], (count,)) if count > 1 else (name, dtypes[char])
+                               for name, char, count in self.fields])
+        self.size = self.struct.size
+        assert self.dtype.itemsize == self.size, 'struct and dtype layouts differ'
+        self._buffer = bytearray(self.size)
+
+    def pack_into(self, buffer, offset=0, **values):
+        """
+        Pack a payload into a buffer; sensor_type and size are filled in
+
+        Input:
+            - buffer, writable buffer
+            - offset, index in buffer of the first byte
+            - values, one keyword per field: scalars, or sequences of count values
+        """
+        values['sensor_type'] = self.sensor_type
+        values['size'] = self.size
+        flat = []
+        for name, _, count in self.fields:
+            if count > 1:
+                flat.extend(np.asarray(values[name]).tolist()) # Python numbers pack faster than NumPy scalars
+            else:
+                flat.append(values[name])
+        self.struct.pack_into(buffer, offset, *flat)
+
+    def pack(self, **values):
+        """
+        Pack a payload into the schema's buffer
+
+        Output:
+            - payload_data, bytes
+        """
+        self.pack_into(self._buffer, 0, **values)
+        return bytes(self._buffer)
+
+    def decode(self, payload_data, offset=0):
+        """
+        Decode a payload
+
+        Input:
+            - payload_data, bytes holding the payload
+            - offset, index of the payload in payload_data
+
+        Output:
+            - NumPy record with one item per field
+        """
+        return np.frombuffer(payload_data, dtype=self.dtype, count=1, offset=offset)[0]
+
+
+def register(schema):
+    """
+    Add a schema to the registry
+    """
+    schemas[schema.sensor_type] = schema
+    return schema
+
+def schema_for(sensor_type):
+    """
+    Schema of a sensor type (KeyError if none is registered)
+    """
+    return schemas[sensor_type]
+
+def decode(payload_data):
+    """
+    Decode a payload by its sensor type (byte 1)
+
+    Output:
+        - NumPy record, see PayloadSchema.decode
+    """
+    return schema_for(payload_data[1]).decode(payload_data)
+
+
+def pack_payload(sensor_type, payload_type, port, now, Hs, Tp, Dp, E, f, a1, b1, a2, b2, check,
+                 u_mean, v_mean, z_mean, lat, lon, temp, salinity, volt):
+    """
+    Pack a wave estimate as a payload of a sensor type, deriving the fields which are not
+    sent as computed (frequency range; scaled 8-bit moments and check factors; time)
+
+    Input:
+        - sensor_type, 50, 51, or 52
+        - payload_type, port, payload type and port
+        - now, UTC datetime of the estimate
+        - Hs, Tp, Dp, E, f, a1, b1, a2, b2, check, wave estimate (spectral values as sequences)
+        - u_mean, v_mean, z_mean, lat, lon, temp, salinity, volt
+
+    Output:
+        - payload_data, bytes
+    """
+    E, f, a1, b1, a2, b2, check = [np.asarray(x, dtype=float) for x in (E, f, a1, b1, a2, b2, check)]
+    values = dict(payload_type=str(payload_type).encode(), port=port, Hs=Hs, Tp=Tp, Dp=Dp, E=E, f=f,
+                  a1=a1, b1=b1, a2=a2, b2=b2, check=check, lat=lat, lon=lon, temp=temp, salinity=salinity, volt=volt,
+                  u_mean=u_mean, v_mean=v_mean, z_mean=z_mean, year=now.year, month=now.month, day=now.day,
+                  hour=now.hour, minute=now.minute, second=now.second)
+
+    if sensor_type in [51, 52]:
+        # extract frequency range
+        values['fmin'] = np.min(f)
+        values['fmax'] = np.max(f)
+        values['fstep'] = (values['fmax'] - values['fmin'])/41
+
+    if sensor_type == 52:
+        # round, scale, and convert a1,b1...+ to 8-bit, signed integers
+        values['a1'] = np.byte(np.round(100*a1)) # could be 127
+        values['b1'] = np.byte(np.round(100*b1))
+        values['a2'] = np.byte(np.round(100*a2))
+        values['b2'] = np.byte(np.round(100*b2))
+
+        # round, scale, clip, and convert check to 8-bit, unsigned integers
+        checkRoundedAndScaled = np.round(10*check)
+        checkRoundedAndScaled[checkRoundedAndScaled > 255] = 255
+        values['check'] = np.ubyte(checkRoundedAndScaled)
+
+        # current time to UNIX timestamp
+        values['timestamp'] = now.timestamp() # unpack with datetime.fromtimestamp(nowEpoch)
+
+    return schema_for(sensor_type).pack(**values)
+
+
+#--sensor types
+register(PayloadSchema(50, header + [('Hs', 'f'), ('Tp', 'f'), ('Dp', 'f'),
+                                     ('E', 'f', 42), ('f', 'f', 42), ('a1', 'f', 42), ('b1', 'f', 42), ('a2', 'f', 42), ('b2', 'f', 42), ('check', 'f', 42),
+                                     ('lat', 'f'), ('lon', 'f'), ('temp', 'f'), ('volt', 'f'), ('u_mean', 'f'), ('v_mean', 'f'), ('z_mean', 'f'),
+                                     ('year', 'i'), ('month', 'i'), ('day', 'i'), ('hour', 'i'), ('minute', 'i'), ('second', 'i')]))
+
+register(PayloadSchema(51, header + [('Hs', 'f'), ('Tp', 'f'), ('Dp', 'f'),
+                                     ('E', 'f', 42), ('fmin', 'f'), ('fmax', 'f'), ('fstep', 'f'),
+                                     ('lat', 'f'), ('lon', 'f'), ('temp', 'f'), ('volt', 'f'), ('u_mean', 'f'), ('v_mean', 'f'), ('z_mean', 'f'),
+                                     ('year', 'i'), ('month', 'i'), ('day', 'i'), ('hour', 'i'), ('minute', 'i'), ('second', 'i')]))
+
+register(PayloadSchema(52, header + [('Hs', 'e'), ('Tp', 'e'), ('Dp', 'e'),
+                                     ('E', 'e', 42), ('fmin', 'e'), ('fmax', 'e'),
+                                     ('a1', 'b', 42), ('b1', 'b', 42), ('a2', 'b', 42), ('b2', 'b', 42), ('check', 'B', 42), # a1-b2 scaled by 100, check by 10
+                                     ('lat', 'f'), ('lon', 'f'), ('temp', 'e'), ('salinity', 'e'), ('volt', 'e'),
+                                     ('timestamp', 'f')])) # UNIX time; float saves 4 bytes but looses +/- 1s precision
@@ -5,23 +5,34 @@ All functions are heavily adapted from Viviana Castillo and Alex de Klerk.
 
 Log:
     - Aug 2022, @jacobrdavis: sensor_type_52, send_microSWIFT_52()
+    - Oct 2026: ModemSession, one modem power-up and initialization per telemetry drain;
+      send_packets() shared by send_microSWIFT_50, 51, and 52
+    - Oct 2026: get_response, sig_qual, transmit_bin, and transmit_ascii use the AT command
+      engine (SBD/atEngine.py) instead of fixed sleeps and fixed-length reads
+    - Oct 2026: payloads split by SBD/packetizer.py instead of fixed offsets; send_payloads()
+      sends several payloads as one message
+    - Oct 2026: createTX, checkTX, and check_payload use the payload schemas of SBD/payloadSchema.py
+    - Oct 2026: send_packets backs off between failed signal quality checks and reinitializes
+      the modem after repeated failures
 
 TODO:
     - lookup table for status codes 
     - pull out into functions?
-    - combine repeated code for send_microSWIFT_50,51,52
 '''
 
 # Import Statements
 from datetime import datetime
-import struct
 from logging import *
 import sys, os
 from utils.config3 import Config
 import numpy as np
 import RPi.GPIO as GPIO
 import time as t
+import weakref
 import serial
+from SBD.atEngine import ATEngine
+from SBD.packetizer import packetize, combine
+from SBD.payloadSchema import schemas, schema_for, decode, pack_payload
 
 #Define Config file name and load file
 configFilename = r'/home/pi/microSWIFT/utils/Config.dat'
@@ -54,9 +65,19 @@ modemBaud = config.getInt('Iridium', 'baud')
 modemGPIO = config.getInt('Iridium', 'modemGPIO')
 timeout = config.getInt('Iridium', 'timeout')
 
+#retries of modem commands which fail: first delay and longest delay [s], and number of
+#consecutive signal quality failures after which the modem is reinitialized
+retryDelay = 1
+maxRetryDelay = 10
+maxFailures = 5
+
 #arbitrary message counter
 id = 0
 
+
+#AT command engines of open serial ports
+_engines = weakref.WeakKeyDictionary()
+
 # Telemetry test functions
 def createTX(Hs, Tp, Dp, E, f, a1, b1, a2, b2, check, u_mean, v_mean, z_mean, lat, lon,  temp, salinity, volt):
     logger.info('---------------sendSBD.createTX.py------------------')
@@ -82,106 +103,15 @@ def createTX(Hs, Tp, Dp, E, f, a1, b1, a2, b2, check, u_mean, v_mean, z_mean, la
     logger.info('Hs: {0} Tp: {1} Dp: {2} lat: {3} lon: {4} temp: {5} salinity: {6} volt: {7} uMean: {8} vMean: {9} zMean: {10}'.format(
         Hs, Tp, Dp, lat, lon, temp, salinity, volt, uMean, vMean, zMean))
 
-    if sensor_type == 50:
-
-        #create formatted struct with all payload data
-        payload_size = struct.calcsize('<sbbhfff42f42f42f42f42f42f42ffffffffiiiiii')
-        payload_data = (struct.pack('<sbbhfff', str(payload_type).encode(),sensor_type,port, payload_size,Hs,Tp,Dp) + 
-                        struct.pack('<42f', *E) +
-                        struct.pack('<42f', *f) +
-                        struct.pack('<42f', *a1) +
-                        struct.pack('<42f', *b1) +
-                        struct.pack('<42f', *a2) +
-                        struct.pack('<42f', *b2) +
-                        struct.pack('<42f', *check) +
-                        struct.pack('<f', lat) +
-                        struct.pack('<f', lon) +
-                        struct.pack('<f', temp) +
-                        struct.pack('<f', volt) +
-                        struct.pack('<f', uMean) +
-                        struct.pack('<f', vMean) +
-                        struct.pack('<f', zMean) +
-                        struct.pack('<i', int(now.year)) +
-                        struct.pack('<i', int(now.month)) +
-                        struct.pack('<i', int(now.day)) +
-                        struct.pack('<i', int(now.hour)) +
-                        struct.pack('<i', int(now.minute)) +
-                        struct.pack('<i', int(now.second)))
-    
-    elif sensor_type == 51:
-        
-        #compute fmin fmax and fstep
-        fmin = np.min(f)
-        fmax = np.max(f)
-        fstep = (fmax - fmin)/41
-
-        payload_size = struct.calcsize('<sbbhfff42fffffffffffiiiiii')
-        payload_data = (struct.pack('<sbbhfff', str(payload_type).encode(),sensor_type,port, payload_size,Hs,Tp,Dp) + 
-                        struct.pack('<42f', *E) +
-                        struct.pack('<f', fmin) +
-                        struct.pack('<f', fmax) +
-                        struct.pack('<f', fstep) +
-                        struct.pack('<f', lat) +
-                        struct.pack('<f', lon) +
-                        struct.pack('<f', temp) +
-                        struct.pack('<f', volt) +
-                        struct.pack('<f', uMean) +
-                        struct.pack('<f', vMean) +
-                        struct.pack('<f', zMean) +
-                        struct.pack('<i', int(now.year)) +
-                        struct.pack('<i', int(now.month)) +
-                        struct.pack('<i', int(now.day)) +
-                        struct.pack('<i', int(now.hour)) +
-                        struct.pack('<i', int(now.minute)) +
-                        struct.pack('<i', int(now.second)))
-    
-    
-    elif sensor_type == 52:
-
-        # extract frequency range
-        fmin = np.min(f)
-        fmax = np.max(f)
-        # fstep = (fmax - fmin)/(len(E)-1)
-
-        # round, scale, and convert a1,b1...+ to 8-bit, signed integers
-        a1_8bit = np.byte(np.round(100*a1)) # could be 127
-        b1_8bit = np.byte(np.round(100*b1))
-        a2_8bit = np.byte(np.round(100*a2))
-        b2_8bit = np.byte(np.round(100*b2))
-
-        # round, scale, clip, and convert check to 8-bit, unsigned integers
-        checkRoundedAndScaled = np.round(10*check)
-        checkRoundedAndScaled[checkRoundedAndScaled > 255] = 255
-        check_8bit = np.ubyte(checkRoundedAndScaled)
-
-        # current time to UNIX timestamp
-        nowEpoch = now.timestamp() # unpack with datetime.fromtimestamp(nowEpoch)  
-
-        # create formatted struct with all payload data
-        payload_size = struct.calcsize('<sbbheee42eee42b42b42b42b42Bffeeef') 
-        payload_data = (struct.pack('<sbbh', str(payload_type).encode(), sensor_type, port, payload_size) + 
-                        struct.pack('<eee', Hs,Tp,Dp) +
-                        struct.pack('<42e', *E) +
-                        struct.pack('<e', fmin) +
-                        struct.pack('<e', fmax) +
-                        struct.pack('<42b', *a1_8bit) +
-                        struct.pack('<42b', *b1_8bit) +
-                        struct.pack('<42b', *a2_8bit) +
-                        struct.pack('<42b', *b2_8bit) +
-                        struct.pack('<42B', *check_8bit) +
-                        struct.pack('<f', lat) +
-                        struct.pack('<f', lon) +
-                        struct.pack('<e', temp) + 
-                        struct.pack('<e', salinity) +
-                        struct.pack('<e', volt) +
-                        struct.pack('<f', nowEpoch) # float saves 4 bytes but looses +/- 1s precision 
-                        )
-
-    else: 
+    if sensor_type not in schemas:
         logger.info('invalid sensor type: {}'.format(sensor_type))
         logger.info('exiting')
         sys.exit(1)
 
+    # pack all payload data with the precompiled struct of the sensor type (SBD/payloadSchema.py)
+    payload_data = pack_payload(sensor_type, payload_type, port, now, Hs, Tp, Dp, E, f, a1, b1, a2, b2, check,
+                                uMean, vMean, zMean, lat, lon, temp, salinity, volt)
+
     #Create file name
     TX_fname = dataDir + floatID+'_TX_'+"{:%d%b%Y_%H%M%SUTC.dat}".format(now) 
     if os.path.exists(TX_fname): # support secondary estimate
@@ -205,49 +135,35 @@ def checkTX(TX_fname):
 
     with open(TX_fname, mode='rb') as file: # b is important -> binary
         fileContent = file.read()
-    data = struct.unpack('<sbbhfff42fffffffffffiiiiii', fileContent)
-    logger.info('data = ', data)
+    data = decode(fileContent) # layout from the sensor type byte
+    logger.info('data = {}'.format(data))
+    return data
+
 
+def at_engine(ser):
+    """
+    AT command engine (SBD/atEngine.py) of an open serial port; one engine per port, so that
+    unsolicited result codes are kept for the whole session
+    """
+    if ser not in _engines:
+        _engines[ser] = ATEngine(ser)
+    return _engines[ser]
 
 def get_response(ser,command, response='OK'):
-    ser.flushInput()
-    logger.info('command = {}'.format(command))
-    ser.write((command+'\r').encode())
-    t.sleep(1)
     try:
-        while ser.in_waiting > 0:
-            r=ser.readline().decode().strip('\r\n')
-            if response in r:
-                logger.info('response = {}'.format(r))
-                return True
-            elif 'ERROR' in response:
-                logger.info('response = ERROR')
-                return False
+        return at_engine(ser).command(command).result == response
     except serial.SerialException as e:
         logger.info('error: {}'.format(e))
         return False
 
-#Get signal quality using AT+CSQF command (see AT command reference).
+#Get signal quality using AT+CSQ command (see AT command reference).
 #Returns signal quality, default range is 0-5. Returns -1 for an error or no response
-#Example modem output: AT+CSQF +CSQF:0 OK    
+#Example modem output: AT+CSQ +CSQ:4 OK
 def sig_qual(ser, command='AT+CSQ'):
-    ser.flushInput()
-    ser.write((command+'\r').encode())
-    logger.info('command = {} '.format(command))
-    r=ser.read(23).decode()
-    if 'CSQ:' in r:
-        response=r[9:15]
-        qual = r[14]
-        logger.info('response = {}'.format(response))
-        return int(qual) #return signal quality (0-5)
-    elif 'ERROR' in r:
-        logger.info('Response = ERROR')
-        return -1
-    elif r == '':
-        logger.info('No response from modem')
-        return -1
-    else:
-        logger.info('Unexpected response: {}'.format(r))  
+    try:
+        return at_engine(ser).signal_quality(command)
+    except serial.SerialException as e:
+        logger.info('error: {}'.format(e))
         return -1
 
 def initModem():
@@ -289,94 +205,101 @@ def initModem():
 
 
 
+class ModemSession:
+    """
+    Iridium modem session kept open while the telemetry queue is drained: the modem is powered
+    on and initialized (initModem) once, on the first message, and reused for every following
+    message; it is powered down when the session is closed (the queue is empty or the deadline
+    has arrived).
+
+        with ModemSession(next_start) as modem:
+            for payload_data in payloads:
+                send_microSWIFT_52(payload_data, next_start, modem)
+
+    Before each message the session is checked: if the modem has been idle for more than
+    keepAlive seconds it must answer an AT command, otherwise it is power cycled and initialized
+    again.
+
+    Input:
+        - deadline, datetime after which the modem is not initialized again
+        - keepAlive, idle time after which the modem is checked before use [s]
+    """
+    def __init__(self, deadline, keepAlive=30):
+        self.deadline = deadline
+        self.keepAlive = keepAlive
+        self.ser = None
+        self.initialized = False
+        self.initializations = 0
+        self._lastUsed = 0
+
+    def touch(self):
+        """
+        Record that the modem has just responded
+        """
+        self._lastUsed = t.monotonic()
+
+    def ready(self):
+        """
+        Initialize the modem if needed and check that it responds
+
+        Output:
+            - True if the modem is initialized
+        """
+        if self.initialized and t.monotonic() - self._lastUsed > self.keepAlive:
+            if get_response(self.ser, 'AT'): # keep-alive
+                self.touch()
+            else:
+                logger.info('Modem did not respond to keep-alive; reinitializing')
+                self.close()
+        if not self.initialized and datetime.utcnow() < self.deadline:
+            try:
+                self.ser, self.initialized = initModem()
+            except Exception as e:
+                logger.info(f'error initializing modem: {e}')
+                self.initialized = False
+            self.initializations += 1
+            if self.initialized:
+                self.touch()
+            else:
+                self.close()
+        return self.initialized
+
+    def close(self):
+        """
+        Close the serial port and power down the modem
+        """
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception as e:
+                logger.info(e)
+        self.ser = None
+        self.initialized = False
+        logger.info('Powering down modem')
+        GPIO.output(modemGPIO,GPIO.LOW)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 #send binary message to modem buffer and transmits
-#returns true if trasmit command is sent, but does not mean a successful transmission
+#returns true if the message is written and the session reports it transferred (MO status 0-4)
 #checksum is least significant 2 bytes of sum of message, with higher order byte sent first
 #returns false if anything goes wrong
 def transmit_bin(ser,msg):
-    
-    bytelen=len(msg)
-    logger.info('payload bytes = {}'.format(bytelen))
-                    
-    #check signal quality and attempt to send until timeout reached
-            
+    logger.info('payload bytes = {}'.format(len(msg)))
     try:
-        logger.info('Command = AT+SBDWB')
-        ser.flushInput()
-        ser.write(('AT+SBDWB='+str(bytelen)+'\r').encode()) #command to write bytes, followed by number of bytes to write
-        t.sleep(0.25)
+        at = at_engine(ser)
+        if at.write_binary(msg) != 0:
+            return False
+        return _session(at)
     except serial.SerialException as e:
         logger.info('Serial error: {}'.format(e))
         return False
-    except Exception as e:
-        logger.info('Error: {}'.format(e))
-        return False
-    
-    r = ser.read_until(b'READY') #block until READY message is received
-    if b'READY' in r: #only pass bytes if modem is ready, otherwise it has timed out
-        logger.info('response = READY')
-        logger.info('passing message to modem buffer')
-        ser.flushInput()
-        ser.write(msg) #pass bytes to modem
-        t.sleep(0.25)
-        
-        #The checksum is the least significant 2-bytes of the summation of the entire SBD message. 
-        #The high order byte must be sent first. 
-        checksum=sum(msg) #calculate checksum value
-        byte1 = (checksum >> 8).to_bytes(1,'big') #bitwise operation shift 8 bits right to get firt byte of checksum and convert to bytes
-        byte2 = (checksum & 0xFF).to_bytes(1,'big')#bitwise operation to get second byte of checksum, convet to bytes
-        logger.info('passing checksum to modem buffer')
-        ser.write(byte1) #first byte of 2-byte checksum 
-        t.sleep(0.25)
-        ser.write(byte2) #second byte of checksum
-        t.sleep(0.25)
-        
-        r=ser.read(3).decode() #read response to get result code from SBDWB command (0-4)
-        try:
-            r=r[2] #result code of expected response
-            logger.info('response = {}'.format(r))
-            
-            if r == '0': #response of zero = successful write, ready to send
-                logger.info('command = AT+SBDIX')
-                ser.flushInput()
-                ser.write(b'AT+SBDIX\r') #start extended Iridium session (transmit)
-                t.sleep(5)
-                ser.read(11)
-                r=ser.readline().decode().strip('\r\n')  #get command response in the form +SBDIX:<MO status>,<MOMSN>,<MT status>,<MTMSN>,<MT length>,<MT queued>
-                logger.info('response = {}'.format(r))
-                
-                if '+SBDIX: ' in r:
-                    r=r.strip('+SBDIX:').split(', ')
-                    #interpret response and check MO status code (0=success, 2=success but no location update). See ISU AT Command ref page 96.
-                    if int(r[0]) == 0 or int(r[0]) == 2:
-                        logger.info('Message send success')
-                        return True
-                    else:
-                        logger.info('Message send failure, status code = {}'.format(r[0]))
-                        #TODO: lookup table of status codes here
-                        return False
-                else:
-                    logger.info('Unexpected response from modem')
-                    return False
-            elif r == '1':
-                logger.info('SBD write timeout')
-                return False
-            elif r == '2':
-                logger.info('SBD checksum does not match the checksum calculated by the modem')
-                return False
-            elif r == '3':
-                logger.info('SBD message size is not correct')
-                return False
-            else:
-                logger.info('Unexpected response from modem')
-                return False   
-        except IndexError:
-            logger.info('Unexpected response from modem')
-            return False
-    else:
-        logger('did not receive READY message')
-        return False
-    
+
 #same as transmit_bin but sends ascii text using SBDWT command instead of bytes
 def transmit_ascii(ser,msg):
  
@@ -389,369 +312,180 @@ def transmit_ascii(ser,msg):
     if not msg.isascii(): #check for ascii text
         logger.info('message must be ascii text')
         return False
-    
-    try:  
-        ser.flushInput()
-        logger.info('command = AT+SBDWT')
-        ser.write(b'AT+SBDWT\r') #command to write text to modem buffer
-        t.sleep(0.25)
+
+    try:
+        at = at_engine(ser)
+        if at.write_text(msg) != 0:
+            return False
+        return _session(at)
     except serial.SerialException as e:
         logger.info('serial error: {}'.format(e))
         return False
-    except Exception as e:
-        logger.info('error: {}'.format(e))
-        return False
-    
-    r = ser.read_until(b'READY') #block until READY message is received
-    if b'READY' in r: #only pass bytes if modem is ready, otherwise it has timed out
-        logger.info('response = READY')
-        ser.flushInput()
-        ser.write((msg + '\r').encode()) #pass bytes to modem. Must have carriage return
-        t.sleep(0.25)
-        logger.info('passing message to modem buffer')
-        r=ser.read(msg_len+9).decode() #read response to get result code (0 for successful save in buffer or 1 for fail)
-        if 'OK' in r:
-            index=msg_len+2 #index of result code
-            r=r[index:index+1] 
-            logger.info('response = {}'.format(r))        
-            if r == '0':
-                logger.info('command = AT+SBDIX')
-                ser.flushInput()
-                ser.write(b'AT+SBDIX\r') #start extended Iridium session (transmit)
-                t.sleep(5)
-                r=ser.read(36).decode()
-                if '+SBDIX: ' in r:
-                    r=r[11:36] #get command response in the form +SBDIX:<MO status>,<MOMSN>,<MT status>,<MTMSN>,<MT length>,<MT queued>
-                    r=r.strip('\r') #remove any dangling carriage returns
-                    logger.info('response = {}'.format(r)) 
-                    return True
-    else:
+
+def _session(at):
+    """
+    Helper function to transmit the MO buffer (AT+SBDIX) and check the MO status: 0-4 mean the
+    MO message was transferred (see ISU AT Command ref page 96)
+    """
+    status = at.session()
+    if status is None:
         return False
+    if status[0] <= 4:
+        logger.info('Message send success')
+        return True
+    logger.info('Message send failure, status code = {}'.format(status[0]))
+    #TODO: lookup table of status codes here
+    return False
     
 
 #MAIN
 #
-#Packet Structure
+#Payloads are split into packets by SBD/packetizer.py:
 #<packet-type> <sub-header> <data>
 #Sub-header 0:
 #    ,<id>,<start-byte>,<total-bytes>:
 #Sub-header 1 thru N:
 #    ,<id>,<start-byte>:
 #--------------------------------------------------------------------------------------------
-def send_microSWIFT_50(payload_data, timeout):
-    logger.info('---------------sendSBD.send_microSWIFT_50------------------')
-    logger.info('sending microSWIFT telemetry (type 50)')
-    
-    global id
+def check_payload(payload_data, sensor_type):
+    """
+    Check the size of a payload against its sensor type
+
+    Output:
+        - True if the payload has the expected number of bytes
+    """
     payload_size = len(payload_data)
-    
-    #check for data
     if payload_size == 0:
         logger.info('Error: payload data is empty')
-        successful_send = False
-        return successful_send
- 
-    if payload_size != 1245:
-        logger.info('Error: unexpected number of bytes in payload data. Expected bytes: 1245, bytes received: {}'.format(payload_size))
-        successful_send = False
-        return successful_send
-    
-    index = 0 #byte index
-    packet_type = 1 #extended message
-        
-    #split up payload data into packets    
-    #first packet to send
-    header = str(packet_type).encode('ascii') #packet type as as ascii number
-    sub_header0 = str(','+str(id)+','+str(index)+','+str(payload_size)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes0 = payload_data[index:325] #data bytes for packet 0
-    packet0 = header + sub_header0 + payload_bytes0
-    
-    
-    #second packet to send
-    index = 325
-    sub_header1 = str(','+str(id)+','+str(index)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes1 = payload_data[index:653] #data bytes for packet 1    
-    packet1 = header + sub_header1 + payload_bytes1         
-    
-    
-    #third packet to send
-    index = 653
-    sub_header2 = str(','+str(id)+','+str(index)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes2 = payload_data[index:981] #data bytes for packet 2
-    packet2 = header + sub_header2 + payload_bytes2      
-   
-    
-    #fourth packet to send
-    index = 981
-    sub_header3 = str(','+str(id)+','+str(index)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes3 = payload_data[index:1245] #data bytes for packet 3
-    packet3 = header + sub_header3 + payload_bytes3 
-    
-    message = [packet0, packet1, packet2, packet3] #list of packets
-    ordinal = ['first', 'second', 'third', 'fourth']
+        return False
+    if payload_size != schema_for(sensor_type).size:
+        logger.info(f'Error: unexpected number of bytes in payload data. Expected bytes: {schema_for(sensor_type).size}, bytes received: {payload_size}')
+        return False
+    return True
 
+def send_microSWIFT_50(payload_data, timeout, modem=None):
+    logger.info('---------------sendSBD.send_microSWIFT_50------------------')
+    logger.info('sending microSWIFT telemetry (type 50)')
+    if not check_payload(payload_data, 50):
+        return False
+    packets = packetize(payload_data, id)
+    logger.info(f'Sending {len(packets)} packet message (50)')
+    return send_packets(packets, timeout, modem)
 
-    while datetime.utcnow() < timeout:  
-    
-        #initialize modem
-        ser, modem_initialized = initModem()
+def send_microSWIFT_51(payload_data, timeout, modem=None):
+    logger.info('---------------sendSBD.send_microSWIFT_51------------------')
+    logger.info('sending microSWIFT telemetry (type 51)')
+    if not check_payload(payload_data, 51):
+        return False
+    packets = packetize(payload_data, id)
+    logger.info(f'Sending {len(packets)} packet message (51)')
+    return send_packets(packets, timeout, modem)
+
+def send_microSWIFT_52(payload_data, timeout, modem=None):
+    logger.info('---------------sendSBD.send_microSWIFT_52------------------')
+    logger.info('sending microSWIFT telemetry (type 52)')
+    if not check_payload(payload_data, 52):
+        return False
+    packets = packetize(payload_data, id)
+    logger.info(f'Sending {len(packets)} packet message with complete wave statistics (52)')
+    return send_packets(packets, timeout, modem)
+
+def send_payloads(payloads, sensor_types, timeout, modem=None):
+    """
+    Send several payloads as one message (see packetizer.combine)
+
+    Input:
+        - payloads, list of payloads (bytes)
+        - sensor_types, sensor type of each payload (50, 51, or 52)
+        - timeout, datetime at which to give up
+        - modem, open ModemSession to send through
+
+    Output:
+        - successful_send, True if all packets were sent
+    """
+    logger.info('---------------sendSBD.send_payloads------------------')
+    if not all(check_payload(payload_data, sensor_type) for payload_data, sensor_type in zip(payloads, sensor_types)):
+        return False
+    packets = packetize(combine(payloads), id)
+    logger.info(f'Sending {len(payloads)} payloads (types {sensor_types}) as one {len(packets)} packet message')
+    return send_packets(packets, timeout, modem)
+
+def send_packets(packets, timeout, modem=None):
+    """
+    Send the packets of one message: wait for a rolling average signal quality of at least 3
+    bars over 3 readings, then transmit each packet, retrying until the timeout
+
+    Input:
+        - packets, list of packets (bytes)
+        - timeout, datetime at which to give up
+        - modem, open ModemSession to send through; by default a session is opened for this
+          message and the modem is powered down afterwards
+
+    Output:
+        - successful_send, True if all packets were sent
+    """
+    global id
+    if modem is None:
+        with ModemSession(timeout) as modem:
+            return send_packets(packets, timeout, modem)
+
+    ordinal = ['first', 'second', 'third', 'fourth', 'fifth', 'sixth'] + [f'{i+1}th' for i in range(6, len(packets))]
+    while datetime.utcnow() < timeout:
 
-        if not modem_initialized:
+        #initialize modem, or check that the open session still responds
+        if not modem.ready():
             logger.info('Modem not initialized')
-            GPIO.output(modemGPIO,GPIO.LOW) #power off modem
+            t.sleep(retryDelay)
             continue
-        
-        #send packets
-        logger.info('Sending 4 packet message (50)')
-        
-        i=0
+
         signal=[]
-        while datetime.utcnow() <= timeout:
-            
-            isignal = sig_qual(ser)
+        failures = 0
+        while datetime.utcnow() < timeout:
+
+            isignal = sig_qual(modem.ser)
             if isignal < 0:
+                #back off before asking again; reinitialize the modem after repeated failures
+                failures += 1
+                if failures >= maxFailures:
+                    logger.info(f'No signal quality after {failures} attempts; reinitializing modem')
+                    modem.close()
+                    break
+                t.sleep(min(retryDelay * 2**(failures-1), maxRetryDelay))
                 continue
-            else: 
-                signal.append(isignal)
-                i+=1
-            
-            if len(signal) >= 3 and np.mean(signal[i-3:i]) >= 3: #check rolling average of last 3 values, must be at least 3 bars
-                signal.clear() #clear signal values
-                i=0 #reset counter
-                
+            failures = 0
+            signal.append(isignal)
+
+            if len(signal) >= 3 and np.mean(signal[-3:]) >= 3: #check rolling average of last 3 values, must be at least 3 bars
                 #attempt to transmit packets
-                for i in range(4):
+                for i, packet in enumerate(packets):
                     retry = 0
                     issent  = False
                     while issent == False:
                         if datetime.utcnow() < timeout:
                             logger.info('Sending {} packet. Retry {}'.format(ordinal[i], retry))
-                            issent  = transmit_bin(ser,message[i])            
+                            issent  = transmit_bin(modem.ser, packet)
+                            modem.touch()
                             retry += 1
                         else:
                             logger.info('Send SBD timeout. Message not sent')
-                            #turn off modem
-                            logger.info('Powering down modem')    
-                            GPIO.output(modemGPIO,GPIO.LOW)
-                            successful_send = False
-                            
                             logger.info('-----------------------------------------------------------')
+                            return False
 
-                            return successful_send
-                #increment message counter for each completed message
-                if id >= 99:
-                     id = 0
-                else:   
-                    id+=1
-
-                # Final print statement that it sent
-                logger.info('Sent SBD successfully')      
-                #turn off modem
-                logger.info('Powering down modem')    
-                GPIO.output(modemGPIO,GPIO.LOW)
-                successful_send = True
-                
-                logger.info('-----------------------------------------------------------')
-
-                return successful_send
-            
-
-    #turn off modem
-    logger.info('Send SBD timeout. Message not sent')
-    logger.info('powering down modem')    
-    GPIO.output(modemGPIO,GPIO.LOW)
-    successful_send = False
-
-    logger.info('-----------------------------------------------------------')
-    return successful_send
-   
-
-def send_microSWIFT_51(payload_data, timeout):
-    logger.info('---------------sendSBD.send_microSWIFT_51------------------')
-    logger.info('sending microSWIFT telemetry (type 51)')
-    
-    global id
-    payload_size = len(payload_data)
-    
-    #check for data
-    if payload_size == 0:
-        logger.info('Error: payload data is empty')
-        successful_send = False
-        return successful_send
-    
-    if payload_size != 249:
-        logger.info('Error: unexpected number of bytes in payload data. Expected bytes: 249, bytes received: {}'.format(payload_size))
-        successful_send = False
-        return successful_send
-    
-    #split up payload data into packets    
-    index = 0 #byte index
-    packet_type = 0 #single packet
-    
-    #packet to send
-    header = str(packet_type).encode('ascii') #packet type as as ascii number
-    sub_header0 = str(','+str(id)+','+str(index)+','+str(payload_size)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes0 = payload_data[index:249] #data bytes for packet
-    packet0 = header + sub_header0 + payload_bytes0 
-    
-    while datetime.utcnow() < timeout:
-    
-        #initialize modem
-        ser, modem_initialized = initModem()
-
-        if not modem_initialized:
-            logger.info('Modem not initialized')
-            GPIO.output(modemGPIO,GPIO.LOW) #power off modem
-            continue
-        
-        #send packets
-        logger.info('Sending single packet message (51)')
-        
-        i=0
-        signal=[]
-        while datetime.utcnow() < timeout:
-            
-            isignal = sig_qual(ser)
-            if isignal < 0:
-                continue
-            else: 
-                signal.append(isignal)
-                i+=1
-            
-            if len(signal) >= 3 and np.mean(signal[i-3:i]) >= 3: #check rolling average of last 3 values, must be at least 3 bars
-                signal.clear() #clear signal values
-                i=0 #reset counter
-                
-                #attempt to transmit packets
-                retry = 0
-                issent  = False
-                while issent == False and datetime.utcnow() < timeout:
-                    logger.info('Sending packet. Retry {}'.format(retry))
-                    issent  = transmit_bin(ser, packet0)            
-                    retry += 1
                 #increment message counter for each completed message
                 if id >= 99:
                     id = 0
-                else:   
-                    id+=1
-
-                # Final print statement that it sent
-                logger.info('Sent SBD successfully')      
-                #turn off modem
-                logger.info('Powering down modem')    
-                GPIO.output(modemGPIO,GPIO.LOW)
-                successful_send = True
-                
-                logger.info('-----------------------------------------------------------')
-
-                return successful_send
-             
-            else: 
-                continue
- 
-    #turn off modem
-    logger.info('Send SBD timeout. Message not sent')
-    logger.info('powering down modem')    
-    GPIO.output(modemGPIO,GPIO.LOW)
-    successful_send = False
-
-    logger.info('-----------------------------------------------------------')
-
-    return successful_send
-    
-def send_microSWIFT_52(payload_data, timeout): #TODO: finish working on!
-    logger.info('---------------sendSBD.send_microSWIFT_52------------------')
-    logger.info('sending microSWIFT telemetry (type 52)')
-    
-    global id
-    payload_size = len(payload_data)
-    payload_size_exp = 327 #struct.calcsize('<sbbheee42eee42b42b42b42b42Bffeeef') 
-    
-    #check for data
-    if payload_size == 0:
-        logger.info('Error: payload data is empty')
-        successful_send = False
-        return successful_send
-    
-    if payload_size != payload_size_exp:
-        logger.info(f'Error: unexpected number of bytes in payload data. Expected bytes: {payload_size_exp}, bytes received: {payload_size}')
-        successful_send = False
-        return successful_send
-    
-    #split up payload data into packets    
-    index = 0 #byte index
-    packet_type = 0 #single packet
-    
-    #packet to send
-    header = str(packet_type).encode('ascii') #packet type as as ascii number
-    sub_header0 = str(','+str(id)+','+str(index)+','+str(payload_size)+':').encode('ascii') # ',<id>,<start-byte>,<total-bytes>:'
-    payload_bytes0 = payload_data[index:payload_size_exp] #data bytes for packet
-    packet0 = header + sub_header0 + payload_bytes0 
-    
-    while datetime.utcnow() < timeout:
-    
-        #initialize modem
-        ser, modem_initialized = initModem()
-
-        if not modem_initialized:
-            logger.info('Modem not initialized')
-            GPIO.output(modemGPIO,GPIO.LOW) #power off modem
-            continue
-        
-        #send packets
-        logger.info('Sending single packet message with complete wave statistics (52)')
-        
-        i=0
-        signal=[]
-        while datetime.utcnow() < timeout:
-            
-            isignal = sig_qual(ser)
-            if isignal < 0:
-                continue
-            else: 
-                signal.append(isignal)
-                i+=1
-            
-            if len(signal) >= 3 and np.mean(signal[i-3:i]) >= 3: #check rolling average of last 3 values, must be at least 3 bars
-                signal.clear() #clear signal values
-                i=0 #reset counter
-                
-                #attempt to transmit packets
-                retry = 0
-                issent  = False
-                while issent == False and datetime.utcnow() < timeout:
-                    logger.info('Sending packet. Retry {}'.format(retry))
-                    issent  = transmit_bin(ser, packet0)            
-                    retry += 1
-                #increment message counter for each completed message
-                if id >= 99:
-                    id = 0
-                else:   
+                else:
                     id+=1
 
                 # Final print statement that it sent
-                logger.info('Sent SBD successfully')      
-                #turn off modem
-                logger.info('Powering down modem')    
-                GPIO.output(modemGPIO,GPIO.LOW)
-                successful_send = True
-                
+                logger.info('Sent SBD successfully')
                 logger.info('-----------------------------------------------------------')
+                return True
 
-                return successful_send
-             
-            else: 
-                continue
- 
-    #turn off modem
     logger.info('Send SBD timeout. Message not sent')
-    logger.info('powering down modem')    
-    GPIO.output(modemGPIO,GPIO.LOW)
-    successful_send = False
-
     logger.info('-----------------------------------------------------------')
+    return False
 
-    return successful_send
 
 def sendSBD(ser, payload_data, next_start):
     import time
@@ -0,0 +1,183 @@
+"""
+Author: @jacobrdavis
+
+Crash-safe telemetry queue, replacing the rewrites of telemetryQueue.txt. Messages (TX files)
+are stored in an SQLite database in WAL mode with synchronous=FULL: every enqueue,
+acknowledgement, and attempt is a single small transaction appended to the write-ahead log, so
+a power cut leaves either the previous or the new state and the work does not grow with the
+backlog. Each message records its sensor type, payload size, number of send attempts, and
+creation time, so the send loop does not need to open a TX file to decide how to send it.
+
+Messages are sent newest first (LIFO) within a priority; a message stays in the queue until it
+is acknowledged as sent. Acknowledged messages are kept for a few days (keepDays) as a record
+of what was sent, and purged at boot. Several processes may use the queue at the same time (e.g. the
+processing and telemetry stages of utils/pipeline.py), each with its own TelemetryQueue.
+
+Contents:
+    - Message
+    - TelemetryQueue(filename, timeout) [main]
+
+Log:
+    - Oct 2026: created telemetryQueue.py
+    - Oct 2026: drop() for messages whose TX file is missing
+    - Oct 2026: purge() of acknowledged messages older than keepDays, so the database stays small
+"""
+#--Import Statements
+import os
+import sqlite3
+from collections import namedtuple
+from datetime import datetime, timedelta
+from logging import getLogger
+
+#--Constants
+keepDays = 7 # acknowledged messages are purged after this many days
+Message = namedtuple('Message', ['id', 'filename', 'sensor_type', 'size', 'priority', 'attempts', 'created'])
+
+_schema = '''CREATE TABLE IF NOT EXISTS messages (
+                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 filename TEXT NOT NULL,
+                 sensor_type INTEGER,
+                 size INTEGER,
+                 priority INTEGER NOT NULL DEFAULT 0,
+                 attempts INTEGER NOT NULL DEFAULT 0,
+                 created TEXT NOT NULL,
+                 sent TEXT);
+             CREATE INDEX IF NOT EXISTS pending ON messages (sent, priority, id);'''
+
+#--helper functions:
+class TelemetryQueue:
+    """
+    Queue of TX files waiting to be sent:
+
+        queue = TelemetryQueue('/home/pi/microSWIFT/SBD/telemetryQueue.db')
+        queue.enqueue(TX_fname, payload_data)
+        for message in queue.pending():     # newest first
+            queue.attempt(message.id)
+            if send(message):
+                queue.ack(message.id)
+            elif not os.path.exists(message.filename):
+                queue.drop(message.id)
+
+    Input:
+        - filename, database file
+        - timeout, time to wait for a lock held by another process [s]
+    """
+    def __init__(self, filename, timeout=30):
+        self.filename = filename
+        self._db = sqlite3.connect(filename, timeout=timeout, isolation_level=None) # autocommit; one transaction per statement
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=FULL')
+        self._db.executescript(_schema)
+
+    def enqueue(self, filename, payload_data=None, sensor_type=None, size=None, priority=0):
+        """
+        Add a message
+
+        Input:
+            - filename, TX file name
+            - payload_data, payload bytes (sensor type and size are read from it), or
+            - sensor_type, size, sensor type and payload size, if payload_data is not given
+            - priority, messages with a higher priority are sent first
+
+        Output:
+            - id, message id
+        """
+        if payload_data is not None:
+            sensor_type, size = payload_data[1], len(payload_data) # sensor type is stored 1 byte after the payload type
+        cursor = self._db.execute('INSERT INTO messages (filename, sensor_type, size, priority, created) VALUES (?, ?, ?, ?, ?)',
+                                  (filename, sensor_type, size, priority, datetime.utcnow().isoformat()))
+        return cursor.lastrowid
+
+    def pending(self, limit=-1):
+        """
+        Messages not yet acknowledged, highest priority first and newest first within a priority
+
+        Input:
+            - limit, maximum number of messages (-1 for all)
+
+        Output:
+            - list of Message
+        """
+        rows = self._db.execute('SELECT id, filename, sensor_type, size, priority, attempts, created FROM messages '
+                                'WHERE sent IS NULL ORDER BY priority DESC, id DESC LIMIT ?', (limit,))
+        return [Message(*row) for row in rows]
+
+    def attempt(self, id):
+        """
+        Count a send attempt of a message
+        """
+        self._db.execute('UPDATE messages SET attempts = attempts + 1 WHERE id = ?', (id,))
+
+    def ack(self, id):
+        """
+        Acknowledge a message as sent; it is no longer pending
+        """
+        self._db.execute('UPDATE messages SET sent = ? WHERE id = ?', (datetime.utcnow().isoformat(), id))
+
+    def drop(self, id):
+        """
+        Remove a message which cannot be sent (e.g. its TX file no longer exists)
+        """
+        self._db.execute('DELETE FROM messages WHERE id = ?', (id,))
+
+    def purge(self, days=keepDays):
+        """
+        Remove acknowledged messages sent more than a number of days ago
+
+        Input:
+            - days, age of the acknowledgement after which a message is removed [days]
+
+        Output:
+            - number of messages removed
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        cursor = self._db.execute('DELETE FROM messages WHERE sent IS NOT NULL AND sent < ?', (cutoff,))
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM messages WHERE sent IS NULL').fetchone()[0]
+
+    def import_list(self, listFilename):
+        """
+        Move the TX files of a telemetryQueue.txt list (oldest first) into the queue, reading each
+        payload once for its sensor type and size; the list is renamed to <listFilename>.imported
+
+        Input:
+            - listFilename, text file with one TX file name per line
+
+        Output:
+            - number of messages imported
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        if not os.path.exists(listFilename):
+            return 0
+        with open(listFilename) as file:
+            filenames = [line.strip() for line in file if line.strip()]
+        imported = 0
+        self._db.execute('BEGIN')
+        try:
+            for filename in filenames:
+                if self._db.execute('SELECT 1 FROM messages WHERE filename = ?', (filename,)).fetchone():
+                    continue # already imported before an interruption
+                try:
+                    with open(filename, 'rb') as file:
+                        self.enqueue(filename, file.read())
+                    imported += 1
+                except OSError as e:
+                    logger.info(f'unable to read {filename}, not queued: {e}')
+            self._db.execute('COMMIT')
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+        os.replace(listFilename, listFilename + '.imported')
+        logger.info(f'imported {imported} of {len(filenames)} message(s) from {listFilename}')
+        return imported
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
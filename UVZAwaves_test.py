@@ -125,7 +125,7 @@ str_to_list(df_buoy,columns=['freq','energy','a1','b1','a2','b2','check','dir','
 # df_buoy = pd.DataFrame(d_buoy)
 # df_buoy = df_buoy.set_index('Datetime')
 
-meanTime = datetime.fromtimestamp(np.mean([t.timestamp() for t in IMU['time']]))
+meanTime = np.mean(IMU['time'].astype('int64')).astype('int64').astype('datetime64[ns]').astype('datetime64[us]').item()
 # CDIP = df_buoy[df_buoy.index==datetime(2021, 10, 27, 19, 30, 0, 0)]
 CDIP = df_buoy[df_buoy.index==datetime(2021, 7, 12, 21, 0, 0, 0)]
 
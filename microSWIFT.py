@@ -26,9 +26,18 @@ Log:
 	- Aug 2022, @jacobrdavis: UVZAwaves
 	- Aug 2022, @jacobrdavis: sensor_type_52, salinity placeholder
 	- Aug 2022, @jacobrdavis: modified telemetry queue to check payload sensorType (to support multi-sensortype queues)
+	- Oct 2026: optional process-isolated acquisition (acquisition=process in Config.dat)
+	- Oct 2026: processing precision option (precision=float32 in Config.dat)
+	- Oct 2026: rolling GPSwaves estimate during the burst; provisional estimate of an interrupted burst queued at boot
+	- Oct 2026: processing and telemetry moved to process_burst and send_telemetry; optionally pipelined with the
+	  next recording (processing=pipelined in Config.dat)
+	- Oct 2026: burst windows from utils/scheduler.py; sleeps until the next window instead of polling every second
+	- Oct 2026: telemetry queue in SBD/telemetryQueue.py (SQLite) instead of telemetryQueue.txt
+	- Oct 2026: one modem session (SBD/sendSBD.py ModemSession) for all messages sent after a burst
+	- Oct 2026: queued payloads combined into one message where that takes fewer packets (SBD/packetizer.py)
+	- Oct 2026: sent messages purged from the telemetry queue at boot after a few days
 	
 TODO:
-	- telemetryQueue needs some way of knowing which SBD message it has. Possibly using len?
 	- generateHeader function for each script? (i.e. --fun.py---)
 """
 
@@ -40,20 +49,20 @@ import numpy as np
 from datetime import datetime, timedelta
 from logging import *
 import sys, os
-from time import sleep
 import struct
 
 # Import GPS functions
 from GPS.recordGPS import recordGPS
 from GPS.GPStoUVZ import GPStoUVZ
+from GPS.rollingGPSwaves import RollingGPSwaves, read_status, write_status, waveNames
 
 # Import IMU functions
 from IMU.recordIMU import recordIMU
 from IMU.IMUtoXYZ import IMUtoXYZ 
+from IMU.binaryIMU import BinaryIMUWriter, IMU_DTYPE
 
 # Import wave processing functions
 from waves.UVZAwaves import UVZAwaves
-from waves.GPSwaves import GPSwaves 
 
 # Import SBD functions
 from SBD.sendSBD import createTX
@@ -63,11 +72,20 @@ from SBD.sendSBD import initModem
 from SBD.sendSBD import send_microSWIFT_50
 from SBD.sendSBD import send_microSWIFT_51
 from SBD.sendSBD import send_microSWIFT_52
+from SBD.sendSBD import send_payloads
+from SBD.sendSBD import ModemSession
+from SBD.telemetryQueue import TelemetryQueue
+from SBD.packetizer import pack
 
 # Import configuration and utility functions
 from utils.config3 import Config
 from utils.collateIMUandGPS import collateIMUandGPS
 from utils.fillBadValues import fillBadValues
+from utils.acquisition import acquire, GPS_DTYPE
+from utils.pipeline import Pipeline, Stage
+from utils.scheduler import BurstScheduler
+
+telemetryQueueFilename = '/home/pi/microSWIFT/SBD/telemetryQueue.db'
 
 def _get_uvzmean(badValue, pts):
 	mean = badValue     #set values to 999 initially and fill if valid value
@@ -86,6 +104,203 @@ def _get_last(badValue, pts):
 		
 	return badValue #returns badValue if no real position exists
 
+def process_burst(job):
+	"""
+	Process one burst and add its TX files to the telemetry queue (processing stage; see
+	utils/pipeline.py)
+
+	Input:
+		- job, burst dictionary: name, GPS and IMU file names and initialized flags, GPSwaves
+		  estimate from the rolling estimator, next_start, and deadline
+
+	Output:
+		- job, passed on to send_telemetry
+	"""
+	GPSdataFilename, gps_initialized = job['GPSdataFilename'], job['gps_initialized']
+	IMUdataFilename, imu_initialized = job['IMUdataFilename'], job['imu_initialized']
+	GPSwaves_estimate = job['GPSwaves_estimate']
+
+	## --------------- Data Processing Section ---------------------------------
+	# Time processing section
+	logger.info('Starting Processing')
+	begin_processing_time = datetime.now()
+	
+	# #---TODO: delete
+	# gps_initialized = True
+	# imu_initialized = True
+	# IMUdataFilename = '/home/pi/microSWIFT/data/microSWIFT057_IMU_17Aug2022_000146UTC.dat' #'microSWIFT043_IMU_05May2022_200006UTC.dat'#'microSWIFT021_IMU_12Jul2021_210000UTC.dat' #'microSWIFT014_IMU_27Oct2021_190006UTC.dat' 
+	# GPSdataFilename = '/home/pi/microSWIFT/data/microSWIFT057_GPS_17Aug2022_000151UTC.dat'
+	# #---TODO: delete
+		
+	if gps_initialized and imu_initialized: #gps_initialized == True and imu_initialized == True:
+		logger.info('GPS and IMU initialized')
+
+		# Compute u, v and z from raw GPS data
+		logger.info(f'entering GPStoUVZ.py: {GPSdataFilename}')
+		GPS = GPStoUVZ(GPSdataFilename) # u, v, z, lat, lon = GPStoUVZ(GPSdataFilename)
+		logger.info('GPStoUVZ executed')
+
+		# Process raw IMU data
+		logger.info(f'entering IMUtoXYZ.py: {IMUdataFilename}')
+		IMU = IMUtoXYZ(IMUdataFilename, IMU_fs, dtype=precision) # ax, vx, px, ay, vy, py, az, vz, pz = IMUtoXYZ(IMUdataFilename,IMU_fs)
+		logger.info('IMUtoXYZ.py executed')
+
+		# Collate IMU and GPS onto a master time based on the IMU time
+		logger.info('entering collateIMUandGPS.py')
+		IMUcol,GPScol = collateIMUandGPS(IMU, GPS, dtype=precision)
+		logger.info('collateIMUandGPS.py executed')
+
+		# UVZAwaves estimate; leave out first 120 seconds
+		zeroPts = int(np.round(120*IMU_fs)) 
+		logger.info(f'Zeroing out first 120 seconds ({zeroPts} pts)')
+		Hs, Tp, Dp, E, f, a1, b1, a2, b2, check  = UVZAwaves(GPScol['u'][zeroPts:], GPScol['v'][zeroPts:], IMUcol['pz'][zeroPts:], IMUcol['az'][zeroPts:], IMU_fs, dtype=precision)
+		logger.info('UVZAwaves.py executed, primary estimate (voltage==0)')
+
+		# GPSwaves estimate (secondary estimate)
+		Hs_2, Tp_2, Dp_2, E_2, f_2, a1_2, b1_2, a2_2, b2_2, check_2 = GPSwaves_estimate
+		logger.info('GPSwaves estimate from the burst, secondary estimate (voltage==1)')
+
+		# Unpack GPS variables for remaining code; use non-interpolated values
+		u=GPS['u']; v=GPS['v']; z=GPS['z']; lat=GPS['lat']; lon=GPS['lon']
+
+	elif gps_initialized and not imu_initialized: 
+		
+		# Compute u, v and z from raw GPS data
+		u, v, z, lat, lon = GPStoUVZ(GPSdataFilename)
+
+		# Compute Wave Statistics from GPSwaves algorithm
+		Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = GPSwaves_estimate
+
+	elif imu_initialized and not gps_initialized:
+		#TODO: Process IMU data
+		logger.info(f'GPS did not initialize but IMU did; would put IMU processing here but it is not yet functional... entering bad values ({badValue})')
+		u,v,z,lat,lon,Hs,Tp,Dp,E,f,a1,b1,a2,b2,check = fillBadValues(badVal=badValue, spectralLen=numCoef)
+
+	else: # no IMU or GPS, enter bad values
+		logger.info(f'Neither GPS or IMU initialized - entering bad values ({badValue})')
+		u,v,z,lat,lon,Hs,Tp,Dp,E,f,a1,b1,a2,b2,check = fillBadValues(badVal=badValue, spectralLen=numCoef)
+
+	# check lengths of spectral quanities:
+	if len(E)!=numCoef or len(f)!=numCoef:
+		logger.info(f'WARNING: the length of E or f does not match the specified number of coefficients, {numCoef}; (len(E)={len(E)}, len(f)={len(f)})')
+
+	# Compute mean velocities, elevation, lat and lon
+	u_mean = np.nanmean(u)
+	v_mean = np.nanmean(v)
+	z_mean = np.nanmean(z) 
+
+	#Get last reported position
+	last_lat = _get_last(badValue, lat)
+	last_lon = _get_last(badValue, lon)
+
+	# Temperature and Voltage recordings - will be added in later versions
+	temp = 0.0
+	salinity = 0.0
+	volt = 0   #NOTE: primary estimate
+	volt_2 = 1 #NOTE: secondary estimate (GPS if IMU and GPS are both initialized)
+
+	# End Timing of recording
+	logger.info('Processing section took {}'.format(datetime.now() - begin_processing_time))
+
+	## -------------- TX Files ----------------------------------
+	# Create TX file from processData.py output from combined wave products
+
+	# Pack the data from the queue into the payload package
+	logger.info('Creating TX file and packing payload data from primary estimate')
+	TX_fname, payload_data = createTX(Hs, Tp, Dp, E, f, a1, b1, a2, b2, check, u_mean, v_mean, z_mean, last_lat, last_lon, temp, salinity, volt)
+
+	try: # GPSwaves estimate as secondary estimate
+		logger.info('Creating TX file and packing payload data from secondary estimate')
+		TX_fname_2, payload_data_2 = createTX(Hs_2, Tp_2, Dp_2, E_2, f_2, a1_2, b1_2, a2_2, b2_2, check_2, u_mean, v_mean, z_mean, last_lat, last_lon, temp, salinity, volt_2)
+	except:
+		logger.info('No secondary estimate exists')
+
+	# Append secondary estimate first (LIFO), then the primary estimate
+	with TelemetryQueue(telemetryQueueFilename) as queue:
+		try:
+			logger.info(f'Adding TX file {TX_fname_2} to the telemetry queue')
+			queue.enqueue(TX_fname_2, payload_data_2)
+		except:
+			logger.info('No secondary estimate exists to add to queue')
+		logger.info(f'Adding TX file {TX_fname} to the telemetry queue')
+		queue.enqueue(TX_fname, payload_data)
+
+	return job
+
+def send_telemetry(job):
+	"""
+	Send as many messages from the telemetry queue as possible, newest first, until the job
+	deadline (telemetry stage; see utils/pipeline.py)
+
+	Input:
+		- job, burst dictionary (see process_burst)
+	"""
+	next_start = job['deadline']
+
+	# Send as many messages from the queue as possible during the send window, newest first; the
+	# modem is powered up for the first message and down once the queue is drained or time is up
+	with TelemetryQueue(telemetryQueueFilename) as queue, ModemSession(next_start) as modem:
+		messages = queue.pending()
+		logger.info('Number of Messages to send: {}'.format(len(messages)))
+
+		# Read the TX files of the pending messages
+		payloads, sensor_types, ids = [], [], []
+		for message in messages:
+			logger.info(f'Opening TX file from payload list: {message.filename} (sensor type {message.sensor_type}, {message.size} bytes, {message.attempts} previous attempts)')
+			try:
+				with open(message.filename, mode='rb') as file: # b is important -> binary
+					payloads.append(file.read())
+			except FileNotFoundError as e:
+				logger.info(f'TX file is missing, message dropped from the queue: {e}')
+				queue.drop(message.id)
+				continue
+			except OSError as e:
+				logger.info(f'Unable to open TX file: {e}')
+				continue
+
+			if message.sensor_type not in [50,51,52]:
+				logger.info(f'Failed to read sensor type properly; read sensor type as: {message.sensor_type}')
+				logger.info(f'Trying to send as configured sensor type instead ({sensor_type})')
+				sensor_types.append(sensor_type)
+			else:
+				sensor_types.append(message.sensor_type)
+			ids.append(message.id)
+
+		# Send payloads which take fewer packets together as one message (see SBD/packetizer.py)
+		messages_sent = 0
+		for group in pack(payloads):
+			# Check if we are still in the send window 
+			if datetime.utcnow() >= next_start:
+				break
+
+			# send either payload type 50, 51, or 52, or several payloads combined
+			for i in group:
+				queue.attempt(ids[i])
+			successful_send = False
+			send_sensor_type = sensor_types[group[0]]
+			payload_data = payloads[group[0]]
+			if len(group) > 1:
+				successful_send = send_payloads([payloads[i] for i in group], [sensor_types[i] for i in group], next_start, modem)
+			elif send_sensor_type == 50:
+				successful_send = send_microSWIFT_50(payload_data, next_start, modem)
+			elif send_sensor_type == 51:
+				successful_send = send_microSWIFT_51(payload_data, next_start, modem)
+			elif send_sensor_type == 52:
+				successful_send = send_microSWIFT_52(payload_data, next_start, modem)
+			else:
+				logger.info(f'Specified sensor type ({send_sensor_type}) is invalid or not currently supported')
+
+			# Acknowledge the messages (removing them from the queue) if successful send is true
+			if successful_send == True:
+				for i in group:
+					queue.ack(ids[i])
+				messages_sent += len(group)
+
+		# Log the send statistics
+		logger.info('Messages Sent: {}'.format(int(messages_sent)))
+		logger.info('Messages Remaining: {}'.format(len(queue)))
+		logger.info(f'Modem initializations: {modem.initializations}')
+
 # Main body of microSWIFT.py
 if __name__=="__main__":
 
@@ -108,18 +323,17 @@ if __name__=="__main__":
 	burst_seconds = config.getInt('System', 'burst_seconds')
 	burst_time = config.getInt('System', 'burst_time')
 	burst_int = config.getInt('System', 'burst_interval')
+	acquisition_mode = config.getString('System', 'acquisition') or 'thread'
+	precision = config.getString('System', 'precision') or 'float64' # processing precision, float64 or float32
+	processing_mode = config.getString('System', 'processing') or 'serial' # serial, or pipelined with the next recording
+	ring_seconds = 60 # length of the acquisition ring buffers in process mode
 	
 	# GPS parameters
 	GPS_fs = config.getInt('GPS', 'gps_frequency') #currently not used, hardcoded at 4 Hz (see init_gps function)
+	rolling_windows = config.getInt('GPS', 'rolling_windows') or 0 # provisional GPSwaves estimate every rolling_windows windows
+	status_file = config.getString('GPS', 'status_file') # latest GPSwaves estimate, see GPS/rollingGPSwaves.py
 	# IMU parameters
-	IMU_fs = config.getFloat('IMU', 'imuFreq') #TODO: NOTE this has been changed to 12 from 12.5 (actual) to obtain proper # of pts in processing
-
-	#Compute number of bursts per hour
-	num_bursts = int(60 / burst_int)
-	
-	#Generate lists of burst start and end times based on parameters from Config file
-	start_times = [burst_time + i*burst_int for i in range(num_bursts)]
-	end_times = [start_times[i] + burst_seconds/60 for i in range(num_bursts)]
+	IMU_fs = config.getFloat('IMU', 'imuFreq') #recordIMU samples at exactly this rate (deadline-driven, see IMU/sampleIMU.py)
 
 	# Set-up logging based on config file parameters
 	logger = getLogger('microSWIFT')
@@ -145,251 +359,108 @@ if __name__=="__main__":
 
 	# Define loop counter
 	loop_count = 1
-	wait_count = 0
 
 	# Initialize the telemetry queue if it does not exist yet
 	logger.info('Initializing Telemetry Queue')
-	telemetryQueue = open('/home/pi/microSWIFT/SBD/telemetryQueue.txt','a')
-	telemetryQueue.close()
-	
-	# Report number of messages in current queue:
-	telemetryQueue = open('/home/pi/microSWIFT/SBD/telemetryQueue.txt','r')
-	logger.info(f'Number of messages in queue: {len(telemetryQueue.readlines())}')
-	telemetryQueue.close
+	with TelemetryQueue(telemetryQueueFilename) as queue:
+		# Move the messages of the previous text file queue over
+		queue.import_list('/home/pi/microSWIFT/SBD/telemetryQueue.txt')
+
+		# Remove messages acknowledged as sent more than a few days ago
+		logger.info(f'Purged {queue.purge()} sent message(s) from the queue')
+
+		# Report number of messages in current queue:
+		logger.info(f'Number of messages in queue: {len(queue)}')
+
+	# Queue the provisional GPSwaves estimate of a burst which was interrupted (power loss, watchdog restart)
+	status = read_status(status_file) if status_file else None
+	if status is not None and status['state'] == 'provisional':
+		logger.info(f"Queueing provisional GPSwaves estimate of interrupted burst {status['filename']} ({status['windows']} windows, {status['time']})")
+		try:
+			TX_fname, payload_data = createTX(*[status[name] for name in waveNames], status['u_mean'], status['v_mean'], status['z_mean'], status['last_lat'], status['last_lon'], 0.0, 0.0, 1)
+			with TelemetryQueue(telemetryQueueFilename) as queue:
+				queue.enqueue(TX_fname, payload_data)
+			status['state'] = 'queued'
+			write_status(status_file, status)
+		except Exception as e:
+			logger.info(f'unable to queue provisional estimate: {e}')
+
+	# Processing and telemetry stages, run in their own processes while the next burst records
+	if processing_mode == 'pipelined':
+		pipeline = Pipeline([Stage('processing', process_burst), Stage('telemetry', send_telemetry)])
+	else:
+		pipeline = None
 
 	# --------------- Main Loop -------------------------
+	# Sleep until each burst window opens (see utils/scheduler.py)
+	scheduler = BurstScheduler(burst_time, burst_int, burst_seconds)
 	while True:
 
-		current_min = datetime.utcnow().minute + datetime.utcnow().second/60
+		window = scheduler.wait(onWake=pipeline.check if pipeline is not None else None)
 		begin_script_time = datetime.now()
 
 		## -------------- GPS and IMU Recording Section ---------------------------
 		# Time recording section
 		begin_recording_time = datetime.now()
 
-		# Both IMU and GPS start as unititialized
-		recording_complete = False
-
-		for i in np.arange(len(start_times)):
-			if current_min >= start_times[i] and current_min < end_times[i]: #Are we in a record window
-
-				# Start time of loop iteration
-				logger.info('----------- Iteration {} -----------'.format(loop_count))
-				
-				end_time = end_times[i]
-
-				# Define next start time to enter into the sendSBD function:
-				current_start = datetime.utcnow().replace(minute=start_times[i], second = 0, microsecond=0)
-				next_start = current_start + timedelta(minutes=burst_int)
-				
-				# Run recordGPS.py and recordIMU.py concurrently with asynchronous futures
-				#TODO: uncomment
-				with concurrent.futures.ThreadPoolExecutor() as executor:
-					# Submit Futures 
-					recordGPS_future = executor.submit(recordGPS, end_times[i])
-					recordIMU_future = executor.submit(recordIMU, end_times[i])
-
-					# get results from Futures
-					GPSdataFilename, gps_initialized = recordGPS_future.result()
-					IMUdataFilename, imu_initialized = recordIMU_future.result()
-				#TODO: uncomment 
-
-				#exit out of loop once burst is finished
-				recording_complete = True
-				
-				break
-
-		if recording_complete == True: 
-			## --------------- Data Processing Section ---------------------------------
-			# Time processing section
-			logger.info('Starting Processing')
-			begin_processing_time = datetime.now()
-			
-			# #---TODO: delete
-			# gps_initialized = True
-			# imu_initialized = True
-			# IMUdataFilename = '/home/pi/microSWIFT/data/microSWIFT057_IMU_17Aug2022_000146UTC.dat' #'microSWIFT043_IMU_05May2022_200006UTC.dat'#'microSWIFT021_IMU_12Jul2021_210000UTC.dat' #'microSWIFT014_IMU_27Oct2021_190006UTC.dat' 
-			# GPSdataFilename = '/home/pi/microSWIFT/data/microSWIFT057_GPS_17Aug2022_000151UTC.dat'
-			# #---TODO: delete
-				
-			if gps_initialized and imu_initialized: #gps_initialized == True and imu_initialized == True:
-				logger.info('GPS and IMU initialized')
-
-				# Compute u, v and z from raw GPS data
-				logger.info(f'entering GPStoUVZ.py: {GPSdataFilename}')
-				GPS = GPStoUVZ(GPSdataFilename) # u, v, z, lat, lon = GPStoUVZ(GPSdataFilename)
-				logger.info('GPStoUVZ executed')
-
-				# Process raw IMU data
-				logger.info(f'entering IMUtoXYZ.py: {IMUdataFilename}')
-				IMU = IMUtoXYZ(IMUdataFilename, IMU_fs) # ax, vx, px, ay, vy, py, az, vz, pz = IMUtoXYZ(IMUdataFilename,IMU_fs)
-				logger.info('IMUtoXYZ.py executed')
-
-				# Collate IMU and GPS onto a master time based on the IMU time
-				logger.info('entering collateIMUandGPS.py')
-				IMUcol,GPScol = collateIMUandGPS(IMU, GPS)
-				logger.info('collateIMUandGPS.py executed')
-
-				# UVZAwaves estimate; leave out first 120 seconds
-				zeroPts = int(np.round(120*IMU_fs)) 
-				logger.info(f'Zeroing out first 120 seconds ({zeroPts} pts)')
-				Hs, Tp, Dp, E, f, a1, b1, a2, b2, check  = UVZAwaves(GPScol['u'][zeroPts:], GPScol['v'][zeroPts:], IMUcol['pz'][zeroPts:], IMUcol['az'][zeroPts:], IMU_fs)
-				logger.info('UVZAwaves.py executed, primary estimate (voltage==0)')
-
-				# GPSwaves estimate (secondary estimate)
-				Hs_2, Tp_2, Dp_2, E_2, f_2, a1_2, b1_2, a2_2, b2_2, check_2 = GPSwaves(GPS['u'], GPS['v'], GPS['z'], GPS_fs)
-				logger.info('GPSwaves.py executed, secondary estimate (voltage==1)')
-
-				# Unpack GPS variables for remaining code; use non-interpolated values
-				u=GPS['u']; v=GPS['v']; z=GPS['z']; lat=GPS['lat']; lon=GPS['lon']
-
-			elif gps_initialized and not imu_initialized: 
-				
-				# Compute u, v and z from raw GPS data
-				u, v, z, lat, lon = GPStoUVZ(GPSdataFilename)
-
-				# Compute Wave Statistics from GPSwaves algorithm
-				Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = GPSwaves(u, v, z, GPS_fs)
-
-			elif imu_initialized and not gps_initialized:
-				#TODO: Process IMU data
-				logger.info(f'GPS did not initialize but IMU did; would put IMU processing here but it is not yet functional... entering bad values ({badValue})')
-				u,v,z,lat,lon,Hs,Tp,Dp,E,f,a1,b1,a2,b2,check = fillBadValues(badVal=badValue, spectralLen=numCoef)
-
-			else: # no IMU or GPS, enter bad values
-				logger.info(f'Neither GPS or IMU initialized - entering bad values ({badValue})')
-				u,v,z,lat,lon,Hs,Tp,Dp,E,f,a1,b1,a2,b2,check = fillBadValues(badVal=badValue, spectralLen=numCoef)
-
-			# check lengths of spectral quanities:
-			if len(E)!=numCoef or len(f)!=numCoef:
-				logger.info(f'WARNING: the length of E or f does not match the specified number of coefficients, {numCoef}; (len(E)={len(E)}, len(f)={len(f)})')
-
-			# Compute mean velocities, elevation, lat and lon
-			u_mean = np.nanmean(u)
-			v_mean = np.nanmean(v)
-			z_mean = np.nanmean(z) 
+		# Start time of loop iteration
+		logger.info('----------- Iteration {} -----------'.format(loop_count))
 		
-			#Get last reported position
-			last_lat = _get_last(badValue, lat)
-			last_lon = _get_last(badValue, lon)
-
-			# Temperature and Voltage recordings - will be added in later versions
-			temp = 0.0
-			salinity = 0.0
-			volt = 0   #NOTE: primary estimate
-			volt_2 = 1 #NOTE: secondary estimate (GPS if IMU and GPS are both initialized)
-
-			# End Timing of recording
-			logger.info('Processing section took {}'.format(datetime.now() - begin_processing_time))
-				
-			## -------------- Telemetry Section ----------------------------------
-			# Create TX file from processData.py output from combined wave products
-
-			# Pack the data from the queue into the payload package
-			logger.info('Creating TX file and packing payload data from primary estimate')
-			TX_fname, payload_data = createTX(Hs, Tp, Dp, E, f, a1, b1, a2, b2, check, u_mean, v_mean, z_mean, last_lat, last_lon, temp, salinity, volt)
-		
-			try: # GPSwaves estimate as secondary estimate
-				logger.info('Creating TX file and packing payload data from secondary estimate')
-				TX_fname_2, payload_data_2 = createTX(Hs_2, Tp_2, Dp_2, E_2, f_2, a1_2, b1_2, a2_2, b2_2, check_2, u_mean, v_mean, z_mean, last_lat, last_lon, temp, salinity, volt_2)
-			except:
-				logger.info('No secondary estimate exists')
-
-			# Read in the file names from the telemetry queue
-			telemetryQueue = open('/home/pi/microSWIFT/SBD/telemetryQueue.txt','r')
-			payload_filenames = telemetryQueue.readlines()
-			telemetryQueue.close()
-			payload_filenames_stripped = []
-			for line in payload_filenames:
-				payload_filenames_stripped.append(line.strip())
-
-			# Append secondary estimate first (LIFO)
-			try:
-				logger.info(f'Adding TX file {TX_fname_2} to the telemetry queue')
-				payload_filenames_stripped.append(TX_fname_2)
-			except:
-				logger.info('No secondary estimate exists to add to queue')
-
-			# Append the primary estimate
-			logger.info(f'Adding TX file {TX_fname} to the telemetry queue')
-			payload_filenames_stripped.append(TX_fname)
-			
-			# Write all the filenames to the file including the newest file name
-			telemetryQueue = open('/home/pi/microSWIFT/SBD/telemetryQueue.txt','w')
-			for line in payload_filenames_stripped:
-				telemetryQueue.write(line)
-				telemetryQueue.write('\n')
-			telemetryQueue.close()
-
-			# Append the newest file name to the list
-			payload_filenames_LIFO = list(np.flip(payload_filenames_stripped))
-			logger.info('Number of Messages to send: {}'.format(len(payload_filenames_LIFO)))
-
-			# Send as many messages from the queue as possible during the send window
-			messages_sent = 0
-			logger.info(payload_filenames_LIFO)
-			for TX_file in payload_filenames_LIFO:
-				# Check if we are still in the send window 
-				if datetime.utcnow() < next_start:
-					logger.info(f'Opening TX file from payload list: {TX_file}')
-					
-					with open(TX_file, mode='rb') as file: # b is important -> binary
-						payload_data = file.read()
-
-					# read in the sensor type from the binary payload file
-					payloadStartIdx = 0 # (no header) otherwise it is: = payload_data.index(b':') 
-					sensor_type0 = ord(payload_data[payloadStartIdx+1:payloadStartIdx+2]) # sensor type is stored 1 byte after the header
-					
-					if sensor_type0 not in [50,51,52]:
-						logger.info(f'Failed to read sensor type properly; read sensor type as: {sensor_type0}')
-						logger.info(f'Trying to send as configured sensor type instead ({sensor_type})')
-						send_sensor_type = sensor_type
-					else:
-						send_sensor_type = sensor_type0
-
-					# send either payload type 50, 51, or 52
-					if send_sensor_type == 50:
-						successful_send = send_microSWIFT_50(payload_data, next_start)
-					elif send_sensor_type == 51:
-						successful_send = send_microSWIFT_51(payload_data, next_start)
-					elif send_sensor_type == 52:
-						successful_send = send_microSWIFT_52(payload_data, next_start)
-					else:
-						logger.info(f'Specified sensor type ({send_sensor_type}) is invalid or not currently supported')
-
-					# Index up the messages sent value if successful send is true
-					if successful_send == True:
-						messages_sent += 1
-				else:
-					# Exit the for loop if outside of the end time 
-					break
-
-			# Log the send statistics
-			logger.info('Messages Sent: {}'.format(int(messages_sent)))
-			messages_remaining = int(len(payload_filenames_stripped)) - messages_sent
-			logger.info('Messages Remaining: {}'.format(messages_remaining))
-
-			# Remove the sent messages from the queue by writing the remaining lines to the file
-			if messages_sent > 0:
-				del payload_filenames_stripped[-messages_sent:]
-			telemetryQueue = open('/home/pi/microSWIFT/SBD/telemetryQueue.txt','w')
-			for line in payload_filenames_stripped:
-				telemetryQueue.write(line)
-				telemetryQueue.write('\n')
-			telemetryQueue.close()
-
-			# Increment up the loop counter
-			loop_count += 1
-			wait_count = 0
-
-			# End Timing of entire Script
-			logger.info('microSWIFT.py took {}'.format(datetime.now() - begin_script_time))
+		end_time = window.end_time # minutes past the hour
+
+		# GPSwaves estimate updated as the GPS sentences are recorded
+		rolling = RollingGPSwaves(GPS_fs, status_file, rolling_windows)
+		GPSwaves_estimate = None
+
+		# Define next start time to enter into the sendSBD function:
+		current_start = window.start
+		next_start = current_start + timedelta(minutes=burst_int)
 		
+		if acquisition_mode == 'process':
+			# Run recordGPS.py and recordIMU.py in their own processes; samples are passed back through
+			# shared-memory ring buffers and written to file here
+			producers = {'GPS': (recordGPS, GPS_DTYPE, ring_seconds*GPS_fs*4, rolling.open_sink), # up to 3 sentences per fix, with margin
+						 'IMU': (recordIMU, IMU_DTYPE, int(ring_seconds*IMU_fs), BinaryIMUWriter)}
+			results, dropped = acquire(end_time, producers)
+			GPSdataFilename, gps_initialized = results['GPS']
+			IMUdataFilename, imu_initialized = results['IMU']
+		else:
+			# Run recordGPS.py and recordIMU.py concurrently with asynchronous futures
+			#TODO: uncomment
+			with concurrent.futures.ThreadPoolExecutor() as executor:
+				# Submit Futures 
+				recordGPS_future = executor.submit(recordGPS, end_time, rolling.open_file)
+				recordIMU_future = executor.submit(recordIMU, end_time)
+
+				# get results from Futures
+				GPSdataFilename, gps_initialized = recordGPS_future.result()
+				IMUdataFilename, imu_initialized = recordIMU_future.result()
+			#TODO: uncomment 
+
+		# final GPSwaves estimate, from the sentences not yet processed
+		if gps_initialized:
+			GPSwaves_estimate = rolling.finalize()
+
+		# Hand the burst over to processing and telemetry
+		job = {'name': f'burst {loop_count} ({current_start:%d%b%Y %H%M} UTC)',
+			   'GPSdataFilename': GPSdataFilename, 'gps_initialized': gps_initialized,
+			   'IMUdataFilename': IMUdataFilename, 'imu_initialized': imu_initialized,
+			   'GPSwaves_estimate': GPSwaves_estimate, 'next_start': next_start}
+		if pipeline is not None:
+			# processing and telemetry run in the pipeline processes while the next burst records;
+			# they have until the end of the next burst
+			job['deadline'] = next_start + timedelta(seconds=burst_seconds)
+			logger.info(f"Submitting {job['name']} to the processing pipeline (deadline {job['deadline']})")
+			pipeline.submit(job)
+			pipeline.check()
 		else:
-			sleep(1)
-			wait_count += 1
-			# Print waiting to log every 5 iterations
-			if wait_count % 10 == 0:
-				logger.info('Waiting to enter record window')
-			continue
+			# process, then send until the next burst starts
+			job['deadline'] = next_start
+			send_telemetry(process_burst(job))
+
+		# Increment up the loop counter
+		loop_count += 1
+
+		# End Timing of entire Script
+		logger.info('microSWIFT.py took {}'.format(datetime.now() - begin_script_time))
 			
\ No newline at end of file
@@ -0,0 +1,97 @@
+## Precision Mode Regression Script
+"""
+Quantifies the effect of float32 processing (precision=float32 in Config.dat) on the wave
+estimates: runs the onboard pipeline (IMUtoXYZ, collateIMUandGPS, UVZAwaves, and GPSwaves) on
+each burst in float64 and in float32 and reports the deviation of Hs, Tp, Dp, the energy
+spectrum, and the directional moments from the float64 reference, with the run time and peak
+memory (tracemalloc) of each.
+
+Bursts are the IMU files in ./waves/testdata/ (or given as arguments) with the GPS file of the
+same microSWIFT and burst. Without files, synthetic bursts (testApps/UVZAwavesEstimator_test.py)
+are passed to UVZAwaves at 12 and 48 Hz and GPSwaves at 4 and 25 Hz.
+
+Usage (from the repository root):
+    python3 precision_benchmark.py [--fs IMU_FS] [IMU files...]
+"""
+import sys, glob, tracemalloc
+from timeit import default_timer as timer
+import numpy as np
+from GPS.GPStoUVZ import GPStoUVZ
+from IMU.IMUtoXYZ import IMUtoXYZ
+from utils.collateIMUandGPS import collateIMUandGPS
+from waves.UVZAwaves import UVZAwaves
+from waves.GPSwaves import GPSwaves
+from testApps.UVZAwavesEstimator_test import synthetic_burst
+
+dataDir = './waves/testdata/'
+precisions = ['float64', 'float32']
+tolerances = {'Hs': 0.01, 'Tp': 0.01, 'Dp': 1.0, 'E': 0.01, 'moments': 0.01} # [m], [s], [deg], relative to max(E), [-]
+
+def measure(fun, *args, **kwargs):
+    """ result, run time, and peak traced memory of fun(*args, **kwargs) """
+    tracemalloc.start()
+    start = timer()
+    result = fun(*args, **kwargs)
+    elapsed = timer() - start
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peakBytes
+
+def uvza_pipeline(imufile, gpsfile, fs, dtype):
+    """ onboard processing of one burst (see microSWIFT.py) """
+    GPS = GPStoUVZ(gpsfile)
+    IMU = IMUtoXYZ(imufile, fs, dtype=dtype)
+    IMUcol, GPScol = collateIMUandGPS(IMU, GPS, dtype=dtype)
+    zeroPts = int(np.round(120*fs))
+    return UVZAwaves(GPScol['u'][zeroPts:], GPScol['v'][zeroPts:], IMUcol['pz'][zeroPts:], IMUcol['az'][zeroPts:], fs, dtype=dtype)
+
+def deviations(single, double):
+    """ deviation of the float32 estimates from the float64 reference """
+    Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = [np.asarray(x, dtype=float) for x in double]
+    Hs_s, Tp_s, Dp_s, E_s, f_s, a1_s, b1_s, a2_s, b2_s, check_s = [np.asarray(x, dtype=float) for x in single]
+    return {'Hs': abs(Hs_s - Hs),
+            'Tp': abs(Tp_s - Tp),
+            'Dp': abs((Dp_s - Dp + 180) % 360 - 180),
+            'E': np.max(np.abs(E_s - E)) / np.max(E),
+            'moments': max(np.nanmax(np.abs(s - d)) for s, d in [(a1_s, a1), (b1_s, b1), (a2_s, a2), (b2_s, b2)])}
+
+def compare(name, fun, *args):
+    results = {}
+    for dtype in precisions:
+        results[dtype] = measure(fun, *args, dtype=dtype)
+    (double, doubleTime, doublePeak), (single, singleTime, singlePeak) = results['float64'], results['float32']
+    deviation = deviations(single, double)
+    print(f'{name}: Hs {double[0]:.4f} m, Tp {double[1]:.3f} s, Dp {double[2]:.2f} deg (float64)')
+    print('    float32 deviation: ' + ', '.join(f'{key} {value:.2e}' for key, value in deviation.items()))
+    print(f'    float64 {doubleTime*1e3:7.1f} ms, {doublePeak/2**20:6.1f} MiB peak; float32 {singleTime*1e3:7.1f} ms, {singlePeak/2**20:6.1f} MiB peak')
+    return all(deviation[key] <= tolerances[key] for key in tolerances)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    fs = 12
+    if '--fs' in args:
+        fs = float(args[args.index('--fs')+1])
+        del args[args.index('--fs'):args.index('--fs')+2]
+    imufiles = args or sorted(glob.glob(dataDir + '*_IMU_*.dat') + glob.glob(dataDir + '*_IMU_*.bin'))
+
+    passed = True
+    for imufile in imufiles:
+        gpsfiles = sorted(glob.glob(imufile.replace('_IMU_', '_GPS_')[:-11] + '*.dat')) # same microSWIFT, date, and hour
+        if not gpsfiles:
+            print(f'{imufile}: no GPS file found, skipped')
+            continue
+        passed &= compare(f'{imufile} (UVZAwaves)', uvza_pipeline, imufile, gpsfiles[0], fs)
+        GPS = GPStoUVZ(gpsfiles[0])
+        passed &= compare(f'{gpsfiles[0]} (GPSwaves)', GPSwaves, GPS['u'], GPS['v'], GPS['z'], 4)
+
+    if not imufiles:
+        print(f'No IMU files found in {dataDir}; using synthetic bursts')
+        for burstFs in [12, 48]: # UVZAwaves needs win/2 divisible by merge (see its TODO on f length)
+            u, v, z, a = synthetic_burst(burstFs, 1920)
+            passed &= compare(f'synthetic {burstFs} Hz (UVZAwaves)', UVZAwaves, u, v, z, a, burstFs)
+        for burstFs in [4, 25]: # GPSwaves needs the opposite
+            u, v, z, a = synthetic_burst(burstFs, 1920)
+            passed &= compare(f'synthetic {burstFs} Hz (GPSwaves)', GPSwaves, u, v, z, burstFs)
+
+    print(f'float32 deviations within tolerances {tolerances}: {passed}')
+    sys.exit(0 if passed else 1)
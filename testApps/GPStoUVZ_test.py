@@ -0,0 +1,51 @@
+## GPStoUVZ_test.py
+"""
+Checks that GPStoUVZ keeps GPGGA and GPVTG sentences paired when a line cannot be parsed: a
+burst with one corrupted GPVTG line (and, separately, one corrupted GPGGA line) in the middle
+returns as many velocity as elevation samples, badValue at the corrupted line, and the same
+values as the clean burst everywhere else.
+
+Usage (from the repository root):
+    python3 -m testApps.GPStoUVZ_test
+"""
+import os
+import numpy as np
+from GPS.GPStoUVZ import GPStoUVZ, badValue
+from testApps.rollingGPSwaves_test import sentences, dataDir
+
+fs = 4
+duration = 300 # [s]
+
+def burst(name, lines):
+    gpsfile = os.path.join(dataDir, f'microSWIFT000_GPS_12Jul2021_21{name}UTC.dat')
+    with open(gpsfile, 'w') as file:
+        file.writelines(lines)
+    return GPStoUVZ(gpsfile)
+
+if __name__ == '__main__':
+    lines = list(sentences(fs, duration))
+    clean = burst('0000', lines)
+    n = len(clean['z'])
+    k = n//2 # sample of the corrupted line
+
+    # corrupted GPVTG line: neither the vectorized parser nor pynmea2 can parse it
+    corrupted = list(lines)
+    corrupted[2*k + 1] = '$GPVTG,12#.4,T,,M,0.0\x00,N,3.1*7Z\r\n'
+    GPS = burst('0100', corrupted)
+    assert len(GPS['u']) == len(GPS['v']) == len(GPS['z']) == n
+    assert GPS['u'][k] == badValue and GPS['v'][k] == badValue
+    others = np.arange(n) != k
+    for key in ['u', 'v', 'z', 'lat', 'lon']:
+        assert np.array_equal(GPS[key][others], clean[key][others]), key
+    assert np.array_equal(GPS['z'], clean['z'])
+
+    # corrupted GPGGA line: elevation and position are badValue as without a fix
+    corrupted = list(lines)
+    corrupted[2*k] = '$GPGGA,2100#0.00,46\x00,N*ZZ\r\n'
+    GPS = burst('0200', corrupted)
+    assert len(GPS['u']) == len(GPS['z']) == n and len(GPS['time']) == n - 1
+    assert GPS['z'][k] == badValue and GPS['lat'][k] == badValue
+    for key in ['z', 'lat', 'lon']:
+        assert np.array_equal(GPS[key][others], clean[key][others]), key
+    assert np.array_equal(GPS['u'], clean['u']) and np.array_equal(GPS['v'], clean['v'])
+    print('GPStoUVZ checks passed')
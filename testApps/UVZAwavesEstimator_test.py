@@ -0,0 +1,66 @@
+## UVZAwavesEstimator_test.py
+"""
+Compares the incremental UVZAwavesEstimator with the batch UVZAwaves on a synthetic burst
+(a directional swell plus noise) fed in randomly sized chunks, as the samples would arrive
+from the sensors, with and without spikes. Also reports the time spent in finalize() after
+the burst compared with the batch routine.
+
+Usage (from the repository root):
+    python3 -m testApps.UVZAwavesEstimator_test
+"""
+import time
+import numpy as np
+from waves.UVZAwaves import UVZAwaves, UVZAwavesEstimator
+
+names = ['Hs', 'Tp', 'Dp', 'E', 'f', 'a1', 'b1', 'a2', 'b2', 'check']
+
+def synthetic_burst(fs, duration, seed=0):
+    """ u, v, z, a for a 10 s swell from 30 degrees plus noise and offsets """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration*fs))/fs
+    w = 2*np.pi/10
+    z = 0.8*np.sin(w*t) + 0.05*rng.standard_normal(t.size) + 3.0
+    a = -w**2*0.8*np.sin(w*t) + 0.05*rng.standard_normal(t.size) + 9.8
+    speed = w*0.8*np.cos(w*t)
+    u = speed*np.sin(np.radians(210)) + 0.05*rng.standard_normal(t.size) + 0.3
+    v = speed*np.cos(np.radians(210)) + 0.05*rng.standard_normal(t.size) - 0.1
+    return u, v, z, a
+
+def run(fs, duration, spikes=False):
+    u, v, z, a = synthetic_burst(fs, duration)
+    if spikes:
+        idx = np.random.default_rng(1).choice(u.size, 20, replace=False)
+        u[idx] += 30
+        z[idx[::2]] -= 50
+
+    start = time.perf_counter()
+    batch = UVZAwaves(u.copy(), v.copy(), z.copy(), a.copy(), fs)
+    batchTime = time.perf_counter() - start
+
+    estimator = UVZAwavesEstimator(fs)
+    rng = np.random.default_rng(2)
+    i = 0
+    while i < u.size:
+        n = int(rng.integers(1, 4*fs))
+        estimator.update(u[i:i+n], v[i:i+n], z[i:i+n], a[i:i+n])
+        i += n
+    start = time.perf_counter()
+    stream = estimator.finalize()
+    finalizeTime = time.perf_counter() - start
+
+    error = max(np.max(np.abs(np.asarray(s) - np.asarray(b))) for s, b in zip(stream, batch))
+    print(f'fs={fs} Hz, {duration} s, spikes={spikes}: Hs={batch[0]:.4f}/{stream[0]:.4f}, Tp={batch[1]:.3f}/{stream[1]:.3f}, '
+          f'Dp={batch[2]:.2f}/{stream[2]:.2f}; max abs difference {error:.2e}; '
+          f'batch {batchTime*1e3:.1f} ms, finalize {finalizeTime*1e3:.1f} ms')
+    return batch, stream, error
+
+if __name__ == '__main__':
+    for fs in [12, 48]: # UVZAwaves needs win/2 divisible by merge (see its TODO on f length)
+        batch, stream, error = run(fs, 1920)
+        for name, s, b in zip(names, stream, batch):
+            assert np.allclose(s, b, rtol=1e-9, atol=1e-12), name
+    batch, stream, error = run(12, 1920, spikes=True)
+    assert abs(stream[0] - batch[0]) < 1e-2*batch[0] and stream[1] == batch[1]
+    # too short to process
+    assert UVZAwavesEstimator(12).finalize()[0] == 999
+    print('UVZAwavesEstimator checks passed')
@@ -0,0 +1,88 @@
+## acquisition_test.py
+"""
+Exercises process-isolated acquisition (utils/acquisition.py) with stand-in GPS and IMU
+producers in place of recordGPS and recordIMU. The fake IMU writes counter-valued samples at a
+fixed rate and the fake GPS writes checksummed GPGGA/GPVTG sentences at 4 Hz. While they run, a
+thread in the main process holds the GIL with pure-Python work, as processing would. Checks that
+every sample reaches the output files in order, that the IMU sampling intervals are unaffected
+by the busy main process, and that the GPS file can be read by GPStoUVZ.
+
+Usage (from the repository root):
+    python3 -m testApps.acquisition_test
+"""
+import os, tempfile, threading, time
+from functools import reduce
+import numpy as np
+from utils.acquisition import acquire, GPS_DTYPE, GPSFileSink
+from IMU.binaryIMU import BinaryIMUWriter, IMU_DTYPE, read_binary_IMU
+from GPS.GPStoUVZ import GPStoUVZ
+
+dataDir = tempfile.mkdtemp()
+imuFs = 48
+gpsFs = 4
+
+def checksum(body):
+    return '%02X' % reduce(lambda a, b: a ^ b, body.encode(), 0)
+
+def fake_IMU(duration, open_out):
+    """ stand-in for recordIMU: sample k holds k in every channel; end time is a duration [s] """
+    filename = os.path.join(dataDir, 'microSWIFT000_IMU_12Jul2021_210000UTC.bin')
+    n = int(duration*imuFs)
+    with open_out(filename, accel_range=2, gyro_range=500, accel_scale=0.000244*9.80665, mag_scale=0.1, gyro_scale=0.015625) as imu_out:
+        t0 = time.monotonic()
+        for k in range(n):
+            time.sleep(max(0, t0 + k/imuFs - time.monotonic()))
+            c = k % 32768
+            imu_out.write(time.time(), (c, c, c), (c, c, c), (c, c, c))
+    return filename, True
+
+def fake_GPS(duration, open_out):
+    """ stand-in for recordGPS: GPGGA/GPVTG pairs at gpsFs; end time is a duration [s] """
+    filename = os.path.join(dataDir, 'microSWIFT000_GPS_12Jul2021_210000UTC.dat')
+    n = int(duration*gpsFs)
+    with open_out(filename) as gps_out:
+        t0 = time.monotonic()
+        for k in range(n):
+            time.sleep(max(0, t0 + k/gpsFs - time.monotonic()))
+            s = 75600 + k/gpsFs
+            hms = '%02d%02d%05.2f' % (s//3600, s % 3600//60, s % 60)
+            gga = f'GPGGA,{hms},4654.{k % 10000:04d},N,12406.0000,W,1,08,0.9,{k % 100}.0,M,-25.0,M,,'
+            vtg = f'GPVTG,{k % 360}.0,T,,M,0.00,N,{k % 50}.0,K,A'
+            gps_out.write(f'${gga}*{checksum(gga)}\r\n')
+            gps_out.write(f'${vtg}*{checksum(vtg)}\r\n')
+            gps_out.flush()
+    return filename, True
+
+def busy(stop):
+    """ pure-Python work holding the GIL in the main process """
+    while not stop.is_set():
+        sum(i*i for i in range(100000))
+
+if __name__ == '__main__':
+    duration = 10
+    producers = {'GPS': (fake_GPS, GPS_DTYPE, 600, GPSFileSink),
+                 'IMU': (fake_IMU, IMU_DTYPE, 2048, BinaryIMUWriter)}
+
+    stop = threading.Event()
+    worker = threading.Thread(target=busy, args=(stop,))
+    worker.start()
+    results, dropped = acquire(duration, producers)
+    stop.set(); worker.join()
+    print(f'results: {results}; dropped: {dropped}')
+
+    # IMU: every sample, in order, at regular intervals
+    imuFile, imuInitialized = results['IMU']
+    _, t, acc, _, _ = read_binary_IMU(imuFile, raw=True)
+    assert imuInitialized and dropped['IMU'] == 0
+    assert np.array_equal(acc[:, 0], np.arange(duration*imuFs) % 32768)
+    dt = np.diff(t)
+    print(f'IMU samples: {len(t)}; interval mean {dt.mean()*1e3:.2f} ms, max {dt.max()*1e3:.2f} ms (nominal {1e3/imuFs:.2f} ms)')
+    assert dt.max() < 3/imuFs
+
+    # GPS: every sentence, readable by GPStoUVZ
+    gpsFile, gpsInitialized = results['GPS']
+    GPS = GPStoUVZ(gpsFile)
+    assert gpsInitialized and dropped['GPS'] == 0
+    assert len(GPS['u']) == duration*gpsFs and np.allclose(GPS['z'], np.arange(duration*gpsFs) % 100)
+    print(f'GPS fixes: {len(GPS["u"])}')
+    print('acquisition checks passed')
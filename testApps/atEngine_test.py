@@ -0,0 +1,109 @@
+## atEngine_test.py
+"""
+Runs the AT command engine (SBD/atEngine.py) against a simulated Iridium modem on a pty, opened
+with serial.Serial as the modem's USB port is. Checks that commands return as soon as the
+modem answers (not after fixed sleeps), that echoes and unsolicited result codes (SBDRING,
++CIEV) are taken out of the responses, that signal quality and +SBDIX values are parsed from
+the response lines whatever their length, that binary and text messages are written with the
+modem checking the checksum (including messages whose byte sum exceeds 16 bits), and that a
+modem which does not answer times out.
+
+Usage (from the repository root):
+    python3 -m testApps.atEngine_test
+"""
+import os, time, struct, threading
+import serial
+from SBD import atEngine
+from SBD.atEngine import ATEngine
+
+class SimulatedModem(threading.Thread):
+    """ answers AT commands on the master side of a pty after the given delays [s] """
+    def __init__(self, master, delays=None):
+        super().__init__(daemon=True)
+        self.master = master
+        self.delays = delays or {}
+        self.silent = False
+        self.buffer = b''
+        self.mobuffer = b''
+
+    def send(self, text):
+        os.write(self.master, text.encode())
+
+    def read(self, n):
+        while len(self.buffer) < n:
+            self.buffer += os.read(self.master, 1024)
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+    def readline(self):
+        while b'\r' not in self.buffer:
+            self.buffer += os.read(self.master, 1024)
+        line, self.buffer = self.buffer.split(b'\r', 1)
+        return line.decode()
+
+    def run(self):
+        while True:
+            command = self.readline()
+            if self.silent:
+                continue
+            self.send(command + '\r') # echo
+            time.sleep(self.delays.get(command.split('=')[0], 0))
+            if command in ('AT', 'AT&F', 'AT&K0', 'AT&K=0'):
+                self.send('\r\nOK\r\n')
+            elif command == 'AT+CSQ':
+                self.send('\r\nSBDRING\r\n\r\n+CSQ:4\r\n\r\nOK\r\n')
+            elif command.startswith('AT+SBDWB='):
+                n = int(command.split('=')[1])
+                self.send('READY\r\n')
+                data = self.read(n + 2)
+                checksum = struct.unpack('>H', data[-2:])[0]
+                self.mobuffer = data[:-2]
+                self.send('0\r\n\r\nOK\r\n' if checksum == sum(data[:-2]) & 0xFFFF else '2\r\n\r\nOK\r\n')
+            elif command == 'AT+SBDWT':
+                self.send('\r\nREADY\r\n')
+                self.mobuffer = self.readline().encode()
+                self.send(self.mobuffer.decode() + '\r\n0\r\n\r\nOK\r\n')
+            elif command == 'AT+SBDIX':
+                self.send('\r\n+CIEV:0,3\r\n+SBDIX: 0, 1234, 0, 0, 0, 0\r\n\r\nOK\r\n')
+            else:
+                self.send('\r\nERROR\r\n')
+
+def timed(function, *args):
+    start = time.monotonic()
+    result = function(*args)
+    return result, time.monotonic() - start
+
+if __name__ == '__main__':
+    master, slave = os.openpty()
+    modem = SimulatedModem(master, delays={'AT+CSQ': 0.3, 'AT+SBDIX': 1.5})
+    modem.start()
+    ser = serial.Serial(os.ttyname(slave), 19200)
+    at = ATEngine(ser)
+
+    # commands return when the modem answers
+    (response, seconds) = timed(at.command, 'AT')
+    assert response == ('OK', []) and seconds < 0.5, (response, seconds)
+    assert at.command('AT&K0').result == 'OK' and at.command('AT+BOGUS').result == 'ERROR'
+
+    # signal quality, with an unsolicited ring inside the response
+    (quality, seconds) = timed(at.signal_quality)
+    assert quality == 4 and 0.3 <= seconds < 0.8 and at.unsolicited == ['SBDRING'], (quality, seconds, at.unsolicited)
+
+    # binary message: 1245 bytes sum to more than 16 bits; the modem checks the checksum
+    msg = bytes(range(256)) * 4 + bytes(221)
+    assert sum(msg) > 0xFFFF
+    assert at.write_binary(msg) == 0 and modem.mobuffer == msg
+    assert at.write_text('hello microSWIFT') == 0 and modem.mobuffer == b'hello microSWIFT'
+
+    # the session takes as long as the modem needs
+    (status, seconds) = timed(at.session)
+    assert status == [0, 1234, 0, 0, 0, 0] and 1.5 <= seconds < 2, (status, seconds)
+    assert at.unsolicited[-1] == '+CIEV:0,3'
+    print(f'AT+SBDIX returned after {seconds:.2f} s')
+
+    # a modem which does not answer times out
+    modem.silent = True
+    atEngine.signalTimeout = 0.5
+    (quality, seconds) = timed(at.signal_quality)
+    assert quality == -1 and 0.5 <= seconds < 1, (quality, seconds)
+    print('AT engine checks passed')
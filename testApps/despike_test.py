@@ -0,0 +1,67 @@
+## despike_test.py
+"""
+Checks the fused despike() in waves/spectralCore.py against straightforward per-channel
+implementations: the previous mean/std despiking (default), repeated passes (iterate=True),
+and median/MAD thresholds (robust=True), on synthetic u, v, z, a bursts with spikes and a GPS
+dropout. Also times the default despike against the previous version.
+
+Usage (from the repository root):
+    python3 -m testApps.despike_test
+"""
+from timeit import default_timer as timer
+import numpy as np
+from waves.spectralCore import despike
+from testApps.UVZAwavesEstimator_test import synthetic_burst
+
+def reference(x, Nstd=10, iterate=False, robust=False, maxIter=10):
+    """ per-channel despiking, as in the original GPSwaves and UVZAwaves """
+    x = np.array(x, dtype=float)
+    bad = np.zeros(len(x), dtype=int)
+    for i, channel in enumerate(x):
+        for _ in range(maxIter if iterate else 1):
+            if robust:
+                center = np.median(channel)
+                scale = 1.4826*np.median(np.abs(channel - center)) or np.std(channel)
+            else:
+                center = np.mean(channel)
+                scale = np.std(channel)
+            spikes = np.abs(channel - center) >= Nstd*scale
+            if not spikes.any():
+                break
+            channel[spikes] = np.mean(channel[~spikes])
+            bad[i] += np.sum(spikes)
+    return x, bad
+
+def spiky_burst(fs, duration, seed=0):
+    """ synthetic burst with spikes of decreasing size in every channel and a dropout in u, v """
+    rng = np.random.default_rng(seed)
+    x = np.vstack(synthetic_burst(fs, duration, seed))
+    for channel in x:
+        where = rng.choice(x.shape[1], 20, replace=False)
+        channel[where] += np.std(channel) * np.geomspace(200, 5, 20) * rng.choice([-1, 1], 20)
+    x[:2, 1000:1100] = 0 # velocities held at zero while the fix is lost
+    return x
+
+if __name__ == '__main__':
+    x = spiky_burst(12, 1920)
+    for options in [{}, {'iterate': True}, {'robust': True}, {'iterate': True, 'robust': True}, {'Nstd': 3}]:
+        despiked, bad = despike(x, **options)
+        expected, expectedBad = reference(x, **options)
+        assert np.array_equal(bad, expectedBad), (options, bad, expectedBad)
+        assert np.allclose(despiked, expected, rtol=0, atol=1e-9*np.max(np.abs(x)))
+        print(f'{str(options):>35}: bad per channel {bad}')
+    assert not np.shares_memory(despike(x)[0], x)
+
+    # a channel of zeros (GPSwaves dummy z) is replaced with NaN, as before
+    despiked, bad = despike(np.vstack([x[0], np.zeros(x.shape[1])]))
+    assert bad[1] == x.shape[1] and np.isnan(despiked[1]).all()
+
+    x = spiky_burst(48, 1920)
+    start = timer()
+    reference(x)
+    referenceTime = timer() - start
+    start = timer()
+    despike(x)
+    fusedTime = timer() - start
+    print(f'4 channels x {x.shape[1]} points: per-channel {referenceTime*1e3:.1f} ms, fused {fusedTime*1e3:.1f} ms')
+    print('despike checks passed')
@@ -0,0 +1,47 @@
+## imuBus_test.py
+"""
+Runs the FXOS8700 and FXAS21002C drivers on a simulated, transaction-counting I2C bus
+(testApps/mockI2C.py). Checks that read_all() decodes the raw counts correctly (including
+negative values and the 14-bit accelerometer alignment) and counts the I2C transactions per
+sample for read_all() (2) and for the accelerometer, magnetometer, and gyroscope properties
+(3, one read_all() each), which recordIMU read previously.
+
+Usage (from the repository root):
+    python3 -m testApps.imuBus_test
+"""
+import numpy as np
+from testApps.mockI2C import MockI2C, SimFXOS8700, SimFXAS21002C
+import IMU.adafruit_fxos8700_microSWIFT
+import IMU.adafruit_fxas21002c_microSWIFT
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    simFxos = SimFXOS8700()
+    simFxas = SimFXAS21002C()
+    i2c = MockI2C(simFxos, simFxas)
+    fxos = IMU.adafruit_fxos8700_microSWIFT.FXOS8700(i2c, accel_range=IMU.adafruit_fxos8700_microSWIFT.ACCEL_RANGE_2G)
+    fxas = IMU.adafruit_fxas21002c_microSWIFT.FXAS21002C(i2c, gyro_range=500)
+
+    # decoding: random counts over the full range of each sensor
+    for _ in range(1000):
+        accel = tuple(int(a) for a in rng.integers(-2**13, 2**13, 3))
+        mag = tuple(int(m) for m in rng.integers(-2**15, 2**15, 3))
+        gyro = tuple(int(g) for g in rng.integers(-2**15, 2**15, 3))
+        simFxos.set_sample(accel, mag)
+        simFxas.set_sample(gyro)
+        assert fxos.read_all() == (accel, mag)
+        assert tuple(fxas.read_all()) == gyro
+    print('read_all() decoding: ok')
+
+    # transactions per sample
+    i2c.transactions = 0
+    fxos.accelerometer; fxos.magnetometer; fxas.gyroscope
+    perProperty = i2c.transactions
+
+    i2c.transactions = 0
+    fxos.read_all(); fxas.read_all()
+    perReadAll = i2c.transactions
+
+    print(f'I2C transactions per sample: properties {perProperty}, read_all() {perReadAll}')
+    assert perProperty == 3 and perReadAll == 2
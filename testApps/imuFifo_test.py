@@ -0,0 +1,70 @@
+## imuFifo_test.py
+"""
+Runs the FXOS8700 and FXAS21002C drivers in FIFO mode on simulated register-map devices
+(testApps/mockI2C.py) which sample at their output data rate on a virtual clock, and records
+bursts with sample_IMU_fifo() (IMU/sampleIMU.py). Checks that every sample is recorded once and in
+order, that the timestamps follow the output data rate, and reports the wakeups and I2C
+transactions per sample compared with polling single samples.
+
+Usage (from the repository root):
+    python3 -m testApps.imuFifo_test
+"""
+import numpy as np
+from testApps.mockI2C import MockI2C, SimFXOS8700, SimFXAS21002C
+from testApps.imuSampler_test import FakeClock
+import IMU.adafruit_fxos8700_microSWIFT
+import IMU.adafruit_fxas21002c_microSWIFT
+from IMU.sampleIMU import sample_IMU_fifo
+
+class ListWriter:
+    """ collects the written samples in memory """
+    def __init__(self):
+        self.time = []; self.acc = []; self.gyo = []
+    def write(self, timestamp, accel_raw, mag_raw, gyro_raw):
+        self.time.append(timestamp); self.acc.append(accel_raw); self.gyo.append(gyro_raw)
+
+class CountingSleep:
+    """ counts the wakeups of the recording loop """
+    def __init__(self, clock):
+        self.clock = clock
+        self.wakeups = 0
+    def __call__(self, seconds):
+        self.wakeups += 1
+        self.clock.sleep(seconds)
+
+# sample k of each sensor encodes k, so lost, repeated, or misordered samples can be detected
+accelSource = lambda k: ((k % 8192, -(k % 8192), 4096), (1, 2, 3))
+gyroSource = lambda k: (k % 32768, -(k % 32768), 7)
+
+def run(fs, watermark, n_samples):
+    clock = FakeClock()
+    simFxos = SimFXOS8700(clock.monotonic_ns, accelSource)
+    simFxas = SimFXAS21002C(clock.monotonic_ns, gyroSource)
+    i2c = MockI2C(simFxos, simFxas)
+    fxos = IMU.adafruit_fxos8700_microSWIFT.FXOS8700(i2c, accel_range=IMU.adafruit_fxos8700_microSWIFT.ACCEL_RANGE_2G)
+    fxas = IMU.adafruit_fxas21002c_microSWIFT.FXAS21002C(i2c, gyro_range=500)
+    fxos.enable_fifo(watermark, fs)
+    fxas.enable_fifo(watermark, fs)
+    # discard anything sampled during setup
+    fxos.read_fifo(); fxas.read_fifo()
+    startAcc = simFxos.generated; startGyo = simFxas.generated
+
+    imu_out = ListWriter()
+    sleep = CountingSleep(clock)
+    i2c.transactions = 0
+    isample, overflows = sample_IMU_fifo(fxos, fxas, imu_out, fs, watermark, n_samples, clock=clock.monotonic_ns, sleep=sleep)
+
+    acc = np.asarray(imu_out.acc); gyo = np.asarray(imu_out.gyo)
+    assert isample == n_samples and overflows == 0
+    assert np.array_equal(acc[:, 0], (startAcc + np.arange(n_samples)) % 8192)
+    assert np.array_equal(gyo[:, 0], (startGyo + np.arange(n_samples)) % 32768)
+    dt = np.diff(imu_out.time)
+    assert abs(np.median(dt) - 1/fs) < 1e-6
+    print(f'fs = {fs:3d} Hz, watermark = {watermark:2d}: samples {isample}; wakeups per sample {sleep.wakeups/isample:.3f}; '
+          f'I2C transactions per sample {i2c.transactions/isample:.3f} (polling: 2)')
+
+if __name__ == '__main__':
+    for fs in [25, 50, 100]:
+        for watermark in [16, 24]:
+            run(fs, watermark, 2000)
+    print('all FIFO checks passed')
@@ -0,0 +1,76 @@
+## imuSampler_test.py
+"""
+Runs the deadline-driven IMU sampler (IMU/sampleIMU.py) against simulated FXOS8700 and FXAS21002C
+sensors with injectable read latency. A virtual clock is used, so the reads and sleeps are
+simulated and each case runs in a fraction of a second; the achieved sampling rate and the number
+of overruns are checked against the expected values.
+
+Usage (from the repository root):
+    python3 -m testApps.imuSampler_test
+"""
+import numpy as np
+from IMU.sampleIMU import sample_IMU
+
+class FakeClock:
+    """ virtual monotonic clock [ns]; sleeping advances the clock """
+    def __init__(self):
+        self.now = 0
+    def monotonic_ns(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += int(seconds*1e9)
+
+class FakeFXOS8700:
+    """ simulated FXOS8700 accelerometer/magnetometer; each read takes latency() seconds """
+    def __init__(self, clock, latency):
+        self.clock = clock
+        self.latency = latency
+    def read_all(self):
+        self.clock.sleep(self.latency())
+        return (0, 0, 4096), (100, 200, 300)
+
+class FakeFXAS21002C:
+    """ simulated FXAS21002C gyroscope; each read takes latency() seconds """
+    def __init__(self, clock, latency):
+        self.clock = clock
+        self.latency = latency
+    def read_all(self):
+        self.clock.sleep(self.latency())
+        return (1, 2, 3)
+
+class ListWriter:
+    """ collects the written samples in memory """
+    def __init__(self):
+        self.time = []
+    def write(self, timestamp, accel_raw, mag_raw, gyro_raw):
+        self.time.append(timestamp)
+
+def run(fs, latency, n_samples):
+    clock = FakeClock()
+    fxos = FakeFXOS8700(clock, latency)
+    fxas = FakeFXAS21002C(clock, latency)
+    imu_out = ListWriter()
+    isample, overruns = sample_IMU(fxos, fxas, imu_out, fs, n_samples, clock=clock.monotonic_ns, sleep=clock.sleep)
+    rate = (isample - 1)/(np.ptp(imu_out.time))
+    print(f'fs = {fs:5.1f} Hz; samples: {isample}; achieved rate: {rate:.4f} Hz; overruns: {overruns}')
+    return isample, overruns, rate
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    # rates are hit exactly when the reads fit within the sampling period, even with jitter
+    for fs in [12, 12.5, 25, 48]:
+        jittery = lambda: rng.uniform(0.002, 0.008)
+        isample, overruns, rate = run(fs, jittery, 1000)
+        assert isample == 1000 and overruns == 0 and abs(rate - fs)/fs < 1e-3
+
+    # occasional slow reads are counted as overruns without shifting the sampling grid
+    slowReads = lambda: 0.050 if rng.uniform() < 0.01 else 0.002
+    isample, overruns, rate = run(25, slowReads, 1000)
+    assert overruns > 0 and abs(rate - 25)/25 < 1e-3
+
+    # reads slower than the period: missed deadlines are skipped and counted
+    isample, overruns, rate = run(48, lambda: 0.015, 1000)
+    assert overruns > 0 and rate < 48
+
+    print('all sampler checks passed')
@@ -0,0 +1,41 @@
+## integrateIMU_test.py
+"""
+Checks integrate_acc_batch (IMU/integrateIMU.py) against integrate_acc applied to each axis,
+as IMUtoXYZ did before, and reports the run time and peak memory allocated by each.
+
+Usage (from the repository root):
+    python3 -m testApps.integrateIMU_test
+"""
+import tracemalloc
+from timeit import default_timer as timer
+import numpy as np
+from IMU.integrateIMU import integrate_acc, integrate_acc_batch
+from IMU.IMUtoXYZ import RCfilter
+
+def measure(fun):
+    tracemalloc.start()
+    start = timer()
+    result = fun()
+    elapsed = timer() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    fc = 0.04
+    for fs in [12, 48]:
+        n = 2400*fs
+        t = np.arange(n)/fs
+        acc = rng.standard_normal((3, n)) + np.array([[0.1], [-0.2], [9.81]])
+        filt = lambda *b : RCfilter(*b,fc,fs)
+
+        perAxis, perAxisTime, perAxisPeak = measure(lambda: [integrate_acc(a, t, filt) for a in acc])
+        batch, batchTime, batchPeak = measure(lambda: integrate_acc_batch(acc, t, filt))
+        reference = np.array(perAxis).transpose(1, 0, 2) # [axis][quantity] -> [quantity][axis]
+        difference = np.max(np.abs(batch - reference))
+        print(f'fs={fs} Hz, 3 x {n}: per axis {perAxisTime*1e3:6.1f} ms, peak {perAxisPeak/2**20:5.1f} MiB; '
+              f'batch {batchTime*1e3:6.1f} ms, peak {batchPeak/2**20:5.1f} MiB; max difference {difference:.1e}')
+        assert batch.shape == (3, 3, n)
+        assert np.allclose(batch, reference, rtol=0, atol=1e-12*np.max(np.abs(reference)))
+    print('integrateIMU checks passed')
@@ -0,0 +1,215 @@
+## mockI2C.py
+"""
+Simulated I2C bus and register maps for the FXOS8700 and FXAS21002C, used to run the microSWIFT
+IMU drivers without hardware. The bus implements the busio.I2C calls used by
+adafruit_bus_device.I2CDevice and counts every transaction, so the number of bus transactions
+per sample can be checked.
+
+Contents:
+    - MockI2C(*devices)
+    - SimRegisterDevice(address, who_am_i_reg, who_am_i, clock, source)
+    - SimFXOS8700(clock, source)
+    - SimFXAS21002C(clock, source)
+"""
+
+class MockI2C:
+    """ busio.I2C stand-in which routes transactions to simulated devices and counts them """
+    def __init__(self, *devices):
+        self.devices = {device.address: device for device in devices}
+        self.transactions = 0
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self.transactions += 1
+        self.devices[address].write(bytes(buffer[start:end]))
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self.transactions += 1
+        end = len(buffer) if end is None else end
+        buffer[start:end] = self.devices[address].read(end - start)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0, out_end=None, in_start=0, in_end=None):
+        self.transactions += 1
+        in_end = len(buffer_in) if in_end is None else in_end
+        device = self.devices[address]
+        device.write(bytes(buffer_out[out_start:out_end]))
+        buffer_in[in_start:in_end] = device.read(in_end - in_start)
+
+
+class SimRegisterDevice:
+    """ generic register-map device: a write sets the register pointer (and writes any data bytes);
+    reads return consecutive registers starting at the pointer.
+
+    If a clock (monotonic, ns) and a source (sample index -> output counts) are given, the device
+    samples the source at its configured output data rate; with the FIFO enabled (F_SETUP, 0x09)
+    the samples are buffered in a 32-sample circular FIFO which is drained by burst reads from
+    0x01 (rolling over from 0x06 back to 0x01) """
+    fifo_size = 32
+
+    def __init__(self, address, who_am_i_reg, who_am_i, clock=None, source=None):
+        self.address = address
+        self.registers = bytearray(256)
+        self.registers[who_am_i_reg] = who_am_i
+        self.pointer = 0
+        self.clock = clock
+        self.source = source
+        self.fifo = []
+        self.fifo_overflow = False
+        self.fifo_byte = 0
+        self.generated = 0
+        self.rate = None
+        self.t0 = None
+        self.base = 0
+
+    def data_rate(self):
+        raise NotImplementedError
+
+    def fifo_enabled(self):
+        return self.registers[0x09] & 0xC0 != 0
+
+    def fifo_status(self):
+        """ f_ovf (bit 7), f_wmrk_flag (bit 6), f_cnt (bits 5:0); reading clears the overflow flag """
+        watermark = self.registers[0x09] & 0x3F
+        status = len(self.fifo) | (0x80 if self.fifo_overflow else 0) | (0x40 if watermark and len(self.fifo) >= watermark else 0)
+        self.fifo_overflow = False
+        return status
+
+    def store_sample(self, sample):
+        raise NotImplementedError
+
+    def update(self):
+        """ generate the samples due since the last bus access """
+        if self.clock is None or self.source is None:
+            return
+        now = self.clock()
+        rate = self.data_rate()
+        if rate != self.rate: # restart the sampling grid when the output data rate changes
+            self.rate, self.t0, self.base = rate, now, self.generated
+        due = self.base + int((now - self.t0)*1e-9*rate)
+        while self.generated < due:
+            sample = self.source(self.generated)
+            self.store_sample(sample)
+            if self.fifo_enabled():
+                if len(self.fifo) == self.fifo_size: # circular mode: the oldest sample is discarded
+                    self.fifo.pop(0)
+                    self.fifo_overflow = True
+                self.fifo.append(sample)
+            self.generated += 1
+
+    def next_register(self, register):
+        return (register + 1) & 0xFF
+
+    def read_register(self, register):
+        return self.registers[register]
+
+    def write(self, data):
+        self.update()
+        if not data:
+            return
+        self.pointer = data[0]
+        self.fifo_byte = 0
+        for value in data[1:]:
+            self.registers[self.pointer] = value
+            self.pointer = self.next_register(self.pointer)
+
+    def read(self, n):
+        self.update()
+        out = bytearray(n)
+        for i in range(n):
+            if self.fifo_enabled() and 0x01 <= self.pointer <= 0x06:
+                out[i] = self.read_fifo_byte()
+            else:
+                out[i] = self.read_register(self.pointer)
+                self.pointer = self.next_register(self.pointer)
+        return out
+
+    def read_fifo_byte(self):
+        """ next byte of the oldest FIFO sample; the sample is removed once all 6 bytes are read """
+        sample = self.fifo_words(self.fifo[0]) if self.fifo else [0, 0, 0]
+        word = sample[self.fifo_byte//2] & 0xFFFF
+        value = word >> 8 if self.fifo_byte % 2 == 0 else word & 0xFF
+        self.fifo_byte += 1
+        if self.fifo_byte == 6:
+            self.fifo_byte = 0
+            if self.fifo:
+                self.fifo.pop(0)
+        return value
+
+    def fifo_words(self, sample):
+        raise NotImplementedError
+
+    def set_words(self, register, values):
+        """ store signed 16-bit big-endian values starting at register """
+        for i, value in enumerate(values):
+            self.registers[register+2*i:register+2*i+2] = (value & 0xFFFF).to_bytes(2, 'big')
+
+
+class SimFXOS8700(SimRegisterDevice):
+    """ FXOS8700 register map; with hybrid auto-increment (MCTRL_REG2 bit 5) reading past
+    OUT_Z_LSB (0x06) continues at MOUT_X_MSB (0x33). Samples are (accel, mag) tuples and only
+    the accelerometer is buffered in the FIFO; the status register (0x00) reports the FIFO status
+    when it is enabled """
+    hybrid_data_rates = {0x00: 400, 0x08: 200, 0x10: 100, 0x18: 50, 0x20: 25, 0x28: 6.25, 0x30: 3.125, 0x38: 0.7813}
+
+    def __init__(self, clock=None, source=None):
+        super().__init__(0x1F, 0x0D, 0xC7, clock, source)
+
+    def data_rate(self):
+        if not self.registers[0x2A] & 0x01: # standby
+            return 0
+        return self.hybrid_data_rates[self.registers[0x2A] & 0x38]
+
+    def next_register(self, register):
+        if register == 0x06 and self.registers[0x5C] & 0x20:
+            return 0x33
+        return super().next_register(register)
+
+    def read_register(self, register):
+        if register == 0x00 and self.fifo_enabled():
+            return self.fifo_status()
+        return super().read_register(register)
+
+    def fifo_words(self, sample):
+        return [a << 2 for a in sample[0]]
+
+    def store_sample(self, sample):
+        self.set_sample(*sample)
+
+    def set_sample(self, accel, mag):
+        """ set 14-bit accel counts (left aligned in the output registers) and 16-bit mag counts """
+        self.set_words(0x01, [a << 2 for a in accel])
+        self.set_words(0x33, mag)
+
+
+class SimFXAS21002C(SimRegisterDevice):
+    """ FXAS21002C register map. Samples are gyro tuples; the FIFO status is reported in F_STATUS
+    (0x08), and in the status register (0x00) when the FIFO is enabled """
+    data_rates = {0x00: 800, 0x04: 400, 0x08: 200, 0x0C: 100, 0x10: 50, 0x14: 25, 0x18: 12.5, 0x1C: 12.5}
+
+    def __init__(self, clock=None, source=None):
+        super().__init__(0x21, 0x0C, 0xD7, clock, source)
+
+    def data_rate(self):
+        if not self.registers[0x13] & 0x02: # standby or ready
+            return 0
+        return self.data_rates[self.registers[0x13] & 0x1C]
+
+    def read_register(self, register):
+        if register == 0x08 or (register == 0x00 and self.fifo_enabled()):
+            return self.fifo_status()
+        return super().read_register(register)
+
+    def fifo_words(self, sample):
+        return sample
+
+    def store_sample(self, sample):
+        self.set_sample(sample)
+
+    def set_sample(self, gyro):
+        """ set 16-bit gyro counts """
+        self.set_words(0x01, gyro)
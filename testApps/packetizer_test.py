@@ -0,0 +1,76 @@
+## packetizer_test.py
+"""
+Checks the SBD packetizer (SBD/packetizer.py): packets never exceed the MO limit, all but the
+last are filled to it (so no fewer packets are possible), sub-headers are exact for one and two
+digit message ids and 3 and 4 digit start bytes, the payload is recovered from the packets by
+start byte, and combined payloads split back into their sensor blocks. Also compares the
+number of Iridium sessions for queues of payloads sent apart and packed.
+
+Usage (from the repository root):
+    python3 -m testApps.packetizer_test
+"""
+import os, struct
+from SBD.packetizer import moLimit, packetize, num_packets, combine, pack
+
+def payload(sensor_type, size):
+    """ stand-in payload: payload type 7, sensor type, port, size, random data """
+    return struct.pack('<sbbh', b'7', sensor_type, 6, size) + os.urandom(size - 5)
+
+def reassemble(packets):
+    """ split packets at their sub-headers and put the data back together by start byte """
+    data = {}
+    total = None
+    for packet in packets:
+        header, body = packet.split(b':', 1)
+        fields = header.decode().split(',')
+        if len(fields) == 4:
+            total = int(fields[3])
+        data[int(fields[2])] = body
+    payload = b''.join(data[start] for start in sorted(data))
+    assert len(payload) == total
+    return payload
+
+def sensor_blocks(payload):
+    """ sensor types in a payload, read as the SWIFT processor does """
+    index, types = 1, []
+    while index < len(payload):
+        sensor_type, port, size = struct.unpack_from('<bbh', payload, index)
+        types.append(sensor_type)
+        index += size - 1 # size counts the payload type byte of its own payload
+    assert index == len(payload)
+    return types
+
+if __name__ == '__main__':
+    for id in [0, 7, 42, 99]:
+        for size in [1, 249, 327, 329, 330, 1245, 2490, 5000]:
+            data = os.urandom(size)
+            packets = packetize(data, id)
+            assert all(len(packet) <= moLimit for packet in packets)
+            assert all(len(packet) == moLimit for packet in packets[:-1])
+            assert reassemble(packets) == data
+            assert packets[0][:1] == (b'0' if len(packets) == 1 else b'1')
+
+    # type 52 fits one packet; type 50 takes 4 packets, as before, with more data in the first ones
+    assert packetize(payload(52, 327), 99)[0][:10] == b'0,99,0,327' and num_packets(327) == 1
+    packets = packetize(payload(50, 1245), 5)
+    assert [len(packet) for packet in packets] == [340, 340, 340, len(b'1,5,993:') + 1245 - 329 - 2*332]
+    assert packets[1].startswith(b'1,5,329:') and packets[3].startswith(b'1,5,993:')
+
+    # combined payloads split back into their sensor blocks
+    payloads = [payload(52, 327), payload(51, 249), payload(50, 1245)]
+    assert sensor_blocks(combine(payloads)) == [52, 51, 50]
+    assert reassemble(packetize(combine(payloads), 3)) == combine(payloads)
+
+    # packets (Iridium sessions) for queues of payloads sent apart and packed
+    for name, sizes in [('two type 52', [(52, 327)]*2), ('type 50 and 52', [(50, 1245), (52, 327)]),
+                        ('six type 50', [(50, 1245)]*6), ('five 100 byte', [(52, 100)]*5)]:
+        payloads = [payload(*size) for size in sizes]
+        groups = pack(payloads)
+        apart = sum(num_packets(len(p)) for p in payloads)
+        packed = sum(num_packets(len(combine([payloads[i] for i in group]))) for group in groups)
+        print(f'{name}: {apart} packets apart, {packed} packed ({len(groups)} messages)')
+        assert packed <= apart
+        assert sorted(i for group in groups for i in group) == list(range(len(payloads)))
+    assert pack([payload(52, 100)]*5) == [[0, 1, 2], [3, 4]]
+    assert pack([payload(52, 327)]*2) == [[0], [1]]
+    print('packetizer checks passed')
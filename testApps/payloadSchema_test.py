@@ -0,0 +1,73 @@
+## payloadSchema_test.py
+"""
+Checks the payload schema registry (SBD/payloadSchema.py): the compiled struct formats are the
+payload layouts of sensor types 50, 51, and 52, the NumPy dtypes match them byte for byte,
+payloads packed with one pack_into decode with np.frombuffer to the packed values, and the
+shore-side SBD/microSWIFT_processor.py decodes single and combined payloads. Also times one
+pack against building the payload from separate struct.pack calls, as createTX did.
+
+Usage (from the repository root):
+    python3 -m testApps.payloadSchema_test
+"""
+import io, struct, timeit, contextlib
+import numpy as np
+from SBD.payloadSchema import schemas, schema_for, decode
+from SBD.packetizer import combine
+from SBD import microSWIFT_processor
+
+formats = {50: '<sbbhfff42f42f42f42f42f42f42ffffffffiiiiii',
+           51: '<sbbhfff42fffffffffffiiiiii',
+           52: '<sbbheee42eee42b42b42b42b42Bffeeef'}
+
+def values(sensor_type, rng):
+    """ random values for every field of a sensor type """
+    v = {'payload_type': b'7', 'port': 6}
+    for name, char, count in schema_for(sensor_type).fields[4:]:
+        if char in 'bB':
+            x = rng.integers(0 if char == 'B' else -128, 256 if char == 'B' else 128, count)
+        elif char == 'i':
+            x = rng.integers(0, 2026, count)
+        else:
+            x = rng.random(count).astype(np.float16 if char == 'e' else np.float32)
+        v[name] = x if count > 1 else x[0]
+    return v
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    for sensor_type, fmt in formats.items():
+        schema = schema_for(sensor_type)
+        assert schema.struct.format == fmt and schema.size == struct.calcsize(fmt) == schema.dtype.itemsize
+
+        v = values(sensor_type, rng)
+        payload_data = schema.pack(**v)
+        record = decode(payload_data)
+        assert record['sensor_type'] == sensor_type and record['size'] == schema.size and record['payload_type'] == b'7'
+        for name, _, _ in schema.fields[4:]:
+            assert np.array_equal(record[name], v[name]), name
+
+        # the same values as unpacking with the struct format
+        unpacked = struct.unpack(fmt, payload_data)
+        assert unpacked[4] == record[schema.fields[4][0]]
+        assert unpacked[-1] == record[schema.fields[-1][0]]
+
+    # the shore-side processor decodes every sensor block of a combined payload
+    payloads = [schema_for(k).pack(**values(k, rng)) for k in [52, 51, 50]]
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        microSWIFT_processor.processData(0, combine(payloads))
+    assert [line for line in output.getvalue().splitlines() if line.startswith('Sensor')] == \
+           ['Sensor: 52\tCom Port: 6', 'Sensor: 51\tCom Port: 6', 'Sensor: 50\tCom Port: 6']
+
+    # one pack_into against one struct.pack per field (sensor type 50)
+    schema = schema_for(50)
+    v = values(50, rng)
+    def separate():
+        return (struct.pack('<sbbhfff', b'7', 50, 6, 1245, v['Hs'], v['Tp'], v['Dp']) +
+                b''.join(struct.pack('<42f', *v[name]) for name in ['E', 'f', 'a1', 'b1', 'a2', 'b2', 'check']) +
+                b''.join(struct.pack('<f', v[name]) for name in ['lat', 'lon', 'temp', 'volt', 'u_mean', 'v_mean', 'z_mean']) +
+                b''.join(struct.pack('<i', v[name]) for name in ['year', 'month', 'day', 'hour', 'minute', 'second']))
+    assert separate() == schema.pack(**v)
+    n = 2000
+    print(f'separate struct.pack: {timeit.timeit(separate, number=n)/n*1e6:.1f} us, '
+          f'schema pack: {timeit.timeit(lambda: schema.pack(**v), number=n)/n*1e6:.1f} us per payload')
+    print('payload schema checks passed')
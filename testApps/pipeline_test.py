@@ -0,0 +1,89 @@
+## pipeline_test.py
+"""
+Runs the staged burst pipeline (utils/pipeline.py) with stand-in processing and telemetry
+stages while the main process keeps "recording". Checks that submitting a burst does not block,
+that bursts pass through both stages in order, that a full queue refuses a burst, that a burst
+whose deadline has passed is skipped, and that a stage which overruns its deadline is restarted
+(after unwinding its job, as ModemSession powers down the modem) and carries on with the
+following bursts. The stages use a global set in the __main__ block,
+as those of microSWIFT.py do, with forkserver as the default start method.
+
+Usage (from the repository root):
+    python3 -m testApps.pipeline_test
+"""
+import time, multiprocessing
+from datetime import datetime, timedelta
+from utils.pipeline import Pipeline, Stage
+
+results = multiprocessing.get_context('fork').Queue() # inherited by the forked stage processes
+powerDowns = multiprocessing.get_context('fork').Queue()
+
+def process(job):
+    """ stand-in for process_burst """
+    time.sleep(job['processing'])
+    job['products'] = f"{job['name']} {suffix}"
+    return job
+
+class Modem:
+    """ stand-in for ModemSession: reports when it is powered down """
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        powerDowns.put(self.name)
+
+def send(job):
+    """ stand-in for send_telemetry """
+    with Modem(job['name']):
+        time.sleep(job['telemetry'])
+        results.put(job['products'])
+
+def burst(k, processing=0.2, telemetry=0.2, deadline=5):
+    return {'name': f'burst {k}', 'processing': processing, 'telemetry': telemetry,
+            'deadline': datetime.utcnow() + timedelta(seconds=deadline)}
+
+def collect(n, timeout=10):
+    return [results.get(timeout=timeout) for _ in range(n)]
+
+if __name__ == '__main__':
+    multiprocessing.set_start_method('forkserver') # the default on Linux from Python 3.14
+    suffix = 'processed' # only a forked stage process has it
+    pipeline = Pipeline([Stage('processing', process), Stage('telemetry', send)], grace=0.5)
+
+    # bursts pass through both stages without blocking the recording
+    start = time.monotonic()
+    assert pipeline.submit(burst(0))
+    submitTime = time.monotonic() - start
+    assert collect(1) == ['burst 0 processed']
+    print(f'submit took {submitTime*1e3:.2f} ms')
+    assert submitTime < 0.1
+
+    # one burst processing, one waiting: a third is refused
+    assert pipeline.submit(burst(1, processing=1))
+    time.sleep(0.2)
+    assert pipeline.submit(burst(2))
+    assert not pipeline.submit(burst(3))
+    assert collect(2) == ['burst 1 processed', 'burst 2 processed']
+
+    # a burst whose deadline has passed is skipped
+    assert pipeline.submit(burst(4, deadline=-1))
+    time.sleep(0.2)
+    assert pipeline.submit(burst(5))
+    assert collect(1) == ['burst 5 processed']
+
+    # a hung telemetry stage is restarted once its deadline (plus grace) has passed
+    assert pipeline.submit(burst(6, telemetry=60, deadline=1))
+    time.sleep(2)
+    pipeline.check()
+    assert pipeline.processes[1].is_alive()
+    powered = [powerDowns.get(timeout=5) for _ in range(5)] # bursts 0, 1, 2, 5 sent and 6 terminated (3 refused, 4 skipped)
+    assert powered[-1] == 'burst 6', powered
+    assert pipeline.submit(burst(7))
+    assert collect(1) == ['burst 7 processed']
+
+    pipeline.close(timeout=5)
+    assert not any(process.is_alive() for process in pipeline.processes)
+    print('pipeline checks passed')
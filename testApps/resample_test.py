@@ -0,0 +1,56 @@
+## resample_test.py
+"""
+Checks utils/resample.py against np.interp on each channel: random and irregular time bases,
+target times outside the source span and on source times, repeated source times, and NaN
+values (with and without cropping). Also checks that the index/weight table of a time base is
+only computed once and times resampling nine channels against nine np.interp calls.
+
+Usage (from the repository root):
+    python3 -m testApps.resample_test
+"""
+from timeit import default_timer as timer
+import numpy as np
+from utils.resample import resample, interp_table, _cached_table
+
+def reference(x, sourceTime, targetTime):
+    return np.array([np.interp(targetTime, sourceTime, channel) for channel in x])
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    for trial in range(100):
+        sourceTime = np.cumsum(rng.uniform(0, 1, rng.integers(1, 50)))
+        if trial % 4 == 0 and len(sourceTime) > 2: # repeated source times
+            sourceTime[1] = sourceTime[0]
+        targetTime = np.sort(np.concatenate([rng.uniform(sourceTime[0]-2, sourceTime[-1]+2, 40), sourceTime]))
+        x = rng.normal(size=(3, len(sourceTime)))
+        assert np.allclose(resample(x, sourceTime, targetTime), reference(x, sourceTime, targetTime), rtol=0, atol=1e-12)
+        assert np.allclose(resample(x[0], sourceTime, targetTime), np.interp(targetTime, sourceTime, x[0]), rtol=0, atol=1e-12)
+
+    # NaN at the start of one channel: cropped targets are those np.interp returns NaN for
+    sourceTime = np.arange(10.)
+    targetTime = np.arange(-1, 11, 0.25)
+    x = rng.normal(size=(2, 10))
+    x[1, :2] = np.nan
+    expected = reference(x, sourceTime, targetTime)
+    y, keep = resample(x, sourceTime, targetTime, cropNaN=True)
+    assert np.array_equal(keep, ~np.isnan(expected).any(axis=0))
+    assert np.allclose(y, expected[:, keep], rtol=0, atol=1e-12)
+
+    # one table per time base
+    _cached_table.cache_clear()
+    sourceTime = np.sort(rng.uniform(0, 1920, 1920*12))
+    targetTime = np.arange(0, 1920, 1/12)
+    x = rng.normal(size=(9, len(sourceTime)))
+    start = timer()
+    for _ in range(5):
+        y = resample(x, sourceTime, targetTime)
+    resampleTime = (timer() - start)/5
+    assert _cached_table.cache_info().misses == 1
+    start = timer()
+    expected = reference(x, sourceTime, targetTime)
+    interpTime = timer() - start
+    assert np.allclose(y, expected, rtol=0, atol=1e-12)
+    index, weight = interp_table(sourceTime, targetTime)
+    assert not index.flags.writeable and not weight.flags.writeable
+    print(f'9 channels x {len(targetTime)} points: np.interp {interpTime*1e3:.1f} ms, resample {resampleTime*1e3:.1f} ms (table cached)')
+    print('resample checks passed')
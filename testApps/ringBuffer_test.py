@@ -0,0 +1,80 @@
+## ringBuffer_test.py
+"""
+Checks the shared-memory ring buffer (utils/ringBuffer.py): records come back oldest first and
+once, a buffer one short of full returns every record, a buffer exactly full does not return
+the slot which the producer writes next (even when a record is half written into it), overruns
+are counted as dropped, and a producer process writing as fast as it can never hands the
+consumer a torn record.
+
+Usage (from the repository root):
+    python3 -m testApps.ringBuffer_test
+"""
+import time, multiprocessing
+import numpy as np
+from utils.ringBuffer import SharedRingBuffer
+
+DTYPE = np.dtype([('k', '<i8'), ('check', '<i8')]) # check = -k: a torn record breaks it
+capacity = 64
+
+def produce(ring, n):
+    for k in range(n):
+        ring.put((k, -k))
+
+def assert_intact(records, first=None):
+    assert np.all(records['check'] == -records['k']), 'torn record'
+    assert np.all(np.diff(records['k']) == 1)
+    if first is not None and len(records):
+        assert records['k'][0] == first
+
+if __name__ == '__main__':
+    ring = SharedRingBuffer(DTYPE, capacity)
+
+    # one short of full: every record
+    produce(ring, capacity - 1)
+    records, dropped = ring.get()
+    assert len(records) == capacity - 1 and dropped == 0
+    assert_intact(records, 0)
+    assert len(ring.get()[0]) == 0
+    ring.close()
+
+    # exactly full, with the producer part-way through the next record (not yet published): the
+    # slot it is writing holds the oldest record, which is dropped rather than returned torn
+    ring = SharedRingBuffer(DTYPE, capacity)
+    produce(ring, capacity)
+    ring._records['k'][0] = capacity # first field of record 64 written, check not yet
+    records, dropped = ring.get()
+    assert len(records) == capacity - 1 and dropped == 1
+    assert_intact(records, 1)
+    ring.close()
+
+    # overrun: the records overwritten are counted as dropped
+    ring = SharedRingBuffer(DTYPE, capacity)
+    produce(ring, 3*capacity)
+    records, dropped = ring.get()
+    assert len(records) + dropped == 3*capacity
+    assert_intact(records, 3*capacity - len(records))
+    ring.close()
+
+    # a producer process racing the consumer
+    ring = SharedRingBuffer(DTYPE, capacity)
+    n = 200000
+    process = multiprocessing.Process(target=produce, args=(ring, n))
+    process.start()
+    received = dropped = 0
+    last = -1
+    while True:
+        finished = not process.is_alive() # checked before get(), which then reads every record
+        records, lost = ring.get()
+        assert np.all(records['check'] == -records['k']), 'torn record'
+        if len(records):
+            assert records['k'][0] > last and np.all(np.diff(records['k']) == 1)
+            last = records['k'][-1]
+        received += len(records)
+        dropped += lost
+        if finished:
+            break
+    process.join()
+    print(f'{received} records received, {dropped} dropped, none torn')
+    assert received + dropped == n
+    ring.close()
+    print('ring buffer checks passed')
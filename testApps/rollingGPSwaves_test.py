@@ -0,0 +1,106 @@
+## rollingGPSwaves_test.py
+"""
+Feeds a synthetic burst of checksummed GPGGA/GPVTG sentences to RollingGPSwaves one line at a
+time, as recordGPS writes them, and compares the final estimate with GPStoUVZ and GPSwaves on
+the burst file. Checks that provisional estimates are written to the status file during the
+burst, that a burst cut short leaves a provisional estimate in the status file which packs as
+a payload of sensor type 50, 51, and 52 (as createTX does when it is queued at boot), and
+reports the time spent in finalize() after the burst compared with the batch routines.
+
+Usage (from the repository root):
+    python3 -m testApps.rollingGPSwaves_test
+"""
+import os, tempfile, time
+from functools import reduce
+import numpy as np
+from GPS.GPStoUVZ import GPStoUVZ
+from datetime import datetime
+from GPS.rollingGPSwaves import RollingGPSwaves, read_status, write_status, waveNames
+from SBD.payloadSchema import pack_payload, decode
+from waves.GPSwaves import GPSwaves
+from testApps.UVZAwavesEstimator_test import synthetic_burst, names
+
+dataDir = tempfile.mkdtemp()
+
+def checksum(body):
+    return '%02X' % reduce(lambda a, b: a ^ b, body.encode(), 0)
+
+def sentences(fs, duration, lostFix=False):
+    """ GPGGA/GPVTG lines for the synthetic burst, optionally without a fix for the first second """
+    u, v, z, _ = synthetic_burst(fs, duration)
+    speed = np.hypot(u, v) / 0.2777 # [km/h]
+    track = np.degrees(np.arctan2(u, v)) % 360
+    for k in range(len(u)):
+        s = 75600 + k/fs
+        hms = '%02d%02d%05.2f' % (s//3600, s % 3600//60, s % 60)
+        qual = 0 if lostFix and k < fs else 1
+        gga = f'GPGGA,{hms},4654.{k % 10000:04d},N,12406.0000,W,{qual},08,0.9,{z[k]:.4f},M,-25.0,M,,'
+        vtg = f'GPVTG,{track[k]:.4f},T,,M,0.00,N,{speed[k]:.4f},K,A'
+        yield f'${gga}*{checksum(gga)}\r\n'
+        yield f'${vtg}*{checksum(vtg)}\r\n'
+
+def run(fs, duration, lostFix=False, stop=None):
+    """
+    record the burst through RollingGPSwaves; stop after this many lines, as if interrupted.
+    Without a fix, z is badValue and despiked, so the outputs are only close to the batch ones.
+    """
+    statusFilename = os.path.join(dataDir, f'GPSwaves_status_{fs}Hz.json')
+    rolling = RollingGPSwaves(fs, statusFilename, rollingWindows=2)
+    filename = os.path.join(dataDir, 'microSWIFT000_GPS_12Jul2021_210000UTC.dat')
+    with rolling.open_file(filename) as gps_out:
+        for i, line in enumerate(sentences(fs, duration, lostFix)):
+            if i == stop:
+                return rolling, None, read_status(statusFilename)
+            gps_out.write(line)
+            gps_out.flush()
+    start = time.perf_counter()
+    stream = rolling.finalize()
+    finalizeTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    GPS = GPStoUVZ(filename)
+    batch = GPSwaves(GPS['u'], GPS['v'], GPS['z'], fs)
+    batchTime = time.perf_counter() - start
+
+    error = max(np.max(np.abs(np.asarray(s) - np.asarray(b))) for s, b in zip(stream, batch))
+    print(f'fs={fs} Hz, {duration} s: Hs={batch[0]:.4f}/{stream[0]:.4f}, Tp={batch[1]:.3f}/{stream[1]:.3f}, '
+          f'Dp={batch[2]:.2f}/{stream[2]:.2f}; max abs difference {error:.2e}; {rolling.provisional} provisional estimates; '
+          f'GPStoUVZ+GPSwaves {batchTime*1e3:.1f} ms, finalize {finalizeTime*1e3:.1f} ms')
+    if lostFix:
+        assert abs(stream[0] - batch[0]) < 1e-2*batch[0] and stream[1] == batch[1]
+    else:
+        for name, s, b in zip(names, stream, batch):
+            assert np.allclose(s, b, rtol=1e-9, atol=1e-12), name
+    return rolling, stream, read_status(statusFilename)
+
+if __name__ == '__main__':
+    for fs in [4, 25]: # GPSwaves needs win/2 not divisible by merge (see its TODO on f length)
+        rolling, stream, status = run(fs, 1920)
+        # 1920 s holds 27 windows of 256 s with 75% overlap: provisional estimates at 2, 4, ..., 26
+        assert rolling.provisional == 13 and status['state'] == 'final' and status['windows'] == 27
+        assert np.allclose(status['E'], stream[3]) and status['Hs'] == stream[0]
+        assert abs(status['z_mean'] - 3.0) < 0.01 and status['last_lat'] > 46
+
+    _, stream, _ = run(4, 1920, lostFix=True)
+
+    # a burst interrupted after ~600 s leaves a provisional estimate of the same waves
+    rolling, _, status = run(4, 1920, stop=2*4*600)
+    print(f'interrupted: {status["state"]} estimate after {status["windows"]} windows, Hs={status["Hs"]:.4f}')
+    assert status['state'] == 'provisional' and status['windows'] == 6
+    assert abs(status['Hs'] - stream[0]) < 0.1*stream[0]
+
+    # the provisional estimate packs as a payload of each sensor type, as queued at boot
+    for sensor_type in [50, 51, 52]:
+        payload_data = pack_payload(sensor_type, 7, 6, datetime.utcnow(), *[status[name] for name in waveNames],
+                                    status['u_mean'], status['v_mean'], status['z_mean'], status['last_lat'], status['last_lon'], 0.0, 0.0, 1)
+        data = decode(payload_data)
+        assert data['sensor_type'] == sensor_type and abs(data['Hs'] - status['Hs']) < 1e-2*status['Hs']
+        assert np.allclose(data['E'], status['E'], rtol=1e-2)
+        if sensor_type == 52:
+            assert np.array_equal(data['a1'], np.round(100*status['a1']))
+
+    # marking it queued writes the arrays back
+    status['state'] = 'queued'
+    write_status(rolling.statusFilename, status)
+    assert read_status(rolling.statusFilename)['state'] == 'queued'
+    print('rollingGPSwaves checks passed')
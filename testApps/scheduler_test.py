@@ -0,0 +1,85 @@
+## scheduler_test.py
+"""
+Runs the burst scheduler (utils/scheduler.py) on a simulated clock: checks the schedule for
+the Config.dat settings and short burst intervals, that wait() returns at the start of each
+window with a handful of wakeups per hour instead of one per second, that a burst window
+which is already open is returned at once, and that the schedule recovers when the system
+clock is set forwards or backwards during a sleep (as recordGPS does from the GPS).
+
+Usage (from the repository root):
+    python3 -m testApps.scheduler_test
+"""
+from datetime import datetime, timedelta
+from utils.scheduler import BurstScheduler
+
+class SimulatedClock:
+    """ wall clock, monotonic clock, and sleep; jumps[k] is added to the wall clock during sleep k """
+    def __init__(self, now, jumps=None):
+        self.now = now
+        self.elapsed = 0.
+        self.sleeps = 0
+        self.jumps = jumps or {}
+
+    def clock(self):
+        return self.now
+
+    def monotonic(self):
+        return self.elapsed
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds + self.jumps.get(self.sleeps, 0))
+        self.elapsed += seconds
+        self.sleeps += 1
+
+def scheduler(clock, burst_time=0, burst_interval=60, burst_seconds=2400):
+    return BurstScheduler(burst_time, burst_interval, burst_seconds, clock=clock.clock,
+                          monotonic=clock.monotonic, sleep=clock.sleep)
+
+if __name__ == '__main__':
+    t0 = datetime(2021, 7, 12, 20, 41, 30)
+
+    # Config.dat schedule: one 40 minute burst at the top of each hour
+    clock = SimulatedClock(t0)
+    windows = scheduler(clock).schedule(t0, t0 + timedelta(hours=3))
+    assert [w.start.hour for w in windows] == [21, 22, 23] and all(w.minute == 0 and w.end_time == 40 for w in windows)
+
+    # 12 minute interval, 10 minute bursts, starting at minute 2
+    windows = scheduler(clock, 2, 12, 600).schedule(t0, t0 + timedelta(hours=1))
+    assert [w.start.minute for w in windows] == [50, 2, 14, 26, 38] and windows[0].end_time == 60
+
+    # wait() returns at each window start, with a few wakeups per idle hour
+    for burst_interval, burst_seconds in [(60, 2400), (15, 600)]:
+        clock = SimulatedClock(t0)
+        s = scheduler(clock, 0, burst_interval, burst_seconds)
+        for _ in range(4):
+            window = s.wait()
+            assert clock.now == window.start
+            clock.now = window.end + timedelta(seconds=1) # record the burst
+        idleHours = 4 * (burst_interval*60 - burst_seconds) / 3600
+        print(f'{burst_interval} minute interval: {s.wakeups} wakeups in {idleHours:.1f} idle hours')
+        assert s.wakeups <= 10 * idleHours + 4
+
+    # an open window is returned immediately (e.g. after a restart during a burst)
+    clock = SimulatedClock(datetime(2021, 7, 12, 21, 10))
+    window = scheduler(clock).wait()
+    assert clock.sleeps == 0 and window.start == datetime(2021, 7, 12, 21) and window.end_time == 40
+
+    # clock set forward by an hour during the first sleep: the 21:00 window is skipped for 22:00
+    clock = SimulatedClock(t0, jumps={0: 3600})
+    s = scheduler(clock)
+    window = s.wait()
+    assert s.jumps == 1 and window.start == datetime(2021, 7, 12, 22) and clock.now == window.start
+
+    # clock set back by 10 minutes: the 21:00 window is still found, 10 minutes later
+    clock = SimulatedClock(t0, jumps={0: -600})
+    s = scheduler(clock)
+    window = s.wait()
+    assert s.jumps == 1 and window.start == datetime(2021, 7, 12, 21) and clock.now == window.start
+    assert clock.elapsed == (window.start - t0).total_seconds() + 600
+
+    # clock set back by 30 minutes, into the 20:00 window: it is returned at once
+    clock = SimulatedClock(t0, jumps={0: -1800})
+    window = scheduler(clock).wait()
+    assert window.start == datetime(2021, 7, 12, 20) and clock.now == datetime(2021, 7, 12, 20, 21, 30)
+
+    print('scheduler checks passed')
@@ -1,21 +1,103 @@
-import concurrent.futures
-import datetime
-import pwd
-import numpy as np
+## telemetry_queue_test.py
+"""
+Checks the telemetry queue (SBD/telemetryQueue.py): LIFO order within a priority, sensor type
+and size taken from the payload, attempt counts and acknowledgements, import of a
+telemetryQueue.txt list (the sensor type byte is read once, on import), that acknowledged
+messages are purged once older than the retention period, that a message whose
+TX file has since been deleted is dropped rather than retried every cycle, and that a process
+killed while enqueueing leaves an intact queue holding every message it had enqueued.
+
+Usage (from the repository root):
+    python3 -m testApps.telemetry_queue_test
+"""
+import os, signal, struct, tempfile, time, multiprocessing
 from datetime import datetime, timedelta
-from logging import *
-import sys, os
-from time import sleep
-import struct
-
-TX_file = '/home/pi/microSWIFT/data/microSWIFT043_TX_26Aug2022_195204UTC.dat'
-
-with open(TX_file, mode='rb') as file: # b is important -> binary
-						payload_data = file.read()
-					# logger.info(f'Opened TX')
-print(payload_data)
-# read in the sensor type from the binary payload file
-payloadStartIdx = -1
-sensor_type0 = ord(payload_data[payloadStartIdx+2:payloadStartIdx+3]) # sensor type is the 2 byte after the header
-				
-print(sensor_type0)
\ No newline at end of file
+from SBD.telemetryQueue import TelemetryQueue
+
+dataDir = tempfile.mkdtemp()
+queueFilename = os.path.join(dataDir, 'telemetryQueue.db')
+
+def payload(sensor_type, size=1245):
+    """ stand-in payload: payload type 7, sensor type, port, size """
+    return struct.pack('<sbbh', b'7', sensor_type, 6, size) + bytes(size - 5)
+
+def write_TX(name, sensor_type):
+    filename = os.path.join(dataDir, name)
+    with open(filename, 'wb') as file:
+        file.write(payload(sensor_type))
+    return filename
+
+def enqueue_forever(progress):
+    """ enqueue messages until killed, counting those committed """
+    with TelemetryQueue(queueFilename) as queue:
+        k = 0
+        while True:
+            queue.enqueue(f'TX_{k}.dat', payload(52))
+            progress.value = k + 1
+            k += 1
+
+if __name__ == '__main__':
+    with TelemetryQueue(queueFilename) as queue:
+        # newest first; sensor type and size from the payload
+        for k in range(3):
+            queue.enqueue(f'TX_{k}.dat', payload(50 + k))
+        urgent = queue.enqueue('TX_urgent.dat', payload(52), priority=1)
+        pending = queue.pending()
+        assert [m.filename for m in pending] == ['TX_urgent.dat', 'TX_2.dat', 'TX_1.dat', 'TX_0.dat']
+        assert [m.sensor_type for m in pending] == [52, 52, 51, 50] and all(m.size == 1245 for m in pending)
+
+        # attempts are counted; acknowledged messages are no longer pending
+        queue.attempt(urgent)
+        queue.attempt(urgent)
+        queue.ack(pending[1].id)
+        assert len(queue) == 3 and queue.pending(1)[0].attempts == 2
+        assert [m.filename for m in queue.pending()] == ['TX_urgent.dat', 'TX_1.dat', 'TX_0.dat']
+
+        # acknowledged messages are kept until they are older than the retention period
+        rows = lambda: queue._db.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+        assert rows() == 4 and queue.purge() == 0 and rows() == 4
+        queue._db.execute('UPDATE messages SET sent = ? WHERE id = ?',
+                          ((datetime.utcnow() - timedelta(days=8)).isoformat(), pending[1].id)) # acknowledged 8 days ago
+        assert queue.purge() == 1 and rows() == 3 and len(queue) == 3
+        queue.ack(pending[2].id)
+        assert queue.purge(days=0) == 1 and rows() == 2 and len(queue) == 2
+        assert [m.filename for m in queue.pending()] == ['TX_urgent.dat', 'TX_0.dat']
+
+        # the previous text file queue is imported once, oldest first
+        listFilename = os.path.join(dataDir, 'telemetryQueue.txt')
+        with open(listFilename, 'w') as file:
+            file.write(write_TX('TX_old_0.dat', 51) + '\n' + write_TX('TX_old_1.dat', 52) + '\n' + 'missing.dat\n')
+        assert queue.import_list(listFilename) == 2 and queue.import_list(listFilename) == 0
+        assert not os.path.exists(listFilename)
+        old = [m for m in queue.pending() if 'old' in m.filename]
+        assert [os.path.basename(m.filename) for m in old] == ['TX_old_1.dat', 'TX_old_0.dat'] and [m.sensor_type for m in old] == [52, 51]
+
+        # an imported message whose TX file is deleted is dropped when the send loop reaches it
+        os.remove(old[1].filename)
+        for cycle in range(2):
+            dropped = []
+            for message in [m for m in queue.pending() if 'old' in m.filename]: # the others are stand-ins without files
+                try:
+                    with open(message.filename, 'rb') as file: # as send_telemetry reads the TX files
+                        file.read()
+                except FileNotFoundError:
+                    queue.drop(message.id)
+                    dropped.append(os.path.basename(message.filename))
+            assert dropped == (['TX_old_0.dat'] if cycle == 0 else [])
+        assert [os.path.basename(m.filename) for m in queue.pending() if 'old' in m.filename] == ['TX_old_1.dat']
+        before = len(queue)
+
+    # kill a process in the middle of enqueueing: every committed message is still there
+    progress = multiprocessing.Value('i', 0)
+    process = multiprocessing.Process(target=enqueue_forever, args=(progress,))
+    process.start()
+    while progress.value < 200:
+        time.sleep(0.01)
+    os.kill(process.pid, signal.SIGKILL)
+    process.join()
+    with TelemetryQueue(queueFilename) as queue:
+        assert queue._db.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        added = len(queue) - before
+        print(f'killed after {progress.value} committed enqueues; {added} found')
+        assert added in (progress.value, progress.value + 1) # the last one may commit before progress is updated
+    print('telemetry queue checks passed')
@@ -0,0 +1,47 @@
+## welch_memory_test.py
+"""
+Measures the peak memory allocated by spectralCore.welch() (with tracemalloc) for bursts of
+increasing length and sampling rate, against transforming all windows at once as the previous
+version did (demeaned, tapered, and rescaled copies of every window). The input array is not
+counted. Checks that both give the same spectra and that the blocked version's peak does not
+grow with burst length.
+
+Usage (from the repository root):
+    python3 -m testApps.welch_memory_test
+"""
+import tracemalloc
+import numpy as np
+from waves.spectralCore import welch, window_length, window_starts, windowed, cross_spectra, merge_bands, demean
+
+def welch_all_windows(x, fs, wsecs=256, merge=3):
+    """ all windows at once, as before: three full copies of the windows plus the transform """
+    win = window_length(fs, wsecs)
+    starts = window_starts(x.shape[1], win)
+    taper = np.sin(np.arange(1, win+1) * np.pi/(win+1))
+    windows = demean(windowed(x, win, starts))
+    windowstaper = windows * taper
+    fact = np.sqrt(np.var(windows, axis=-1, ddof=1) / np.var(windowstaper, axis=-1, ddof=1))
+    X = np.fft.rfft(fact[..., None] * windowstaper, axis=-1)[..., 1:]
+    X[..., -1] = 0
+    return merge_bands(cross_spectra(X), merge) / len(starts) / (win/2 * fs)
+
+def peak(fun, *args):
+    tracemalloc.start()
+    result = fun(*args)
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peakBytes
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    for fs in [12, 48]:
+        peaks = []
+        for duration in [1920, 3840, 7680]:
+            x = rng.normal(size=(4, duration*fs))
+            (S, _, _), blockedPeak = peak(welch, x, fs)
+            reference, referencePeak = peak(welch_all_windows, x, fs)
+            assert np.allclose(S, reference, rtol=1e-10, atol=0)
+            peaks.append(blockedPeak)
+            print(f'{fs:>3} Hz, {duration:>5} s ({x.nbytes/2**20:5.1f} MiB input): peak {referencePeak/2**20:6.1f} MiB all windows, {blockedPeak/2**20:5.1f} MiB blocked')
+        assert max(peaks) < 1.1*min(peaks), 'blocked peak grows with burst length'
+    print('welch memory checks passed')
@@ -0,0 +1,185 @@
+"""
+Author: @jacobrdavis
+
+Process-isolated sensor acquisition. Each recorder (recordGPS, recordIMU) runs in its own process
+and writes fixed-size records into a SharedRingBuffer instead of a file; the main process drains
+the buffers and persists the records, so serial reads, NMEA parsing, I2C polling, and file writes
+no longer contend for a single GIL.
+
+A recorder takes the burst end time and an open_out(filename, **header) function, which it calls
+once to open its output and then writes samples to the returned object. In process mode
+open_out is a RingOutput, which notifies the main process of the file name and header (via a
+control queue) and returns a writer into the ring buffer; the main process opens the real file
+with the sensor's sink and writes the drained records to it.
+
+Contents:
+    - GPS_DTYPE
+    - RingWriter(ring)
+    - RingOutput(name, ring, control)
+    - GPSFileSink(filename)
+    - run_producer(name, record, end_time, open_out, control)
+    - acquire(end_time, producers, poll_interval) [main]
+
+Log:
+    - Oct 2026: created acquisition.py
+"""
+#--Import Statements
+import numpy as np
+import multiprocessing
+from queue import Empty
+from logging import getLogger
+from utils.ringBuffer import SharedRingBuffer
+
+#--Constants
+GPS_DTYPE = np.dtype([('line', 'S96')]) # one NMEA sentence (at most 82 characters) per record
+
+#--helper functions:
+class RingWriter:
+    """
+    Writer passed to the recorders in process mode; each write() stores one record in the ring
+    buffer, with the arguments as the record fields (e.g. timestamp, accel_raw, mag_raw, gyro_raw
+    for IMU_DTYPE, or the NMEA line for GPS_DTYPE)
+    """
+    def __init__(self, ring):
+        self.ring = ring
+
+    def write(self, *fields):
+        self.ring.put(fields)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RingOutput:
+    """
+    open_out() replacement for the recorders in process mode: reports the output file name and
+    header to the main process and returns a RingWriter
+    """
+    def __init__(self, name, ring, control):
+        self.name = name
+        self.ring = ring
+        self.control = control
+
+    def __call__(self, filename, **header):
+        self.control.put(('start', self.name, filename, header))
+        return RingWriter(self.ring)
+
+
+class GPSFileSink:
+    """
+    Main-process sink which writes drained GPS_DTYPE records to a GPS text file
+    """
+    def __init__(self, filename):
+        self._file = open(filename, 'wb')
+
+    def write_records(self, records):
+        self._file.write(b''.join(records['line']))
+
+    def close(self):
+        self._file.close()
+
+
+def run_producer(name, record, end_time, open_out, control):
+    """
+    Helper function run in each acquisition process: run the recorder and report its result
+
+    Input:
+        - name, sensor name (e.g. 'GPS', 'IMU')
+        - record, recorder function, record(end_time, open_out) -> (filename, initialized)
+        - end_time, burst end time passed to the recorder
+        - open_out, RingOutput for this sensor
+        - control, control queue to the main process
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+    filename, initialized = '', False
+    try:
+        filename, initialized = record(end_time, open_out)
+    except Exception as e:
+        logger.info(e, exc_info=True)
+    control.put(('done', name, filename, initialized))
+
+
+def acquire(end_time, producers, poll_interval=0.5):
+    """
+    Run each recorder in its own process and persist the samples they write to shared-memory
+    ring buffers until all recorders have finished
+
+    Input:
+        - end_time, burst end time passed to the recorders
+        - producers, dictionary of sensor name: (record, dtype, capacity, sink), where
+            - record, recorder function, record(end_time, open_out) -> (filename, initialized)
+            - dtype, NumPy dtype of one sample
+            - capacity, ring buffer length [samples]
+            - sink, sink(filename, **header) opening the output file; it must provide
+              write_records(records) and close()
+        - poll_interval, interval at which the ring buffers are drained [s]
+
+    Output:
+        - results, dictionary of sensor name: (filename, initialized)
+        - dropped, dictionary of sensor name: number of samples lost to ring buffer overruns
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+
+    control = multiprocessing.Queue()
+    rings = {name: SharedRingBuffer(dtype, capacity) for name, (_, dtype, capacity, _) in producers.items()}
+    processes = {name: multiprocessing.Process(target=run_producer, name=f'record{name}',
+                                               args=(name, record, end_time, RingOutput(name, rings[name], control), control))
+                 for name, (record, _, _, _) in producers.items()}
+    for process in processes.values():
+        process.start()
+
+    sinks = {}
+    results = {}
+    dropped = dict.fromkeys(producers, 0)
+
+    def drain(): # records stay in a ring buffer until its output has been opened
+        for name, sink in sinks.items():
+            records, lost = rings[name].get()
+            dropped[name] += lost
+            if len(records) > 0:
+                sink.write_records(records)
+
+    try:
+        while len(results) < len(processes):
+            # handle control messages, waiting up to poll_interval for the first one
+            try:
+                message = control.get(timeout=poll_interval)
+                while True:
+                    kind, name, filename = message[:3]
+                    if kind == 'start':
+                        sinks[name] = producers[name][3](filename, **message[3])
+                        logger.info(f'{name} acquisition writing to {filename}')
+                    elif kind == 'done':
+                        results[name] = (filename, message[3])
+                    message = control.get_nowait()
+            except Empty:
+                pass
+            drain()
+
+            # a process which died without reporting is treated as uninitialized
+            for name, process in processes.items():
+                if name not in results and not process.is_alive() and control.empty():
+                    logger.info(f'{name} acquisition process exited with code {process.exitcode}')
+                    results[name] = ('', False)
+        drain()
+    finally:
+        for sink in sinks.values():
+            sink.close()
+        for process in processes.values():
+            process.join()
+        for ring in rings.values():
+            ring.close()
+
+    for name, lost in dropped.items():
+        if lost:
+            logger.info(f'{name} acquisition dropped {lost} samples (ring buffer overrun)')
+    return results, dropped
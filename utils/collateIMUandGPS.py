@@ -8,6 +8,12 @@ Contents:
     - datetimearray2relativetime(datetimeArr,t0)
     - collateIMUandGPS(IMU,GPS) [main]
 
+Log:
+    - Oct 2026: times are datetime64[ns] arrays; cropping and relative times are vector operations
+    - Oct 2026: GPS fields interpolated together with resample(); IMU cropped once, to the GPS time
+      span and the non-NaN interpolated values
+    - Oct 2026: dtype option for the interpolated GPS fields (precision mode)
+
 TODO:
     - remove reassignment of the same variable?
 
@@ -16,6 +22,7 @@ TODO:
 import numpy as np
 from logging import getLogger
 from datetime import datetime, timedelta
+from utils.resample import resample
 
 #--helper functions: 
 
@@ -40,16 +47,16 @@ def datetimearray2relativetime(datetimeArr,t0):
     Helper function to convert datetime array to relative time in seconds
     
     Inputs:
-        - datetimeArr, array of datetimes
+        - datetimeArr, array of datetimes (datetime64, or datetime objects)
         - t0, initial (or reference) time 
 
     Outputs:
-        relTime - list of floats describing time (in sec) relative to t0
+        relTime - array of floats describing time (in sec) relative to t0
     """
-    relTime = [timestep.total_seconds() for timestep in (np.asarray(datetimeArr)-t0)]
+    relTime = (np.asarray(datetimeArr, dtype='datetime64[ns]') - np.datetime64(t0, 'ns')) / np.timedelta64(1, 's')
     return relTime   
 
-def collateIMUandGPS(IMU,GPS):
+def collateIMUandGPS(IMU,GPS,dtype='float64'):
     """
     Main function to collate IMU and GPS records. The IMU fields are cropped to lie within the available 
     GPS record and then the GPS is interpolated up to the IMU rate using the IMU as the master time.
@@ -57,6 +64,8 @@ def collateIMUandGPS(IMU,GPS):
     Inputs:
         - IMU, input dictionary containing acc ['ai'], vel ['vi'], pos ['pi'], and time ['time'] as entries.
         - GPS, input dictionary containing GPS records as entries
+        - dtype, precision of the interpolated GPS fields, 'float64' or 'float32' (lat and lon
+          are kept in float64, since float32 resolves them to about a metre)
         
     Outputs:
         - IMU, output dictionary containing collated IMU fields
@@ -68,37 +77,31 @@ def collateIMUandGPS(IMU,GPS):
 
     #-- crop IMU values to lie within the GPS times (since GPS is being interpolated onto IMU time)
     logger.info('Cropping IMU')
+    GPS['time'] = np.asarray(GPS['time'], dtype='datetime64[ns]')
+    IMU['time'] = np.asarray(IMU['time'], dtype='datetime64[ns]')
     startCrop = GPS['time'][0]
     endCrop   = GPS['time'][-1]
-    cropIMUbool = np.logical_and(IMU['time'] >= startCrop, IMU['time'] <= endCrop)
-    IMUcrop = crop_dict(IMU,cropIMUbool)
+    cropIMU = np.flatnonzero(np.logical_and(IMU['time'] >= startCrop, IMU['time'] <= endCrop))
 
     #-- convert datetimes to relative times for interpolation
     relTimeGPS = datetimearray2relativetime(GPS['time'],t0=startCrop)
-    relTimeIMU = datetimearray2relativetime(IMUcrop['time'],t0=startCrop)
+    relTimeIMU = datetimearray2relativetime(IMU['time'][cropIMU],t0=startCrop)
     
-    #-- interpolate the GPS values onto the IMU time
+    #-- interpolate the GPS values onto the IMU time, all fields at once, dropping any IMU times
+    #   at which a field is NaN (if NaNs exist, they should be exterior)
     logger.info('Interpolating GPS')
-    GPSintp = dict()
-    NaNbools = [] # initialize a list of to store logical array of NaN locations
     GPS['z'] = GPS['z'][:-1]
-    GPSlens = [len(GPS[key]) for key in GPS.keys()-['time']]
-    minLen = np.min(GPSlens)
-
-    for key in GPS.keys()-['time']:
-        GPSintp[key] = np.interp(relTimeIMU,relTimeGPS[:minLen],GPS[key][:minLen]) # interpolate GPS onto IMU
-        NaNbools.append(~np.isnan(GPSintp[key])) # record any NaNs as False
-
-    GPSintp.update({'time':IMUcrop['time']}) # update new GPS dict with datetime 
-
-    #-- Crop NaN values; if NaNs exist, they should be exterior
-    nonNaN = np.logical_and.reduce(np.asarray(NaNbools)) # intersect all NaN locations
-    numNaNs = len(nonNaN) - sum(nonNaN)
-    logger.info(f'{numNaNs} NaNs detected')
-    if numNaNs>0:
-        IMUcrop   = crop_dict(IMU,nonNaN)
-        GPSintp = crop_dict(GPSintp,nonNaN)
-        logger.info(f'{numNaNs} NaNs removed')
+    GPSkeys = list(GPS.keys()-['time'])
+    minLen = np.min([len(GPS[key]) for key in GPSkeys])
+    GPSstack = np.array([GPS[key][:minLen] for key in GPSkeys])
+    GPSstack, nonNaN = resample(GPSstack, relTimeGPS[:minLen], relTimeIMU, cropNaN=True)
+    numNaNs = len(nonNaN) - np.sum(nonNaN)
+    logger.info(f'{numNaNs} NaNs detected and removed')
+
+    #-- crop the IMU once, to the GPS time span and the non-NaN interpolated values
+    IMU = crop_dict(IMU,cropIMU[nonNaN])
+    GPSintp = {key: values if key in ('lat', 'lon') else values.astype(dtype) for key, values in zip(GPSkeys, GPSstack)}
+    GPSintp.update({'time':IMU['time']}) # update new GPS dict with datetime 
 
     logger.info('----------------------------------------------------')
 
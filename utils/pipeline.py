@@ -0,0 +1,184 @@
+"""
+Author: @jacobrdavis
+
+Staged burst pipeline. Processing and telemetry of a burst run in worker processes while the
+main process records the next burst. Each stage runs in its own process and takes jobs from a
+bounded queue; a job is a dictionary describing one burst, which each stage passes on
+(updated) to the next one.
+
+Every job carries a deadline (a UTC datetime, after which the products of the next burst are
+submitted). A stage skips jobs whose deadline has already passed, and a stage still busy with a
+job well after its deadline is terminated and restarted, so one burst which hangs (a stuck
+modem, a corrupt file) cannot hold up the following ones. When a queue is full the newest job
+is refused and logged rather than blocking the recording.
+
+Deadlines are converted to the monotonic clock when a stage starts a job, so they are not
+affected when the system time is set from the GPS during a burst. Stage processes are
+daemonic, so they stop with the main process (e.g. when microSWIFT.service restarts it).
+
+Stage processes are always started with fork, whatever the platform's default start method
+(forkserver on Linux from Python 3.14): the stage functions of microSWIFT.py use the
+configuration and logger set up in its __main__ block, which only a forked child inherits.
+
+A stage process which is terminated (SIGTERM) raises SystemExit, so the with and finally blocks
+of the job unwind (e.g. ModemSession powers down the modem) before the process exits.
+
+Contents:
+    - Stage(name, run, maxsize)
+    - run_stage(stage, inbox, outbox, busyUntil)
+    - Pipeline(stages, grace, cleanup) [main]
+
+Log:
+    - Oct 2026: created pipeline.py
+    - Oct 2026: stage processes started with fork explicitly
+    - Oct 2026: terminated stages unwind their job (SIGTERM raises SystemExit)
+"""
+#--Import Statements
+import time
+import signal
+import multiprocessing
+from queue import Full
+from datetime import datetime
+from logging import getLogger
+
+#--helper functions:
+class Stage:
+    """
+    One pipeline stage
+
+    Input:
+        - name, stage name (used for the process name and logging)
+        - run, run(job) -> job passed to the next stage (or None to stop the job here)
+        - maxsize, number of jobs which can wait in the stage's queue
+    """
+    def __init__(self, name, run, maxsize=1):
+        self.name = name
+        self.run = run
+        self.maxsize = maxsize
+
+
+def _terminate(signum, frame):
+    """
+    Helper function handling SIGTERM in stage processes: exit through SystemExit, running the
+    cleanup of the current job
+    """
+    raise SystemExit(128 + signum) # exit status of a process killed by the signal
+
+
+def run_stage(stage, inbox, outbox, busyUntil):
+    """
+    Helper function run in each stage process: run jobs from inbox until a None job arrives
+
+    Input:
+        - stage, Stage
+        - inbox, queue of jobs for this stage
+        - outbox, queue of the next stage (None for the last stage)
+        - busyUntil, shared monotonic time at which the current job is overdue (0 when idle)
+    """
+    logger = getLogger('microSWIFT.'+__name__)
+    signal.signal(signal.SIGTERM, _terminate)
+    while True:
+        job = inbox.get()
+        if job is None: # stop, after passing the stop on to the next stage
+            if outbox is not None:
+                outbox.put(None)
+            break
+        remaining = (job['deadline'] - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            logger.info(f"{stage.name}: deadline of {job['name']} passed, skipped")
+            continue
+        busyUntil.value = time.monotonic() + remaining
+        start = time.monotonic()
+        try:
+            job = stage.run(job)
+        except Exception as e:
+            logger.info(f'{stage.name}: {e}', exc_info=True)
+            job = None
+        busyUntil.value = 0
+        logger.info(f'{stage.name} took {time.monotonic() - start:.1f} s')
+        if job is not None and outbox is not None:
+            try:
+                outbox.put_nowait(job)
+            except Full:
+                logger.info(f"{stage.name}: queue of the next stage is full, {job['name']} dropped")
+
+
+class Pipeline:
+    """
+    Chain of stages, each in its own process:
+
+        pipeline = Pipeline([Stage('processing', process_burst), Stage('telemetry', send_telemetry)])
+        pipeline.submit({'name': ..., 'deadline': ..., ...})   # returns immediately
+        pipeline.check()                                       # periodically: restart overdue stages
+        pipeline.close()
+
+    Stage processes are forked (see above), so stage functions may use globals set up at run time.
+
+    Input:
+        - stages, list of Stage
+        - grace, time a stage may run past the deadline of its job before it is restarted [s]
+        - cleanup, time a terminated stage is given to unwind its job before it is killed [s]
+    """
+    def __init__(self, stages, grace=60, cleanup=10):
+        self.stages = stages
+        self.grace = grace
+        self.cleanup = cleanup
+        self.context = multiprocessing.get_context('fork')
+        self.queues = [self.context.Queue(stage.maxsize) for stage in stages]
+        self.busy = [self.context.Value('d', 0.0) for _ in stages]
+        self.processes = [None] * len(stages)
+        for i in range(len(stages)):
+            self._start(i)
+
+    def _start(self, i):
+        outbox = self.queues[i+1] if i+1 < len(self.stages) else None
+        self.busy[i].value = 0
+        self.processes[i] = self.context.Process(target=run_stage, name=self.stages[i].name,
+                                                 args=(self.stages[i], self.queues[i], outbox, self.busy[i]), daemon=True)
+        self.processes[i].start()
+
+    def submit(self, job):
+        """
+        Queue a job for the first stage without blocking
+
+        Input:
+            - job, dictionary with at least 'name' and 'deadline' (UTC datetime)
+
+        Output:
+            - True if the job was queued, False if the first stage's queue is full
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        try:
+            self.queues[0].put_nowait(job)
+        except Full:
+            logger.info(f"{self.stages[0].name} queue is full, {job['name']} not submitted")
+            return False
+        return True
+
+    def check(self):
+        """
+        Restart stages which have exited or are busy past the deadline of their job (plus grace)
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        for i, (stage, process) in enumerate(zip(self.stages, self.processes)):
+            busyUntil = self.busy[i].value
+            if busyUntil and time.monotonic() > busyUntil + self.grace:
+                logger.info(f'{stage.name} overran its deadline, restarting')
+                process.terminate()
+                process.join(self.cleanup)
+                if process.is_alive():
+                    logger.info(f'{stage.name} did not exit after {self.cleanup} s, killing')
+                    process.kill()
+                    process.join()
+                self._start(i)
+            elif not process.is_alive():
+                logger.info(f'{stage.name} exited with code {process.exitcode}, restarting')
+                self._start(i)
+
+    def close(self, timeout=None):
+        """
+        Let the stages finish their queued jobs and stop
+        """
+        self.queues[0].put(None)
+        for process in self.processes:
+            process.join(timeout)
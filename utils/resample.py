@@ -0,0 +1,92 @@
+"""
+Author: @jacobrdavis
+
+Linear interpolation of several channels from one time base onto another in a single pass.
+The interval index and weight of each target time (the searchsorted step which np.interp
+repeats for every channel) are computed once per (source time, target time) pair, cached, and
+applied to all channels of a stacked (channels, points) array. Values outside the source time
+span are held at the end values, as in np.interp.
+
+Contents:
+    - interp_table(sourceTime, targetTime)
+    - resample(x, sourceTime, targetTime, cropNaN) [main]
+
+Log:
+    - Oct 2026: created resample.py for IMUtoXYZ and collateIMUandGPS
+    - Oct 2026: float32 channels resampled in float32
+"""
+#--Import Statements
+import numpy as np
+from functools import lru_cache
+
+#--helper functions:
+@lru_cache(maxsize=8)
+def _cached_table(sourceBytes, targetBytes):
+    """
+    interp_table() of float64 time arrays given by their bytes; the returned arrays are read-only
+    """
+    sourceTime = np.frombuffer(sourceBytes)
+    targetTime = np.frombuffer(targetBytes)
+    if len(sourceTime) < 2: # a single source point is held everywhere
+        index = np.zeros(len(targetTime), dtype=np.intp)
+        weight = np.zeros(len(targetTime))
+    else:
+        index = np.clip(np.searchsorted(sourceTime, targetTime, side='right') - 1, 0, len(sourceTime) - 2)
+        dt = sourceTime[index+1] - sourceTime[index]
+        weight = np.divide(targetTime - sourceTime[index], dt, out=(targetTime >= sourceTime[index]).astype(float), where=dt > 0)
+        weight = np.clip(weight, 0, 1) # hold the end values outside the source span
+    index.setflags(write=False)
+    weight.setflags(write=False)
+    return index, weight
+
+
+def interp_table(sourceTime, targetTime):
+    """
+    Interval index and weight of each target time in the source time base, so that
+    x[index] + weight*(x[index+1] - x[index]) interpolates x onto the target times. Tables
+    are cached by the contents of the time arrays, so a time base which is reused is only
+    searched once.
+
+    Input:
+        - sourceTime, increasing source times [s]
+        - targetTime, target times [s]
+
+    Output:
+        - index, interval index of each target time (read-only)
+        - weight, interpolation weight of each target time, 0 to 1 (read-only)
+    """
+    sourceTime = np.ascontiguousarray(sourceTime, dtype=float)
+    targetTime = np.ascontiguousarray(targetTime, dtype=float)
+    return _cached_table(sourceTime.tobytes(), targetTime.tobytes())
+
+
+def resample(x, sourceTime, targetTime, cropNaN=False):
+    """
+    Linearly interpolate each channel of x from the source times onto the target times
+
+    Input:
+        - x, (channels, points) array sampled at sourceTime (a single channel may be 1-D);
+          float32 values are interpolated in float32, anything else in float64
+        - sourceTime, increasing source times [s]
+        - targetTime, target times [s]
+        - cropNaN, if True, drop the target times at which any channel is NaN
+
+    Output:
+        - y, (channels, len(targetTime)) array of interpolated values
+        - keep, boolean array of the target times kept (only if cropNaN is True)
+    """
+    x = np.asarray(x)
+    x = x.astype(np.float32 if x.dtype == np.float32 else np.float64, copy=False)
+    index, weight = interp_table(sourceTime, targetTime)
+    weight = weight.astype(x.dtype, copy=False)
+    lower = x[..., index]
+    if x.shape[-1] < 2:
+        y = lower
+    else:
+        y = lower + weight * (x[..., index+1] - lower)
+    if not cropNaN:
+        return y
+    keep = ~np.isnan(y.reshape(-1, y.shape[-1])).any(axis=0)
+    if keep.all():
+        return y, keep
+    return y[..., keep], keep
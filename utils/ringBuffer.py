@@ -0,0 +1,112 @@
+"""
+Author: @jacobrdavis
+
+Single-producer, single-consumer ring buffer of fixed-size records in shared memory, used to
+pass sensor samples from an acquisition process to the main process without pickling or
+blocking the producer. Records are stored in a NumPy structured array backed by
+multiprocessing.shared_memory (Python 3.8+) or, on older Pythons, a multiprocessing RawArray.
+
+The producer never blocks: if the consumer falls more than a buffer length behind, the oldest
+records are overwritten and reported as dropped by the consumer. When the buffer is full, the
+oldest record shares its slot with the record being written and is dropped as well.
+
+Contents:
+    - SharedRingBuffer(dtype, capacity)
+
+Log:
+    - Oct 2026: created ringBuffer.py for process-isolated acquisition
+    - Oct 2026: get() also discards the slot being written when the buffer is full
+"""
+#--Import Statements
+import numpy as np
+from multiprocessing import Lock, RawArray
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python < 3.8
+    shared_memory = None
+
+class SharedRingBuffer:
+    """
+    Ring buffer of capacity records of the given NumPy dtype in shared memory. Create it in the
+    parent process and pass it to the producer process as an argument.
+
+        ring = SharedRingBuffer(IMU_DTYPE, 4096)
+        ring.put((timestamp, accel_raw, mag_raw, gyro_raw))  # producer
+        records, dropped = ring.get()                        # consumer
+    """
+    def __init__(self, dtype, capacity):
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        nbytes = self.dtype.itemsize*capacity
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._raw = None
+        else:
+            self._shm = None
+            self._raw = RawArray('B', nbytes)
+        self._owner = True
+        # number of records written (producer) and read (consumer)
+        self._counters = RawArray('q', 2)
+        self._lock = Lock()
+        self._attach()
+
+    def _attach(self):
+        buffer = self._shm.buf if self._shm is not None else self._raw
+        self._records = np.ndarray(self.capacity, dtype=self.dtype, buffer=buffer)
+
+    def __getstate__(self):
+        # the record view is rebuilt after unpickling; shared memory is re-attached by name
+        state = self.__dict__.copy()
+        del state['_records']
+        if self._shm is not None:
+            state['_shm'] = self._shm.name
+        state['_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self._shm, str):
+            self._shm = shared_memory.SharedMemory(name=self._shm)
+        self._attach()
+
+    def put(self, record):
+        """
+        Append a single record (a tuple of the dtype fields); called by the producer only
+        """
+        written = self._counters[0]
+        self._records[written % self.capacity] = record
+        with self._lock: # publish the record after it has been written
+            self._counters[0] = written + 1
+
+    def get(self):
+        """
+        Return all records written since the last call, oldest first; called by the consumer only
+
+        Output:
+            - records, array of records (a copy)
+            - dropped, number of records overwritten before they could be read
+        """
+        with self._lock:
+            written = self._counters[0]
+        read = self._counters[1]
+        start = max(read, written - self.capacity)
+        records = self._records[np.arange(start, written) % self.capacity]
+
+        # records the producer may have overwritten while they were copied are discarded, including
+        # the slot it may be writing now (record writtenAfter, in the slot of writtenAfter - capacity)
+        with self._lock:
+            writtenAfter = self._counters[0]
+        overwritten = max(0, writtenAfter + 1 - self.capacity - start)
+        records = records[overwritten:]
+        self._counters[1] = written
+        return records, (start - read) + min(overwritten, written - start)
+
+    def close(self):
+        """
+        Release the shared memory; the creating process also frees it
+        """
+        self._records = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
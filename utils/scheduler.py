@@ -0,0 +1,144 @@
+"""
+Author: @jacobrdavis
+
+Burst scheduler. Burst windows start burst_time + k*burst_interval minutes past each hour and
+last burst_seconds; rather than polling the clock once per second, the scheduler computes the
+next window and sleeps until it starts.
+
+Sleeps are capped at maxSleep seconds. On each wake the window is recomputed from the clock,
+so a change of the system time (recordGPS sets it from the GPS with date -s) delays the start
+of a burst by at most maxSleep; jumps are detected by comparing the wall clock with the
+monotonic clock and logged. The clock, monotonic clock, and sleep function can be replaced
+(e.g. by a simulated clock) to test the schedule.
+
+Contents:
+    - BurstWindow(start, end, minute)
+    - BurstScheduler(burst_time, burst_interval, burst_seconds, clock, monotonic, sleep, maxSleep, jumpTolerance) [main]
+
+Log:
+    - Oct 2026: created scheduler.py to replace the 1 Hz polling loop in microSWIFT.py
+"""
+#--Import Statements
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from logging import getLogger
+
+#--helper functions:
+class BurstWindow(namedtuple('BurstWindow', ['start', 'end', 'minute'])):
+    """
+    One burst window: start and end (UTC datetimes) and the start as minutes past the hour
+    """
+    @property
+    def end_time(self):
+        """ end of the window as minutes past the hour, as passed to recordGPS and recordIMU """
+        return self.minute + (self.end - self.start).total_seconds()/60
+
+
+class BurstScheduler:
+    """
+    Schedule of burst windows:
+
+        scheduler = BurstScheduler(burst_time, burst_interval, burst_seconds)
+        window = scheduler.wait()      # sleeps until a window is open; returns it
+        record(window.end_time)
+
+    Input:
+        - burst_time, minute of the hour on which the first burst starts
+        - burst_interval, minutes between burst starts (a divisor of 60)
+        - burst_seconds, burst length [s]
+        - clock, function returning the current UTC time as a datetime
+        - monotonic, function returning a monotonic time [s]
+        - sleep, function sleeping for a number of seconds
+        - maxSleep, longest single sleep [s]
+        - jumpTolerance, difference between wall and monotonic clock time over one sleep which
+          is reported as a clock jump [s]
+    """
+    def __init__(self, burst_time, burst_interval, burst_seconds, clock=datetime.utcnow,
+                 monotonic=time.monotonic, sleep=time.sleep, maxSleep=600, jumpTolerance=2):
+        self.burst_time = burst_time
+        self.burst_interval = burst_interval
+        self.burst_seconds = burst_seconds
+        self.clock = clock
+        self.monotonic = monotonic
+        self.sleep = sleep
+        self.maxSleep = maxSleep
+        self.jumpTolerance = jumpTolerance
+        self.minutes = [burst_time + i*burst_interval for i in range(int(60/burst_interval))]
+        self.wakeups = 0 # number of sleeps so far
+        self.jumps = 0   # number of clock jumps detected
+
+    def window(self, now=None):
+        """
+        The burst window which is open at now, or the next one to open
+
+        Input:
+            - now, UTC datetime (default: the current time)
+
+        Output:
+            - BurstWindow
+        """
+        if now is None:
+            now = self.clock()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        for hourStart in [hour - timedelta(hours=1), hour, hour + timedelta(hours=1)]:
+            for minute in self.minutes:
+                start = hourStart + timedelta(minutes=minute)
+                end = start + timedelta(seconds=self.burst_seconds)
+                if now < end:
+                    return BurstWindow(start, end, minute)
+        return self.window(hour + timedelta(hours=2)) # unreachable for burst_seconds <= 1 hour
+
+    def schedule(self, start, end):
+        """
+        All burst windows which open between two times
+
+        Input:
+            - start, end, UTC datetimes
+
+        Output:
+            - list of BurstWindow
+        """
+        windows = []
+        window = self.window(start)
+        while window.start < end:
+            if window.start >= start:
+                windows.append(window)
+            window = self.window(window.end)
+        return windows
+
+    def wait(self, onWake=None):
+        """
+        Sleep until a burst window is open
+
+        Input:
+            - onWake, function called after each sleep (e.g. to check on background work)
+
+        Output:
+            - window, the open BurstWindow
+        """
+        logger = getLogger('microSWIFT.'+__name__)
+        window = self.window()
+        logger.info(f'Next burst window: {window.start:%d%b%Y %H:%M:%S} to {window.end:%H:%M:%S} UTC')
+        while True:
+            now = self.clock()
+            if window.start <= now < window.end:
+                return window
+            if now >= window.end: # the clock jumped past the window
+                window = self.window(now)
+                logger.info(f'Next burst window: {window.start:%d%b%Y %H:%M:%S} to {window.end:%H:%M:%S} UTC')
+                continue
+
+            seconds = min((window.start - now).total_seconds(), self.maxSleep)
+            before = self.monotonic()
+            self.sleep(seconds)
+            self.wakeups += 1
+            elapsed = self.monotonic() - before
+            jump = (self.clock() - now).total_seconds() - elapsed
+            if abs(jump) > self.jumpTolerance:
+                self.jumps += 1
+                logger.info(f'System clock jumped by {jump:.1f} s; rescheduling')
+                window = self.window()
+                logger.info(f'Next burst window: {window.start:%d%b%Y %H:%M:%S} to {window.end:%H:%M:%S} UTC')
+            if onWake is not None:
+                onWake()
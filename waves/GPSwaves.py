@@ -1,4 +1,4 @@
-def GPSwaves(u, v, z, fs): 
+def GPSwaves(u, v, z, fs, dtype='float64'): 
     """
     Author: @edwinrainville
 
@@ -10,6 +10,7 @@ def GPSwaves(u, v, z, fs):
     v : 'y' direction velocity from GPS sensor
     z : Vertical elevation values from 
     fs : frequency
+    dtype : processing precision, 'float64' or 'float32' (float32/complex64 spectra)
 
 
     Returns
@@ -28,28 +29,26 @@ def GPSwaves(u, v, z, fs):
 
     # Packages
     import numpy as np
-    # import scipy.signal as signal
-    import numpy.fft as fft
     from logging import getLogger
+    from waves.spectralCore import despike, demean, filter_length, highpass, welch
 
     # Set up module level logger
     logger = getLogger('microSWIFT.'+__name__) 
     logger.info('---------------GPSwaves.py------------------')
 
-    # Define demean function
-    def demean(x):
-        x_demean = x - np.mean(x)
-        return x_demean
-
     # ------------------- Convert Inputs to Numpy Arrays ------
-    u = np.squeeze(u)
-    v = np.squeeze(v)
-    z = np.squeeze(z)
+    u = np.ravel(np.array(u, dtype=dtype))
+    v = np.ravel(np.array(v, dtype=dtype))
+    z = np.ravel(np.array(z, dtype=dtype))
 
     # ---------------------- Tunable Parameters --------------
     # Standard deviations for despiking
     Nstd = 10
 
+    # Despike until no new spikes are found; use median/MAD rather than mean/std thresholds
+    despikeIterate = False
+    despikeRobust = False
+
     # Time constant [s] for high-pass filter
     RC = 3.5
 
@@ -61,28 +60,20 @@ def GPSwaves(u, v, z, fs):
     # ---------- Variable input data, priority for GPS velocity -----------
     # if no vertical, assign a dummy but tthen void a1 and a2 results later
     if not z.any(): 
-        z = np.zeros(u.shape)
+        z = np.zeros(u.shape, dtype=u.dtype)
         zdummy = 1
     else:
         zdummy = 0
 
 
     # ----------------- Quality Control and Despiking --------
-    # Find Spike values
-    # badu = np.abs(signal.detrend(u)) >= Nstd * np.std(u)
-    # badv = np.abs(signal.detrend(v)) >= Nstd * np.std(v)
-    # badz = np.abs(signal.detrend(z)) >= Nstd * np.std(z)
-    badu = np.abs(demean(u)) >= Nstd * np.std(u)
-    badv = np.abs(demean(v)) >= Nstd * np.std(v)
-    badz = np.abs(demean(z)) >= Nstd * np.std(z)
-    # Replace Spike values with average of non-spiked series
-    u[badu] = np.mean( u[~badu] )
-    v[badv] = np.mean( v[~badv] )
-    z[badz] = np.mean( z[~badz] )
+    # Replace Spike values with average of non-spiked series (channels u, v, z)
+    x, bad = despike(np.vstack([u, v, z]), Nstd, iterate=despikeIterate, robust=despikeRobust)
+    badu, badv = bad[0], bad[1]
 
     # ----------------- Begin Processing ----------------------
-    num_points = u.shape[0] # number of points
-    if ( (num_points >= fs*wsecs ) and (fs >= 1 ) and ( np.sum(badu) < 100 ) and (np.sum(badv) < 100) ):
+    num_points = x.shape[1] # number of points
+    if ( (num_points >= fs*wsecs ) and (fs >= 1 ) and ( badu < 100 ) and (badv < 100) ):
         logger.info('Data is Sufficient for Processing - Processing Start')
     else:
         logger.info('Data is NOT Sufficient for Processing - Program Exit')
@@ -103,130 +94,53 @@ def GPSwaves(u, v, z, fs):
         return Hs, Tp, Dp, E, f, a1, b1, a2, b2, check
 
     # --------------- Detrend and High Pass Filter -------------
-    u = demean(u)
-    v = demean(v)
-    z = demean(z)
+    x = demean(x)
 
     # New High-pass filter - from https://tomroelandts.com/articles/how-to-create-a-simple-high-pass-filter
     ## https://fiiir.com/
-
-    # Configuration.
-    fS = fs  # Sampling rate.
     fH = 0.05  # Cutoff frequency.
-    N = 207 # Filter length, must be odd.
+    N = filter_length(fs) # Filter length, must be odd (207 up to 12 Hz, longer above to keep the transition band)
+    logger.info(f'High-pass filter: fH={fH}; N={N}')
+    x = highpass(x, fs, fH, N)
+
+    # ------- Windowed, Tapered Auto- and Cross-Spectra ---------
+    # Windows have 75% overlap; each is demeaned, tapered, and rescaled to preserve variance,
+    # then the spectra of each channel pair are merged over neighboring frequency bands and
+    # ensemble averaged over windows (see waves/spectralCore.py)
+    S, win, windows = welch(x, fs, wsecs, merge)
+    dof = 2 * windows * merge   # Degrees of Freedom
 
-    # Compute sinc filter.
-    h = np.sinc(2 * fH / fS * (np.arange(N) - (N - 1) / 2))
+    return GPSmoments(S, fs, win, wsecs, merge, maxf, zdummy)
 
-    # Apply window.
-    h *= np.hamming(N)
 
-    # Normalize to get unity gain.
-    h /= np.sum(h)
+def GPSmoments(S, fs, win, wsecs=256, merge=3, maxf=0.5, zdummy=0):
+    """
+    Scalar energy, directional moments, and bulk parameters from the merged, ensemble-averaged
+    auto- and cross-spectra of u, v, and z (shared by GPSwaves and GPSwavesEstimator)
 
-    # Create a high-pass filter from the low-pass filter through spectral inversion.
-    h = -h
-    h[(N - 1) // 2] += 1
+    Parameters
+    -----
+    S      : (3, 3, bands) complex auto- and cross-spectra of u, v, and z (modified)
+    fs     : sampling frequency [Hz]
+    win    : window length [points]
+    wsecs  : window length [s]
+    merge  : number of frequency bands merged
+    maxf   : frequency cutoff for telemetry [Hz]
+    zdummy : 1 if there was no vertical data (z set to zero)
 
-    # Filter Each signal
-    u = np.convolve(u, h)
-    v = np.convolve(v, h)
-    z = np.convolve(z, h)
+    Returns
+    ------
+    Hs, Tp, Dp, E, f, a1, b1, a2, b2, check (see GPSwaves)
+    """
+    # Packages
+    import numpy as np
+    from logging import getLogger
 
-    # ---------------- Break Data into Windows ------------------
-    # Windows have 75% Overlap 
-    win = int(np.round(fs * wsecs))  # Window length in points
-    if (np.mod(win, 2) != 0):
-        win = int(win - 1) # make the window an even number
-    windows = int(np.floor( 4*(num_points/win - 1 ) + 1)) # number of windows, 4 is from 75% overlap
-    dof = 2 * windows * merge   # Degrees of Freedom
-    # Create matrix where each column is a window
-    uwindow = np.zeros((win,windows))
-    vwindow = np.zeros((win,windows))
-    zwindow = np.zeros((win,windows))
-    for n in np.arange(windows):
-        ind_low = int((n)*(0.25*win))
-        ind_high = int((n)*(0.25*win)+win)
-        uwindow[:,n] = u[ind_low : ind_high]
-        vwindow[:,n] = v[ind_low : ind_high]
-        zwindow[:,n] = z[ind_low : ind_high]
-
-    # Detrend Individual Windows (full series is already detrended)
-    for n in np.arange(windows):
-        # uwindow[:,n] = signal.detrend(uwindow[:,n])
-        # vwindow[:,n] = signal.detrend(vwindow[:,n])
-        # zwindow[:,n] = signal.detrend(zwindow[:,n])
-        uwindow[:,n] = demean(uwindow[:,n])
-        vwindow[:,n] = demean(vwindow[:,n])
-        zwindow[:,n] = demean(zwindow[:,n])
-
-    # Taper and Resceale Data to Preserve Variance
-    taper = np.repeat(np.reshape(np.sin(np.arange(1,win+1) * np.pi/(win+1)), (win, 1)), windows, axis=1)
-    # taper each window
-    uwindowtaper = uwindow * taper
-    vwindowtaper = vwindow * taper
-    zwindowtaper = zwindow * taper
-    # Compute Correction Factor (Compare old to new)
-    factu = np.sqrt( np.var(uwindow, axis=0, ddof=1) / np.var(uwindowtaper, axis=0, ddof=1) )
-    factv = np.sqrt( np.var(vwindow, axis=0, ddof=1) / np.var(vwindowtaper, axis=0, ddof=1) )
-    factz = np.sqrt( np.var(zwindow, axis=0, ddof=1) / np.var(zwindowtaper, axis=0, ddof=1) )
-    # Correct for the change in variance (multiply each window by its varince factor)
-    uwindowready = np.repeat(np.reshape(factu, (1, factu.shape[0])), win, axis=0) * uwindowtaper
-    vwindowready = np.repeat(np.reshape(factv, (1, factv.shape[0])), win, axis=0) * vwindowtaper
-    zwindowready = np.repeat(np.reshape(factz, (1, factz.shape[0])), win, axis=0) * zwindowtaper
-    
-    # ---------------- FFT ------------------
-    # Calculate Fourer Coefficients
-    #**** Note: this FFT funcion is slightly different than the MATLAB version 
-    # and results in deviations around the thousands decimal
-    Uwindow_temp = fft.fft(uwindowready, axis=0)
-    Vwindow_temp = fft.fft(vwindowready, axis=0)
-    Zwindow_temp = fft.fft(zwindowready, axis=0)
-   
-    # Get only one-sided spectrum values
-    Uwindow = np.delete(Uwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-    Vwindow = np.delete(Vwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-    Zwindow = np.delete(Zwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-
-    # Throw out mean and add zero to the end
-    Uwindow = np.delete(Uwindow, 0, axis=0)
-    Vwindow = np.delete(Vwindow, 0, axis=0)
-    Zwindow = np.delete(Zwindow, 0, axis=0)
-    Uwindow[-1, :] = 0
-    Vwindow[-1, :] = 0
-    Zwindow[-1, :] = 0
-   
-    # Compute Power Spectrum (auto-spectra)
-    # **** Similar values but slightly different since the fft is different
-    UUwindow = np.real(Uwindow * np.conj(Uwindow))
-    VVwindow = np.real(Vwindow * np.conj(Vwindow))
-    ZZwindow = np.real(Zwindow * np.conj(Zwindow))
-
-    # Compute Cross-Spectra
-    # ** Again pretty close but not quite the same - differentiation around thousands place again
-    UVwindow = (Uwindow * np.conj(Vwindow))
-    UZwindow = (Uwindow * np.conj(Zwindow))
-    VZwindow = (Vwindow * np.conj(Zwindow))
-   
-    # ----------- Merge Neighboring Frequency Bands -------- 
-    UUwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    VVwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    ZZwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    UVwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    UZwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    VZwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    
-    # Compute average to merge
-    # ** This results in zeros for all values - is that what we want? 
-    for n in np.arange(merge, int(win/2), merge):
-        ind_low = (n-merge)
-        ind_high = n
-        UUwindowmerged[int(n/merge)-1, :] = np.mean( UUwindow[ind_low:ind_high, :], axis=0 )
-        VVwindowmerged[int(n/merge)-1, :] = np.mean( VVwindow[ind_low:ind_high, :], axis=0 )
-        ZZwindowmerged[int(n/merge)-1, :] = np.mean( ZZwindow[ind_low:ind_high, :], axis=0 )
-        UVwindowmerged[int(n/merge)-1, :] = np.mean( UVwindow[ind_low:ind_high, :], axis=0 )
-        UZwindowmerged[int(n/merge)-1, :] = np.mean( UZwindow[ind_low:ind_high, :], axis=0 )
-        VZwindowmerged[int(n/merge)-1, :] = np.mean( VZwindow[ind_low:ind_high, :], axis=0 )
+    # Set up module level logger
+    logger = getLogger('microSWIFT.'+__name__)
+
+    # ** the last merged band is left at zero when win/2 is a multiple of merge
+    S[..., len(range(merge, int(win/2), merge)):] = 0
     
     # Define Frequnecy range and bandwidth
     n = (win/2) / merge # number of frequnecy bands
@@ -237,15 +151,9 @@ def GPSwaves(u, v, z, fs):
     f = (1/wsecs) + (bandwidth/2) + (bandwidth * np.arange(n-1)) #TODO: why is the freq only short for 12 and not 4hz?
     # f = (1/wsecs) + (bandwidth/2) + (bandwidth * np.arange(n))
 
-    # --------- Ensemble Average Windows together ----------------
-    # take average of all windows at each frequency band, divide by n*samplerate to get power 
-    # spectral density. Use factor of 2 since we are using one-sided spectrum
-    UU = np.mean( UUwindowmerged / (win/2 * fs), axis=1)
-    VV = np.mean( VVwindowmerged / (win/2 * fs), axis=1)
-    ZZ = np.mean( ZZwindowmerged / (win/2 * fs), axis=1)
-    UV = np.mean( UVwindowmerged / (win/2 * fs), axis=1)
-    UZ = np.mean( UZwindowmerged / (win/2 * fs), axis=1)
-    VZ = np.mean( VZwindowmerged / (win/2 * fs), axis=1)
+    # --------- Auto- and Cross-Spectra ----------------
+    UU, VV, ZZ = np.real(S[0, 0]), np.real(S[1, 1]), np.real(S[2, 2])
+    UV, UZ, VZ = S[0, 1], S[0, 2], S[1, 2]
 
     # Convert to displacement spectra (from velocity and heave)
     # Assume perfectly circular deepwater orbits - could be extended to finite depth by 
@@ -359,3 +267,73 @@ def GPSwaves(u, v, z, fs):
 
     # Return values
     return Hs, Tp, Dp, E, f, a1, b1, a2, b2, check
+
+
+class GPSwavesEstimator:
+    """
+    Author: @jacobrdavis
+
+    Incremental version of GPSwaves: GPS velocities and elevations are added as they arrive
+    and each 256 s window is processed as soon as it is complete (see waves/streamingWelch.py),
+    so only running sums of the auto- and cross-spectra are kept. finalize() returns the same
+    outputs as GPSwaves on the samples so far (identical when no samples are despiked) and may
+    be called at any time for a provisional estimate.
+
+        estimator = GPSwavesEstimator(fs)
+        estimator.update(u, v, z)      # any number of samples, repeatedly
+        Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = estimator.finalize()
+
+    Parameters
+    -----
+    fs : sampling frequency [Hz]
+    """
+    wsecs = 256 # window length in seconds
+    merge = 3   # Frequency bands to merge
+    maxf = 0.5  # Frequency cutoff for telemetry, Hz
+    Nstd = 10   # Standard deviations for despiking
+
+    def __init__(self, fs):
+        from waves.streamingWelch import StreamingWelch
+        self.fs = fs
+        self.welch = StreamingWelch(fs, 3, wsecs=self.wsecs, merge=self.merge, Nstd=self.Nstd)
+        self.zdummy = 1 # until a non-zero elevation is received, as in GPSwaves
+
+    @property
+    def windows(self):
+        """ number of complete windows received so far """
+        return self.welch.completed
+
+    def update(self, u, v, z):
+        """
+        Add samples of u, v, and z (equal lengths)
+        """
+        import numpy as np
+        z = np.ravel(z)
+        if self.zdummy and z.any():
+            self.zdummy = 0
+        self.welch.update(np.vstack([np.ravel(u), np.ravel(v), z]))
+
+    def finalize(self):
+        """
+        Compute the wave spectra and bulk parameters from the samples so far; the estimator can
+        continue to be updated afterwards
+
+        Returns
+        ------
+        Hs, Tp, Dp, E, f, a1, b1, a2, b2, check (see GPSwaves)
+        """
+        import numpy as np
+        from logging import getLogger
+
+        logger = getLogger('microSWIFT.'+__name__)
+        logger.info('---------------GPSwavesEstimator------------------')
+        welch = self.welch
+        num_points = welch.num_points
+        badu, badv = welch.bad[0], welch.bad[1]
+        logger.info(f'num points: {num_points}; fs*wsecs: {self.fs*self.wsecs}; sum(badu): {badu}; sum(badv): {badv}')
+
+        if not ( (num_points >= self.fs*self.wsecs ) and (self.fs >= 1 ) and ( badu < 100 ) and (badv < 100) ):
+            logger.info('Data is NOT Sufficient for Processing - Program Exit')
+            return (999, 999, 999) + tuple(999 * np.ones((7, 42)))
+
+        return GPSmoments(welch.spectra(), self.fs, welch.win, self.wsecs, self.merge, self.maxf, self.zdummy)
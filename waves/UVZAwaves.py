@@ -1,4 +1,4 @@
-def UVZAwaves(u, v, z, a, fs): 
+def UVZAwaves(u, v, z, a, fs, dtype='float64'): 
     """
     Author: @jacobrdavis
 
@@ -14,6 +14,7 @@ def UVZAwaves(u, v, z, a, fs):
     z  : IMU-based heave estimate (+up) [m]
     a  : raw vertical acceleration values from IMU [m/s^2] (+up)
     fs : sampling frequency [Hz]
+    dtype : processing precision, 'float64' or 'float32' (float32/complex64 spectra)
 
     Returns
     ------
@@ -38,29 +39,25 @@ def UVZAwaves(u, v, z, a, fs):
 
     # Packages
     import numpy as np
-    # import scipy.signal as signal
-    import numpy.fft as fft
     from logging import getLogger
+    from waves.spectralCore import despike, demean, filter_length, highpass, welch
 
     # Set up module level logger
     logger = getLogger('microSWIFT.'+__name__) 
     logger.info('---------------UVZAwaves.py------------------')
 
-    # Define demean function
-    def demean(x):
-        x_demean = x - np.mean(x)
-        return x_demean
-    
     # ------------------- Convert Inputs to Numpy Arrays ------
-    u = np.squeeze(u)
-    v = np.squeeze(v)
-    z = np.squeeze(z)
-    a = np.squeeze(a)
+    # stack as channels u, v, z, a
+    x = np.array([np.ravel(u), np.ravel(v), np.ravel(z), np.ravel(a)], dtype=dtype)
 
     # ---------------------- Tunable Parameters --------------
     # Standard deviations for despiking
     Nstd = 10
 
+    # Despike until no new spikes are found; use median/MAD rather than mean/std thresholds
+    despikeIterate = False
+    despikeRobust = False
+
     # Time constant [s] for high-pass filter
     RC = 3.5
 
@@ -70,40 +67,29 @@ def UVZAwaves(u, v, z, a, fs):
     maxf = 0.5  # Frequency cutoff for telemetry, Hz
 
     # report settigns to log
-    #TODO: log filter?
-    logger.info(f'Processing settings: fs={fs}; wsecs={wsecs}; merge={merge}; maxf={maxf}')
+    logger.info(f'Processing settings: fs={fs}; wsecs={wsecs}; merge={merge}; maxf={maxf}; dtype={x.dtype}')
 
     # ----------------- Quality Control and Despiking --------
     logger.info('Quality control')
-    # Find Spike values
-    # badu = np.abs(signal.detrend(u)) >= Nstd * np.std(u)
-    # badv = np.abs(signal.detrend(v)) >= Nstd * np.std(v)
-    # badz = np.abs(signal.detrend(z)) >= Nstd * np.std(z)
-    badu = np.abs(demean(u)) >= Nstd * np.std(u)
-    badv = np.abs(demean(v)) >= Nstd * np.std(v)
-    badz = np.abs(demean(z)) >= Nstd * np.std(z)
-    bada = np.abs(demean(a)) >= Nstd * np.std(a)
     # Replace Spike values with average of non-spiked series
-    u[badu] = np.mean( u[~badu] )
-    v[badv] = np.mean( v[~badv] )
-    z[badz] = np.mean( z[~badz] )
-    a[bada] = np.mean( a[~bada] )
+    x, bad = despike(x, Nstd, iterate=despikeIterate, robust=despikeRobust)
+    badu, badv = bad[0], bad[1]
 
     # ----------------- Begin Processing ----------------------
-    num_points = u.shape[0] # = len(u)
+    num_points = x.shape[1] # = len(u)
 
-    if ( (num_points >= fs*wsecs ) and (fs >= 1 ) and ( np.sum(badu) < 100 ) and (np.sum(badv) < 100) ):
+    if ( (num_points >= fs*wsecs ) and (fs >= 1 ) and ( badu < 100 ) and (badv < 100) ):
         logger.info('Data is Sufficient for Processing - Processing Start')
         logger.info(f'num points: {num_points}')
         logger.info(f'fs*wsecs: {fs*wsecs}')
-        logger.info(f'sum(badu): {np.sum(badu)}')
-        logger.info(f'sum(badv): {np.sum(badv)}')
+        logger.info(f'sum(badu): {badu}')
+        logger.info(f'sum(badv): {badv}')
     else:
         logger.info('Data is NOT Sufficient for Processing - Program Exit')
         logger.info(f'num points: {num_points}')
         logger.info(f'fs*wsecs: {fs*wsecs}')
-        logger.info(f'sum(badu): {np.sum(badu)}')
-        logger.info(f'sum(badv): {np.sum(badv)}')
+        logger.info(f'sum(badu): {badu}')
+        logger.info(f'sum(badv): {badv}')
         Hs = 999
         Tp = 999
         Dp = 999
@@ -122,151 +108,55 @@ def UVZAwaves(u, v, z, a, fs):
 
     # --------------- Detrend and High Pass Filter -------------
     logger.info('Detrending')
-    u = demean(u)
-    v = demean(v)
-    z = demean(z)
-    a = demean(a)
+    x = demean(x)
     
-    #TODO: update filter: does NOT work for 48hz
-
     # New High-pass filter - from https://tomroelandts.com/articles/how-to-create-a-simple-high-pass-filter
     ## https://fiiir.com/
-
-    # Configuration.
-    fS = fs  # Sampling rate.
     fH = 0.05  # Cutoff frequency.
-    N = 207 # Filter length, must be odd.
-
-    # Compute sinc filter.
-    h = np.sinc(2 * fH / fS * (np.arange(N) - (N - 1) / 2))
-
-    # Apply window.
-    h *= np.hamming(N)
-
-    # Normalize to get unity gain.
-    h /= np.sum(h)
-
-    # Create a high-pass filter from the low-pass filter through spectral inversion.
-    h = -h
-    h[(N - 1) // 2] += 1
-
-    # Filter Each signal
-    u = np.convolve(u, h)
-    v = np.convolve(v, h)
-    z = np.convolve(z, h)
-    a = np.convolve(a, h)
-
-    # ---------------- Break Data into Windows ------------------
-    logger.info('Windowing')
-    # Windows have 75% Overlap 
-    win = int(np.round(fs * wsecs))  # Window length in points
-    if (np.mod(win, 2) != 0):
-        win = int(win - 1) # make the window an even number
-    windows = int(np.floor( 4*(num_points/win - 1 ) + 1)) # number of windows, 4 is from 75% overlap
-    dof = 2 * windows * merge   # Degrees of Freedom
-    # Create matrix where each column is a window
-    uwindow = np.zeros((win,windows))
-    vwindow = np.zeros((win,windows))
-    zwindow = np.zeros((win,windows))
-    awindow = np.zeros((win,windows))
-    for n in np.arange(windows):
-        ind_low = int((n)*(0.25*win))
-        ind_high = int((n)*(0.25*win)+win)
-        uwindow[:,n] = u[ind_low : ind_high]
-        vwindow[:,n] = v[ind_low : ind_high]
-        zwindow[:,n] = z[ind_low : ind_high]
-        awindow[:,n] = a[ind_low : ind_high]
-
-    # Detrend Individual Windows (full series is already detrended)
-    for n in np.arange(windows):
-        # uwindow[:,n] = signal.detrend(uwindow[:,n])
-        # vwindow[:,n] = signal.detrend(vwindow[:,n])
-        # zwindow[:,n] = signal.detrend(zwindow[:,n])
-        uwindow[:,n] = demean(uwindow[:,n])
-        vwindow[:,n] = demean(vwindow[:,n])
-        zwindow[:,n] = demean(zwindow[:,n])
-        awindow[:,n] = demean(awindow[:,n])
-
-    # Taper and Resceale Data to Preserve Variance
-    taper = np.repeat(np.reshape(np.sin(np.arange(1,win+1) * np.pi/(win+1)), (win, 1)), windows, axis=1)
-    # taper each window
-    uwindowtaper = uwindow * taper
-    vwindowtaper = vwindow * taper
-    zwindowtaper = zwindow * taper
-    awindowtaper = awindow * taper
-
-    # Compute Correction Factor (Compare old to new)
-    factu = np.sqrt( np.var(uwindow, axis=0, ddof=1) / np.var(uwindowtaper, axis=0, ddof=1) )
-    factv = np.sqrt( np.var(vwindow, axis=0, ddof=1) / np.var(vwindowtaper, axis=0, ddof=1) )
-    factz = np.sqrt( np.var(zwindow, axis=0, ddof=1) / np.var(zwindowtaper, axis=0, ddof=1) )
-    facta = np.sqrt( np.var(awindow, axis=0, ddof=1) / np.var(awindowtaper, axis=0, ddof=1) )
-
-    # Correct for the change in variance (multiply each window by its varince factor)
-    uwindowready = np.repeat(np.reshape(factu, (1, factu.shape[0])), win, axis=0) * uwindowtaper
-    vwindowready = np.repeat(np.reshape(factv, (1, factv.shape[0])), win, axis=0) * vwindowtaper
-    zwindowready = np.repeat(np.reshape(factz, (1, factz.shape[0])), win, axis=0) * zwindowtaper
-    awindowready = np.repeat(np.reshape(factz, (1, facta.shape[0])), win, axis=0) * awindowtaper
-
-    logger.info('Performing FFT on windows')
-    # ---------------- FFT ------------------
-    # Calculate Fourer Coefficients
-    #**** Note: this FFT funcion is slightly different than the MATLAB version 
-    # and results in deviations around the thousands decimal
-    Uwindow_temp = fft.fft(uwindowready, axis=0)
-    Vwindow_temp = fft.fft(vwindowready, axis=0)
-    Zwindow_temp = fft.fft(zwindowready, axis=0)
-    Awindow_temp = fft.fft(awindowready, axis=0)
-
-    # Get only one-sided spectrum values
-    Uwindow = np.delete(Uwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-    Vwindow = np.delete(Vwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-    Zwindow = np.delete(Zwindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-    Awindow = np.delete(Awindow_temp, np.arange((int(win/2) + 1), win), axis=0)
-
-    # Throw out mean and add zero to the end
-    Uwindow = np.delete(Uwindow, 0, axis=0)
-    Vwindow = np.delete(Vwindow, 0, axis=0)
-    Zwindow = np.delete(Zwindow, 0, axis=0)
-    Awindow = np.delete(Awindow, 0, axis=0)
-    Uwindow[-1, :] = 0
-    Vwindow[-1, :] = 0
-    Zwindow[-1, :] = 0
-    Awindow[-1, :] = 0
-    
+    N = filter_length(fs) # Filter length, must be odd (207 up to 12 Hz, longer above to keep the transition band)
+    logger.info(f'High-pass filter: fH={fH}; N={N}')
+    x = highpass(x, fs, fH, N)
+
+    # ------- Windowed, Tapered Auto- and Cross-Spectra ---------
+    # Windows have 75% overlap; each is demeaned, tapered, and rescaled to preserve variance
+    # (NOTE: the 'a' windows are rescaled with the correction factor of 'z'), then the
+    # spectra of each channel pair are merged over neighboring frequency bands and ensemble
+    # averaged over windows (see waves/spectralCore.py)
     logger.info('Computing auto- and cross-spectra')
-    # Compute auto-spectra
-    UUwindow = np.real(Uwindow * np.conj(Uwindow))
-    VVwindow = np.real(Vwindow * np.conj(Vwindow))
-    ZZwindow = np.real(Zwindow * np.conj(Zwindow))
-    AAwindow = np.real(Awindow * np.conj(Awindow))
-
-    # Compute cross-spectra
-    UVwindow = (Uwindow * np.conj(Vwindow))
-    UAwindow = (Uwindow * np.conj(Awindow))
-    VAwindow = (Vwindow * np.conj(Awindow))
-   
-    logger.info('Merging frequency bands')
-    # ----------- Merge Neighboring Frequency Bands -------- 
-    UUwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    VVwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    ZZwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    AAwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows))
-    UVwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    UAwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    VAwindowmerged = np.zeros((int(np.floor(win/(2*merge))), windows), complex)
-    
-    # Compute average to merge
-    # ** This results in zeros for all values - is that what we want? 
-    for n in np.arange(merge, int(win/2)+1, merge): #TODO: added +1 to cover entire window... validate! This prevents divide by zero erros
-        ind_low = (n-merge)
-        ind_high = n
-        UUwindowmerged[int(n/merge)-1, :] = np.mean( UUwindow[ind_low:ind_high, :], axis=0 )
-        VVwindowmerged[int(n/merge)-1, :] = np.mean( VVwindow[ind_low:ind_high, :], axis=0 )
-        ZZwindowmerged[int(n/merge)-1, :] = np.mean( ZZwindow[ind_low:ind_high, :], axis=0 )
-        AAwindowmerged[int(n/merge)-1, :] = np.mean( AAwindow[ind_low:ind_high, :], axis=0 )
-        UVwindowmerged[int(n/merge)-1, :] = np.mean( UVwindow[ind_low:ind_high, :], axis=0 )
-        UAwindowmerged[int(n/merge)-1, :] = np.mean( UAwindow[ind_low:ind_high, :], axis=0 )
-        VAwindowmerged[int(n/merge)-1, :] = np.mean( VAwindow[ind_low:ind_high, :], axis=0 )
+    S, win, windows = welch(x, fs, wsecs, merge, factorFrom=[0, 1, 2, 2])
+    dof = 2 * windows * merge   # Degrees of Freedom
+    UU, VV, ZZ, AA = np.real(S[0, 0]), np.real(S[1, 1]), np.real(S[2, 2]), np.real(S[3, 3])
+    UV, UA, VA = S[0, 1], S[0, 3], S[1, 3]
+
+    # ------------------ Spectral results -----------------------
+    return UVZAmoments(UU, VV, ZZ, AA, UV, UA, VA, fs, win, wsecs, merge, maxf)
+
+
+def UVZAmoments(UU, VV, ZZ, AA, UV, UA, VA, fs, win, wsecs=256, merge=3, maxf=0.5):
+    """
+    Scalar energy, directional moments, and bulk parameters from the merged, ensemble-averaged
+    auto- and cross-spectra of UVZAwaves (shared by UVZAwaves and UVZAwavesEstimator)
+
+    Parameters
+    -----
+    UU, VV, ZZ, AA : auto-spectra of u, v, z, and a
+    UV, UA, VA     : cross-spectra
+    fs    : sampling frequency [Hz]
+    win   : window length [points]
+    wsecs : window length [s]
+    merge : number of frequency bands merged
+    maxf  : frequency cutoff for telemetry [Hz]
+
+    Returns
+    ------
+    Hs, Tp, Dp, E, f, a1, b1, a2, b2, check (see UVZAwaves)
+    """
+    # Packages
+    import numpy as np
+    from logging import getLogger
+
+    # Set up module level logger
+    logger = getLogger('microSWIFT.'+__name__)
 
     # Define Frequnecy range and bandwidth
     n = (win/2) / merge # number of frequnecy bands
@@ -280,19 +170,6 @@ def UVZAwaves(u, v, z, a, fs):
     #TODO: fix freq length
     # print(f[-1])
 
-    logger.info('Ensemble averaging windows')
-    # --------- Ensemble Average Windows together ----------------
-    # take average of all windows at each frequency band, divide by n*samplerate to get power 
-    # spectral density. Use factor of 2 since we are using one-sided spectrum
-    UU = np.mean( UUwindowmerged / (win/2 * fs), axis=1)
-    VV = np.mean( VVwindowmerged / (win/2 * fs), axis=1)
-    ZZ = np.mean( ZZwindowmerged / (win/2 * fs), axis=1)
-    AA = np.mean( AAwindowmerged / (win/2 * fs), axis=1)
-    UV = np.mean( UVwindowmerged / (win/2 * fs), axis=1)
-    UA = np.mean( UAwindowmerged / (win/2 * fs), axis=1)
-    VA = np.mean( VAwindowmerged / (win/2 * fs), axis=1)
-
-    # ------------------ Spectral results -----------------------
     logger.info('Computing scalar energy and directional moments')
     E   = ZZ.copy()                         # scalar spectral density [m^2/Hz]
     Exx = UU / ((2*np.pi*f)**2)             #[m^2/Hz]
@@ -384,6 +261,68 @@ def UVZAwaves(u, v, z, a, fs):
     return Hs, Tp, Dp, E, f, a1, b1, a2, b2, check
 
 
+class UVZAwavesEstimator:
+    """
+    Author: @jacobrdavis
+
+    Incremental version of UVZAwaves: samples of u, v, z, and a are added as they arrive and
+    each 256 s window is processed as soon as it is complete (see waves/streamingWelch.py), so
+    only running sums of the auto- and cross-spectra are kept. finalize() returns the same
+    outputs as UVZAwaves on the whole burst (identical when no samples are despiked).
+
+        estimator = UVZAwavesEstimator(fs)
+        estimator.update(u, v, z, a)   # any number of samples, repeatedly
+        Hs, Tp, Dp, E, f, a1, b1, a2, b2, check = estimator.finalize()
+
+    Parameters
+    -----
+    fs : sampling frequency [Hz]
+    """
+    wsecs = 256 # window length in seconds
+    merge = 3   # Frequency bands to merge
+    maxf = 0.5  # Frequency cutoff for telemetry, Hz
+    Nstd = 10   # Standard deviations for despiking
+
+    def __init__(self, fs):
+        from waves.streamingWelch import StreamingWelch
+        self.fs = fs
+        # as in UVZAwaves, the 'a' windows are rescaled with the correction factor of 'z'
+        self.welch = StreamingWelch(fs, 4, wsecs=self.wsecs, merge=self.merge, Nstd=self.Nstd, factorFrom=[0, 1, 2, 2])
+
+    def update(self, u, v, z, a):
+        """
+        Add samples of u, v, z, and a (equal lengths)
+        """
+        import numpy as np
+        self.welch.update(np.vstack([np.ravel(u), np.ravel(v), np.ravel(z), np.ravel(a)]))
+
+    def finalize(self):
+        """
+        Compute the wave spectra and bulk parameters from the samples so far; the estimator can
+        continue to be updated afterwards
+
+        Returns
+        ------
+        Hs, Tp, Dp, E, f, a1, b1, a2, b2, check (see UVZAwaves)
+        """
+        import numpy as np
+        from logging import getLogger
+
+        logger = getLogger('microSWIFT.'+__name__)
+        logger.info('---------------UVZAwavesEstimator------------------')
+        welch = self.welch
+        num_points = welch.num_points
+        badu, badv = welch.bad[0], welch.bad[1]
+        logger.info(f'num points: {num_points}; fs*wsecs: {self.fs*self.wsecs}; sum(badu): {badu}; sum(badv): {badv}')
+
+        if not ( (num_points >= self.fs*self.wsecs ) and (self.fs >= 1 ) and ( badu < 100 ) and (badv < 100) ):
+            logger.info('Data is NOT Sufficient for Processing - Program Exit')
+            return (999, 999, 999) + tuple(999 * np.ones((7, 42)))
+
+        S = welch.spectra()
+        UU, VV, ZZ, AA = np.real(S[0, 0]), np.real(S[1, 1]), np.real(S[2, 2]), np.real(S[3, 3])
+        return UVZAmoments(UU, VV, ZZ, AA, S[0, 1], S[0, 3], S[1, 3], self.fs, welch.win, self.wsecs, self.merge, self.maxf)
+
 
 
 
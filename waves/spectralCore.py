@@ -0,0 +1,363 @@
+"""
+Author: @jacobrdavis
+
+Vectorized spectral processing shared by GPSwaves, UVZAwaves, and the streaming estimator.
+Channels are stacked into a single (channels, points) array and each step operates on all
+of them at once:
+    - despiking at Nstd standard deviations (or robust median/MAD deviations), optionally
+      repeated until no new spikes are found
+    - windowed-sinc FIR high-pass filter, designed once per (fs, fH, N) and applied to all
+      channels by FFT (overlap-add) convolution
+    - 75%-overlapping windows, as a read-only strided view of the filtered series (no copy)
+    - per-window demean, taper, and variance correction by broadcasting into a preallocated
+      buffer, a block of windows at a time, so memory does not grow with burst length
+    - one-sided Fourier coefficients from rfft (scipy.fft if available, else np.fft)
+    - auto- and cross-spectra of every channel pair from a single einsum
+    - merging of neighboring frequency bands by reshape and mean
+Single precision (float32) input is processed in float32/complex64 throughout (halving memory
+and doubling the values per SIMD operation); any other input in float64/complex128.
+
+Contents:
+    - float_dtype(x)
+    - window_length(fs, wsecs)
+    - filter_length(fs, N, fsDesign)
+    - filter_design(fs, fH, N)
+    - fft_length(N)
+    - fft_convolve(x, h, H)
+    - despike(x, Nstd, iterate, robust, maxIter)
+    - demean(x)
+    - highpass(x, fs, fH, N)
+    - window_starts(num_points, win)
+    - windowed(x, win, starts)
+    - fourier_coefficients(windows, taper, factorFrom, out)
+    - cross_spectra(X)
+    - merge_bands(S, merge)
+    - welch(x, fs, wsecs, merge, factorFrom, blockBytes) [main]
+
+Log:
+    - Oct 2026: created spectralCore.py from the GPSwaves and UVZAwaves pipelines
+    - Oct 2026: cached filter design, FFT convolution, and filter length scaled with fs
+    - Oct 2026: fused despike() with iterative and median/MAD options
+    - Oct 2026: windows transformed in blocks through one preallocated buffer
+    - Oct 2026: float32 input kept in single precision (precision mode); scipy.fft if available
+"""
+#--Import Statements
+import numpy as np
+from functools import lru_cache
+try:
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError: # numpy < 1.20
+    sliding_window_view = None
+from numpy.lib.stride_tricks import as_strided
+try:
+    import scipy.fft as _fft # transforms float32 in single precision (scipy >= 1.4)
+except ImportError: # scipy is optional
+    _fft = np.fft
+
+#--helper functions:
+def float_dtype(x):
+    """
+    Working precision for x: float32 for single precision input, float64 otherwise
+    """
+    return np.dtype(np.float32) if np.asarray(x).dtype == np.float32 else np.dtype(np.float64)
+
+
+def window_length(fs, wsecs):
+    """
+    Window length in points, made even
+    """
+    win = int(np.round(fs * wsecs))
+    if (np.mod(win, 2) != 0):
+        win = int(win - 1)
+    return win
+
+
+def filter_length(fs, N=207, fsDesign=12):
+    """
+    High-pass filter length for sampling frequency fs. The transition band of a Hamming-windowed
+    sinc filter is about 3.3*fs/N wide [Hz], so the N-point filter designed for fsDesign is
+    lengthened in proportion to fs above fsDesign (e.g. 829 points at 48 Hz) to keep the same
+    transition band; at and below fsDesign N is used as is.
+
+    Output:
+        - filter length (odd)
+    """
+    if fs <= fsDesign:
+        return N
+    return 2 * int(np.ceil((N * fs / fsDesign - 1) / 2)) + 1
+
+
+@lru_cache(maxsize=16)
+def filter_design(fs, fH=0.05, N=207):
+    """
+    Windowed-sinc high-pass filter: spectral inversion of a Hamming-windowed sinc low-pass
+    filter with unity gain (from https://tomroelandts.com/articles/how-to-create-a-simple-high-pass-filter).
+    Designs are cached by (fs, fH, N); the returned array is read-only.
+
+    Input:
+        - fs, sampling frequency [Hz]
+        - fH, cutoff frequency [Hz]
+        - N, filter length, must be odd
+
+    Output:
+        - h, filter coefficients
+    """
+    h = np.sinc(2 * fH / fs * (np.arange(N) - (N - 1) / 2))
+    h *= np.hamming(N)
+    h /= np.sum(h)
+    h = -h
+    h[(N - 1) // 2] += 1
+    h.setflags(write=False)
+    return h
+
+
+def fft_length(N):
+    """
+    Overlap-add FFT length for an N-point filter: the power of two at least 4*N, so blocks are
+    about three times the filter length
+    """
+    return int(2**np.ceil(np.log2(4*N)))
+
+
+@lru_cache(maxsize=16)
+def _filter_transfer(fs, fH, N, nfft):
+    """
+    Cached nfft-point transfer function of filter_design(fs, fH, N)
+    """
+    H = _fft.rfft(filter_design(fs, fH, N), nfft)
+    H.setflags(write=False)
+    return H
+
+
+def fft_convolve(x, h, H=None):
+    """
+    Full convolution of each channel of x with h by overlap-add: x is cut into blocks which
+    are transformed together with a single rfft, multiplied by the transfer function of h, and
+    added back together. Equivalent to np.convolve on each channel (to rounding), at
+    O(log N) rather than O(N) operations per point.
+
+    Input:
+        - x, (channels, points) array
+        - h, filter coefficients
+        - H, optional precomputed rfft(h, nfft), where nfft = fft_length(len(h))
+
+    Output:
+        - (channels, points + len(h) - 1) array
+    """
+    N = len(h)
+    nfft = fft_length(N)
+    if H is None:
+        H = _fft.rfft(h, nfft)
+    dtype = float_dtype(x)
+    H = H.astype(np.result_type(dtype, np.complex64), copy=False)
+    L = nfft - N + 1 # block length
+    channels, num_points = x.shape
+    blocks = -(-num_points // L)
+    padded = np.zeros((channels, blocks*L), dtype=dtype)
+    padded[:, :num_points] = x
+    y = _fft.irfft(_fft.rfft(padded.reshape(channels, blocks, L), nfft, axis=-1) * H, nfft, axis=-1)
+
+    # overlap-add: the last N-1 points of each block overlap the start of the next (N-1 <= L)
+    out = np.zeros((channels, (blocks+1)*L), dtype=dtype)
+    out[:, :blocks*L] = y[:, :, :L].reshape(channels, blocks*L)
+    out[:, L:].reshape(channels, blocks, L)[:, :, :N-1] += y[:, :, L:]
+    return out[:, :num_points + N - 1]
+
+
+def _spikes(x, Nstd, robust):
+    """
+    Row and column indices of the values of x at least Nstd deviations from the center of their
+    channel: the mean and standard deviation, or (robust) the median and the median absolute
+    deviation scaled to a standard deviation (1.4826*MAD; the standard deviation where MAD is 0)
+    """
+    center = np.median(x, axis=1, keepdims=True) if robust else np.mean(x, axis=1, keepdims=True)
+    deviation = x - center
+    np.abs(deviation, out=deviation)
+    if robust:
+        scale = 1.4826 * np.median(deviation, axis=1)
+        if not scale.all():
+            scale = np.where(scale > 0, scale, np.std(x, axis=1))
+    else:
+        scale = np.sqrt(np.einsum('ij,ij->i', deviation, deviation) / x.shape[1])
+    return np.divmod(np.flatnonzero(deviation >= Nstd * scale[:, None]), x.shape[1])
+
+
+def despike(x, Nstd=10, iterate=False, robust=False, maxIter=10):
+    """
+    Replace values more than Nstd standard deviations from the mean of each channel with the
+    mean of the channel's remaining values. In each pass the deviations from the center are
+    formed once and used for both the scale and the threshold, and only the spikes are written.
+
+    Input:
+        - x, (channels, points) array
+        - Nstd, number of standard deviations
+        - iterate, if True, repeat on the despiked channels until no new spikes are found (at
+          most maxIter passes)
+        - robust, if True, use the median and the median absolute deviation (scaled to a
+          standard deviation) in place of the mean and standard deviation
+        - maxIter, maximum number of passes when iterating
+
+    Output:
+        - x, despiked copy of x
+        - bad, number of values replaced in each channel
+    """
+    x = np.array(x, dtype=float_dtype(x), ndmin=2)
+    channels, num_points = x.shape
+    bad = np.zeros(channels, dtype=int)
+    active = np.arange(channels) # channels which may still have spikes
+    for _ in range(maxIter if iterate else 1):
+        y = x if len(active) == channels else x[active]
+        rows, cols = _spikes(y, Nstd, robust)
+        if len(rows) == 0:
+            break
+        spiked = np.bincount(rows, minlength=len(active))
+        spikeSum = np.bincount(rows, weights=y[rows, cols], minlength=len(active))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            goodMean = (np.sum(y, axis=1) - spikeSum) / (num_points - spiked)
+        x[active[rows], cols] = goodMean[rows]
+        bad[active] += spiked
+        active = active[spiked > 0]
+    return x, bad
+
+
+def demean(x):
+    """
+    Remove the mean along the last axis
+    """
+    return x - np.mean(x, axis=-1, keepdims=True)
+
+
+def highpass(x, fs, fH=0.05, N=None):
+    """
+    High-pass filter each channel with the (cached) filter_design(fs, fH, N)
+
+    Input:
+        - x, (channels, points) array
+        - fs, sampling frequency [Hz]
+        - fH, cutoff frequency [Hz]
+        - N, filter length (odd); by default filter_length(fs)
+
+    Output:
+        - the first num_points points of the full convolution of each channel with the filter
+    """
+    if N is None:
+        N = filter_length(fs)
+    H = _filter_transfer(fs, fH, N, fft_length(N))
+    return fft_convolve(x, filter_design(fs, fH, N), H)[:, :x.shape[1]]
+
+
+def window_starts(num_points, win):
+    """
+    Start indices of the 75%-overlapping windows which fit in num_points
+    """
+    windows = int(np.floor( 4*(num_points/win - 1 ) + 1)) # number of windows, 4 is from 75% overlap
+    return (np.arange(max(windows, 0)) * (0.25*win)).astype(int)
+
+
+def windowed(x, win, starts):
+    """
+    (channels, windows, win) array of windows of x; a strided view of x (no copy) when the
+    window starts are evenly spaced
+
+    Input:
+        - x, (channels, points) array
+        - win, window length [points]
+        - starts, window start indices
+    """
+    if sliding_window_view is not None:
+        view = sliding_window_view(x, win, axis=1)
+    else:
+        view = as_strided(x, shape=(x.shape[0], x.shape[1]-win+1, win),
+                          strides=(x.strides[0], x.strides[1], x.strides[1]), writeable=False)
+    step = int(0.25*win)
+    if step > 0 and np.array_equal(starts, step*np.arange(len(starts))):
+        return view[:, ::step][:, :len(starts)]
+    return view[:, starts]
+
+
+def fourier_coefficients(windows, taper, factorFrom=None, out=None):
+    """
+    Demean, taper, and rescale each window to preserve variance, then return the one-sided
+    Fourier coefficients without the mean, with the Nyquist frequency zeroed. All three steps
+    are done in place in out, so windows may be a read-only strided view.
+
+    Input:
+        - windows, (channels, windows, win) array
+        - taper, taper of length win
+        - factorFrom, for each channel, the channel whose variance correction factor is applied
+          to its tapered windows (default: its own)
+        - out, optional float buffer of the same shape as windows (overwritten)
+
+    Output:
+        - X, (channels, windows, win/2) complex array
+    """
+    win = windows.shape[-1]
+    if out is None:
+        out = np.empty(windows.shape, dtype=float_dtype(windows))
+    np.subtract(windows, np.mean(windows, axis=-1, keepdims=True), out=out)
+    variance = np.einsum('...k,...k->...', out, out) # (win-1) times the variance; demeaned
+    np.multiply(out, taper.astype(out.dtype, copy=False), out=out)
+    taperedVariance = np.einsum('...k,...k->...', out, out) - np.sum(out, axis=-1)**2 / win
+    fact = np.sqrt( variance / taperedVariance )
+    if factorFrom is not None:
+        fact = fact[factorFrom]
+    np.multiply(out, fact[..., None], out=out)
+    X = _fft.rfft(out, axis=-1)[..., 1:].astype(np.result_type(out.dtype, np.complex64), copy=False)
+    X[..., -1] = 0
+    return X
+
+
+def cross_spectra(X):
+    """
+    Auto- and cross-spectra of every channel pair, summed over windows
+
+    Input:
+        - X, (channels, windows, frequencies) Fourier coefficients
+
+    Output:
+        - S, (channels, channels, frequencies) complex array, S[i, j] = sum of Xi * conj(Xj)
+    """
+    return np.einsum('iwk,jwk->ijk', X, np.conj(X))
+
+
+def merge_bands(S, merge):
+    """
+    Average groups of merge neighboring frequency bands (along the last axis); frequencies
+    beyond the last whole group are dropped
+    """
+    bands = S.shape[-1] // merge
+    return np.mean(S[..., :bands*merge].reshape(S.shape[:-1] + (bands, merge)), axis=-1)
+
+
+def welch(x, fs, wsecs=256, merge=3, factorFrom=None, blockBytes=2**21):
+    """
+    Merged, ensemble-averaged auto- and cross-spectral densities of the channels of x, which
+    should already be despiked and filtered. Windows are strided views of x and are transformed
+    a block at a time through one buffer of about blockBytes (at least one window per block).
+
+    Input:
+        - x, (channels, points) array
+        - fs, sampling frequency [Hz]
+        - wsecs, window length [s]
+        - merge, number of frequency bands to merge
+        - factorFrom, see fourier_coefficients
+        - blockBytes, size of the window buffer [bytes]
+
+    Output:
+        - S, (channels, channels, bands) complex array of spectral densities
+        - win, window length [points]
+        - windows, number of windows
+    """
+    win = window_length(fs, wsecs)
+    starts = window_starts(x.shape[1], win)
+    taper = np.sin(np.arange(1, win+1) * np.pi/(win+1))
+    views = windowed(x, win, starts)
+    dtype = float_dtype(x)
+    block = max(1, min(len(starts), blockBytes // (dtype.itemsize * x.shape[0] * win)))
+    buffer = np.empty((x.shape[0], block, win), dtype=dtype)
+    S = np.zeros((x.shape[0], x.shape[0], win//2), dtype=np.result_type(dtype, np.complex64))
+    for first in range(0, len(starts), block):
+        n = min(block, len(starts) - first)
+        S += cross_spectra(fourier_coefficients(views[:, first:first+n], taper, factorFrom, out=buffer[:, :n]))
+    S = merge_bands(S, merge) / len(starts) / (win/2 * fs)
+    return S, win, len(starts)
@@ -0,0 +1,187 @@
+"""
+Author: @jacobrdavis
+
+Streaming (incremental) Welch estimator of the auto- and cross-spectra of several channels
+sampled together. Samples are passed in as they arrive; each 75%-overlapping window is
+filtered, tapered, and Fourier transformed as soon as it is complete and only running sums of
+the spectra are kept, so processing after the burst is small and memory does not grow with
+burst length.
+
+The processing follows UVZAwaves: despike at Nstd standard deviations, demean, high-pass
+filter with a windowed-sinc FIR filter, then demean, taper, and rescale each window to
+preserve variance. Two of these steps use statistics of the whole burst:
+    - despiking: samples are compared with the mean and standard deviation of all samples
+      received so far, and spikes are replaced with the mean of the non-spiked samples so far.
+      The first window of samples is held back and despiked with its own statistics. Results
+      are identical to the batch routine when no samples are flagged as spikes.
+    - demeaning: the high-pass filter has zero gain at DC, so the burst mean only changes the
+      first N-1 filter outputs. Windows which overlap them are kept until the spectra are
+      requested and corrected with the burst mean then; all later windows are unaffected.
+
+Contents:
+    - StreamingWelch(fs, nChannels, wsecs, merge, Nstd, fH, N, factorFrom)
+
+Log:
+    - Oct 2026: created streamingWelch.py
+    - Oct 2026: windows transformed through a preallocated buffer
+    - Oct 2026: added completed, the number of windows received
+"""
+#--Import Statements
+import numpy as np
+from waves.spectralCore import window_length, filter_length, filter_design, fft_convolve, fourier_coefficients, cross_spectra, merge_bands
+
+class StreamingWelch:
+    """
+    Incremental auto- and cross-spectral estimator for nChannels channels:
+
+        welch = StreamingWelch(fs, 4)
+        welch.update(chunk)          # chunk is (nChannels, n), any n
+        S = welch.spectra()          # (nChannels, nChannels, bands) merged, ensemble averaged
+
+    Input:
+        - fs, sampling frequency [Hz]
+        - nChannels, number of channels
+        - wsecs, window length [s]
+        - merge, number of neighboring frequency bands to merge
+        - Nstd, number of standard deviations for despiking
+        - fH, high-pass filter cutoff frequency [Hz]
+        - N, high-pass filter length (odd); by default filter_length(fs)
+        - factorFrom, for each channel, the channel whose variance correction factor is applied
+          to its tapered windows (default: its own)
+    """
+    def __init__(self, fs, nChannels, wsecs=256, merge=3, Nstd=10, fH=0.05, N=None, factorFrom=None):
+        self.fs = fs
+        self.nChannels = nChannels
+        self.wsecs = wsecs
+        self.merge = merge
+        self.Nstd = Nstd
+        self.factorFrom = np.arange(nChannels) if factorFrom is None else np.asarray(factorFrom)
+
+        # Window length in points, taper, and high-pass filter
+        win = window_length(fs, wsecs)
+        self.win = win
+        self.taper = np.sin(np.arange(1, win+1) * np.pi/(win+1))
+        self._buffer = np.empty((nChannels, 1, win)) # one window, demeaned, tapered, rescaled
+        if N is None:
+            N = filter_length(fs)
+        h = filter_design(fs, fH, N)
+        self.h = h
+        self.N = N
+        self._stepResponse = np.cumsum(h) # filter response to a unit offset, ~0 after N-1 points
+
+        # Despiking statistics, in terms of x - offset (offset is the mean of the first window)
+        self.num_points = 0
+        self.bad = np.zeros(nChannels, dtype=int)
+        self._warmup = []
+        self._offset = None
+        self._n = 0
+        self._s1 = np.zeros(nChannels)
+        self._s2 = np.zeros(nChannels)
+        self._goodSum = np.zeros(nChannels)
+        self._goodCount = np.zeros(nChannels, dtype=int)
+        self._sum = np.zeros(nChannels) # sum of despiked samples, for the burst mean
+
+        # Filter and window state
+        self._tail = np.zeros((nChannels, N-1))
+        self._filtered = np.zeros((nChannels, 0))
+        self._filteredStart = 0 # sample index of the first point in self._filtered
+        self._nextWindow = 0
+        self._deferred = [] # (start, window) for windows overlapping the first N-1 filter outputs
+        self.windows = 0
+        self._S = np.zeros((nChannels, nChannels, win//2), dtype=complex)
+
+    @property
+    def completed(self):
+        """ number of complete windows so far, including those deferred until spectra() """
+        return self.windows + len(self._deferred)
+
+    def update(self, chunk):
+        """
+        Add samples, an (nChannels, n) array (or a sequence of nChannels arrays of length n)
+        """
+        chunk = np.array(chunk, dtype=float, ndmin=2)
+        self.num_points += chunk.shape[1]
+        if self._offset is None: # hold samples back until one window has been received
+            self._warmup.append(chunk)
+            if sum(c.shape[1] for c in self._warmup) < self.win:
+                return
+            chunk = np.concatenate(self._warmup, axis=1)
+            self._warmup = []
+            self._offset = np.mean(chunk, axis=1)
+        self._filter(self._despike(chunk))
+        self._window()
+
+    def _despike(self, chunk):
+        """
+        Replace spikes using the statistics of all samples so far; returns despiked x - offset
+        """
+        y = chunk - self._offset[:, None]
+        self._n += y.shape[1]
+        self._s1 += np.sum(y, axis=1)
+        self._s2 += np.sum(y**2, axis=1)
+        mean = self._s1/self._n
+        std = np.sqrt(np.maximum(self._s2/self._n - mean**2, 0))
+        bad = np.abs(y - mean[:, None]) >= self.Nstd * std[:, None]
+        self.bad += np.sum(bad, axis=1)
+        self._goodSum += np.sum(np.where(bad, 0, y), axis=1)
+        self._goodCount += np.sum(~bad, axis=1)
+        goodMean = self._goodSum / np.maximum(self._goodCount, 1)
+        y = np.where(bad, goodMean[:, None], y)
+        self._sum += np.sum(y, axis=1)
+        return y
+
+    def _filter(self, y):
+        """
+        Continue the high-pass filter (convolution of the whole series) over the new samples
+        """
+        extended = np.concatenate([self._tail, y], axis=1)
+        if y.shape[1] < self.N: # direct convolution is cheaper for short chunks
+            filtered = np.array([np.convolve(x, self.h, mode='valid') for x in extended])
+        else:
+            filtered = fft_convolve(extended, self.h)[:, self.N-1:extended.shape[1]]
+        self._tail = extended[:, extended.shape[1]-(self.N-1):]
+        self._filtered = np.concatenate([self._filtered, filtered], axis=1)
+
+    def _start(self, n):
+        return int(n * (0.25 * self.win)) # windows have 75% overlap
+
+    def _window(self):
+        """
+        Transform every window which is complete, then drop samples no longer needed
+        """
+        end = self._filteredStart + self._filtered.shape[1]
+        while self._start(self._nextWindow) + self.win <= end:
+            i = self._start(self._nextWindow) - self._filteredStart
+            window = self._filtered[:, i:i+self.win]
+            if self._start(self._nextWindow) < self.N - 1:
+                self._deferred.append((self._start(self._nextWindow), window.copy()))
+            else:
+                self._S += self._transform(window)
+                self.windows += 1
+            self._nextWindow += 1
+        drop = min(self._start(self._nextWindow), end) - self._filteredStart
+        self._filtered = self._filtered[:, drop:]
+        self._filteredStart += drop
+
+    def _transform(self, window):
+        """
+        Demean, taper, rescale, and FFT one window; returns its one-sided cross-spectra (unscaled)
+        """
+        return cross_spectra(fourier_coefficients(window[:, None, :], self.taper, self.factorFrom, out=self._buffer))
+
+    def spectra(self):
+        """
+        Merged, ensemble-averaged auto- and cross-spectral densities of the windows so far. May
+        be called at any time; accumulation can continue afterwards.
+
+        Output:
+            - S, (nChannels, nChannels, bands) complex array, S[i, j] = Xi * conj(Xj)
+        """
+        S = self._S.copy()
+        windows = self.windows
+        burstMean = self._sum / max(self.num_points, 1)
+        for start, window in self._deferred:
+            step = self._stepResponse[np.minimum(np.arange(start, start+self.win), self.N-1)]
+            S += self._transform(window - burstMean[:, None] * step)
+            windows += 1
+        return merge_bands(S, self.merge) / max(windows, 1) / (self.win/2 * self.fs)
@@ -0,0 +1,99 @@
+## GPSwaves.py and UVZAwaves.py Benchmark Script
+"""
+Compares GPSwaves and UVZAwaves, built on the vectorized spectral core (waves/spectralCore.py),
+against the previous loop-based implementations on synthetic bursts at 4, 12, 25, and 48 Hz,
+checking that both return the same outputs and reporting the run time of each. The previous
+implementations are read from git, at the commit before spectralCore.py was added (or at the
+revision given with --ref).
+
+Both versions share the TODO on the frequency vector length: GPSwaves only runs when win/2 is
+not a multiple of merge (e.g. 4 and 25 Hz) and UVZAwaves only when it is (12 and 48 Hz); the
+other cases are reported as failing in both. The spectral core alone is timed at every rate.
+
+Above 12 Hz the high-pass filter is longer than the previous fixed 207 points (see
+filter_length in waves/spectralCore.py), so outputs are only compared at 12 Hz and below;
+above, the significant wave heights are reported. The filter itself is also timed, as direct
+np.convolve of each channel against the FFT (overlap-add) convolution of all channels.
+
+Usage (from the repository root):
+    python3 waves_benchmark.py [--ref REVISION]
+"""
+import sys, types, subprocess
+from timeit import default_timer as timer
+import numpy as np
+from waves.GPSwaves import GPSwaves
+from waves.UVZAwaves import UVZAwaves
+from waves.spectralCore import welch, filter_length, filter_design, highpass
+from testApps.UVZAwavesEstimator_test import synthetic_burst
+
+rates = [4, 12, 25, 48]
+duration = 1920 # [s]
+nRepeats = 3
+
+def reference_revision():
+    """ parent of the commit which added waves/spectralCore.py (HEAD if not committed yet) """
+    added = subprocess.run(['git', 'log', '--diff-filter=A', '--format=%H', '--', 'waves/spectralCore.py'],
+                           capture_output=True, text=True).stdout.split()
+    return added[-1] + '~1' if added else 'HEAD'
+
+def load_reference(revision, path, name):
+    """ load function name from path at a git revision """
+    source = subprocess.run(['git', 'show', f'{revision}:{path}'], capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(name)
+    exec(compile(source, f'{revision}:{path}', 'exec'), module.__dict__)
+    return getattr(module, name)
+
+def best_time(fun, *args):
+    times = []
+    for _ in range(nRepeats):
+        inputs = [np.array(x) for x in args[:-1]] # the reference modifies its inputs
+        start = timer()
+        try:
+            result = fun(*inputs, args[-1])
+        except ValueError as e:
+            return e, None
+        times.append(timer() - start)
+    return result, min(times)
+
+def max_difference(new, reference):
+    return max(np.max(np.abs(np.asarray(n, dtype=float) - np.asarray(r, dtype=float))) for n, r in zip(new, reference))
+
+if __name__ == '__main__':
+    revision = sys.argv[sys.argv.index('--ref')+1] if '--ref' in sys.argv else reference_revision()
+    print(f'reference revision: {revision}')
+    references = {'GPSwaves': load_reference(revision, 'waves/GPSwaves.py', 'GPSwaves'),
+                  'UVZAwaves': load_reference(revision, 'waves/UVZAwaves.py', 'UVZAwaves')}
+    functions = {'GPSwaves': GPSwaves, 'UVZAwaves': UVZAwaves}
+
+    for fs in rates:
+        u, v, z, a = synthetic_burst(fs, duration)
+        inputs = {'GPSwaves': (u, v, z, fs), 'UVZAwaves': (u, v, z, a, fs)}
+        for name in functions:
+            new, newTime = best_time(functions[name], *inputs[name])
+            reference, referenceTime = best_time(references[name], *inputs[name])
+            if newTime is None or referenceTime is None:
+                assert newTime is None and referenceTime is None, f'{name} at {fs} Hz fails in one version only'
+                print(f'{fs:>3} Hz {name:>10}: fails in both ({new})')
+                continue
+            timing = f'{fs:>3} Hz {name:>10}: reference {referenceTime*1e3:8.1f} ms, new {newTime*1e3:8.1f} ms ({referenceTime/newTime:4.1f}x)'
+            if filter_length(fs) == 207:
+                difference = max_difference(new, reference)
+                assert difference < 1e-9, f'{name} at {fs} Hz differs by {difference}'
+                print(f'{timing}; max difference {difference:.1e}')
+            else:
+                print(f'{timing}; Hs {reference[0]:.3f} (207-point filter), {new[0]:.3f} ({filter_length(fs)}-point filter)')
+
+        x = np.vstack([u, v, z, a])
+        h = filter_design(fs, 0.05, filter_length(fs))
+        start = timer()
+        direct = np.array([np.convolve(channel, h)[:x.shape[1]] for channel in x])
+        directTime = timer() - start
+        start = timer()
+        filtered = highpass(x, fs)
+        fftTime = timer() - start
+        assert np.allclose(filtered, direct, rtol=0, atol=1e-12*np.max(np.abs(x)))
+        print(f'{fs:>3} Hz {"highpass":>10}: np.convolve {directTime*1e3:6.1f} ms, FFT {fftTime*1e3:6.1f} ms ({len(h)} taps, 4 channels)')
+
+        start = timer()
+        welch(x, fs, factorFrom=[0, 1, 2, 2])
+        print(f'{fs:>3} Hz {"welch":>10}: {(timer() - start)*1e3:8.1f} ms for {x.shape[1]} points x 4 channels')